@@ -294,7 +294,7 @@ const VendorMarketplace = () => {
         filterParams.price_range = filters.priceRange;
       }
 
-      const response = await apiService.getVendors(filterParams);
+      const response = await apiService.getAllVendors(filterParams);
       if (response.success && response.data) {
         let vendorsList = response.data.results || response.data;
         vendorsList = Array.isArray(vendorsList) ? vendorsList : [];
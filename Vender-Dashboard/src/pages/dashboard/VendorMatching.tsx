@@ -126,12 +126,13 @@ const VendorMatching = () => {
       if (!hasFilters) {
         filterParams.limit = 20;
       }
-      // When searching or filtering, don't set limit to get all results
       
       console.log('📋 fetchFilteredVendors: Filter params:', filterParams);
       
-      // Fetch filtered vendors from database
-      const response = await apiService.getVendors(filterParams);
+      // Fetch filtered vendors from database; with filters, every page of them
+      const response = hasFilters
+        ? await apiService.getAllVendors(filterParams)
+        : await apiService.getVendors(filterParams);
       console.log('📦 fetchFilteredVendors: API response:', response);
       
       if (response.success && response.data) {
@@ -193,10 +193,10 @@ class ApiService {
 
   // Profile
   async getProfile() {
-    // Add timestamp to prevent caching
-    const timestamp = Date.now();
-    const response = await fetch(`${API_BASE_URL}/auth/profile/?_t=${timestamp}`, {
+    // Always revalidate: the server answers 304 from its ETag when nothing changed
+    const response = await fetch(`${API_BASE_URL}/auth/profile/`, {
       headers: this.getAuthHeaders(),
+      cache: 'no-cache',
     });
     return this.handleResponse(response);
   }
@@ -399,6 +399,26 @@ class ApiService {
     }
   }
 
+  // Every matching vendor: vendors/ is cursor-paginated, so follow `next` until the last page
+  async getAllVendors(filters: any = {}) {
+    const first = await this.getVendors({ ...filters, limit: filters.limit || 100 });
+    if (!first.success || !first.data || Array.isArray(first.data)) {
+      return first;
+    }
+
+    const vendors = [...(first.data.results || [])];
+    let next = first.data.next;
+    while (next) {
+      const result = await this.makeRequest<any>(next, { headers: this.getAuthHeaders() });
+      if (!result.data) {
+        return { success: false, data: vendors, error: result.error };
+      }
+      vendors.push(...(result.data.results || []));
+      next = result.data.next;
+    }
+    return { success: true, data: vendors };
+  }
+
   async updateVendor(vendorId: number, vendorData: any) {
     const token = localStorage.getItem('access_token');
     const isFormData = vendorData instanceof FormData;
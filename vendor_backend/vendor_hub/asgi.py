@@ -2,6 +2,7 @@ import os
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
+from vendors.api.authentication import QueryStringJWTAuthMiddleware
 from vendors.routing import websocket_urlpatterns
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'vendor_hub.settings')
@@ -9,8 +10,10 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'vendor_hub.settings')
 application = ProtocolTypeRouter({
     "http": get_asgi_application(),
     "websocket": AuthMiddlewareStack(
-        URLRouter(
-            websocket_urlpatterns
+        QueryStringJWTAuthMiddleware(
+            URLRouter(
+                websocket_urlpatterns
+            )
         )
     ),
 })
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""Brotli/gzip compression of API responses above a size threshold.
+
+Vendor listings embed every vendor's services, so JSON pages run to hundreds
+of KB; they compress 5-10x. Small bodies aren't worth the CPU (or the bytes
+the encoding adds) and already-encoded or streamed responses (media) are left
+alone. Brotli is used when the client accepts it and the ``brotli`` package is
+installed; gzip goes through Django's GZipMiddleware, including its random
+padding against BREACH. Strong ETags become weak because the bytes now depend
+on the encoding.
+
+Responses that carry tokens (login, registration, or any body with
+``access``/``refresh`` keys) are never compressed, so a secret can't be
+recovered from compressed sizes next to reflected input.
+
+Settings (COMPRESSION): ENABLED, MIN_SIZE in bytes, BROTLI_QUALITY,
+SKIP_URL_NAMES.
+"""
+import re
+from collections.abc import Mapping
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+COMPRESSIBLE = re.compile(r'^(text/|application/(json|javascript|xml)|image/svg\+xml)')
+ENCODING_RE = re.compile(r'^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*$')
+TOKEN_KEYS = {'access', 'refresh', 'token'}
+
+
+def accepted_encodings(header):
+    """Codings the client accepts (q > 0) from an Accept-Encoding header"""
+    accepted = set()
+    for part in header.split(','):
+        match = ENCODING_RE.match(part)
+        if match and float(match[2] or 1) > 0:
+            accepted.add(match[1].lower())
+    return accepted
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=settings.COMPRESSION['BROTLI_QUALITY'])
+    return compress_string(content, max_random_bytes=GZipMiddleware.max_random_bytes)
+
+
+def carries_secrets(request, response):
+    match = getattr(request, 'resolver_match', None)
+    if match is not None and match.url_name in settings.COMPRESSION['SKIP_URL_NAMES']:
+        return True
+    data = getattr(response, 'data', None)
+    return isinstance(data, Mapping) and not TOKEN_KEYS.isdisjoint(data)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    def process_response(self, request, response):
+        config = settings.COMPRESSION
+        if (not config['ENABLED'] or response.streaming or response.has_header('Content-Encoding')
+                or len(response.content) < config['MIN_SIZE']
+                or not COMPRESSIBLE.match(response.get('Content-Type', ''))
+                or carries_secrets(request, response)):
+            return response
+
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        if brotli is None or 'br' not in accepted:
+            if 'gzip' not in accepted:
+                patch_vary_headers(response, ('Accept-Encoding',))
+                return response
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed = compress(response.content, 'br')
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = 'br'
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
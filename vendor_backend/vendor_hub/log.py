@@ -0,0 +1,221 @@
+"""Logging pipeline used by ``LOGGING`` in vendor_hub.settings.
+
+Request threads only hand records to ``QueueListenerHandler``; a listener
+thread formats them as JSON lines and does the file/console I/O. Before a
+record is queued the handler's filters:
+
+- ``ContextFilter`` tags it with the request id and URL name set by
+  ``RequestContextMiddleware``,
+- ``SamplingFilter`` keeps only a fraction of sub-WARNING records for the
+  routes listed in ``LOG_SAMPLING``,
+- ``RedactingFilter`` copies structured extras (``extra={'payload': ...}``)
+  with secrets masked and long values truncated, so request data can be
+  attached to debug events without leaking documents or passwords.
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import queue
+import random
+import re
+import uuid
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.files import File
+
+request_id_var = contextvars.ContextVar('request_id', default=None)
+route_var = contextvars.ContextVar('route', default=None)
+
+REQUEST_ID = re.compile(r'[\w-]{1,64}')
+SENSITIVE_KEYS = re.compile(r'pass|token|secret|access|refresh|authorization|otp|aadhaar|^pan', re.IGNORECASE)
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+STANDARD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+def redact(value, max_length=200, max_items=50):
+    """JSON-friendly copy of ``value`` with sensitive keys masked and sizes capped"""
+    if isinstance(value, File):
+        return {'name': value.name, 'size': value.size, 'content_type': getattr(value, 'content_type', None)}
+    if isinstance(value, Mapping):
+        items = list(value.items())
+        result = {
+            str(key): '[redacted]' if SENSITIVE_KEYS.search(str(key)) else redact(item, max_length, max_items)
+            for key, item in items[:max_items]
+        }
+        if len(items) > max_items:
+            result['...'] = f'{len(items) - max_items} more keys'
+        return result
+    if isinstance(value, (list, tuple, set)):
+        items = list(value)
+        result = [redact(item, max_length, max_items) for item in items[:max_items]]
+        if len(items) > max_items:
+            result.append(f'... {len(items) - max_items} more items')
+        return result
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = str(value)
+    if len(text) > max_length:
+        return f'{text[:max_length]}... ({len(text) - max_length} more chars)'
+    return text
+
+
+class ContextFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        record.route = route_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep ``rates[route]`` (0..1) of the DEBUG/INFO records logged while serving ``route``"""
+
+    def __init__(self, rates=None, default=1.0):
+        super().__init__()
+        self.rates = rates or {}
+        self.default = default
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(getattr(record, 'route', None), self.default)
+        return rate >= 1 or random.random() < rate
+
+
+class RedactingFilter(logging.Filter):
+    def __init__(self, max_length=200, max_items=50):
+        super().__init__()
+        self.max_length = max_length
+        self.max_items = max_items
+
+    def filter(self, record):
+        for key, value in list(vars(record).items()):
+            if key not in STANDARD_ATTRS and key not in ('request_id', 'route'):
+                setattr(record, key, redact(value, self.max_length, self.max_items))
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+            'thread': record.thread,
+        }
+        for key, value in vars(record).items():
+            if key not in STANDARD_ATTRS and value is not None:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class QueueListenerHandler(QueueHandler):
+    """Queue records for a listener thread that feeds ``handlers``.
+
+    ``handlers`` are ``cfg://handlers.<name>`` references; dictConfig builds
+    handlers in name order, so they must sort before this handler's name.
+    Configure it with a ``'()'`` factory key, not ``'class'``, which Python
+    3.12+ would wire up with its own QueueListener. A full queue drops records
+    (and reports how many) instead of blocking.
+    """
+
+    def __init__(self, handlers, queue_size=10000):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.dropped = 0
+        self.listener = QueueListener(self.queue, *[handlers[i] for i in range(len(handlers))],
+                                      respect_handler_level=True)
+        self.listener.start()
+        self.listening = True
+        atexit.register(self.close)
+
+    def close(self):
+        # Drains the queue; safe to call more than once
+        if self.listening:
+            self.listening = False
+            self.listener.stop()
+        super().close()
+
+    def prepare(self, record):
+        # Render the message and traceback here, while args are still safe to
+        # read, but keep the record's extras for the JSON formatter
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            warning = logging.makeLogRecord({
+                'name': __name__, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                'msg': 'Log queue full; dropped %d records', 'args': (dropped,),
+            })
+            try:
+                self.queue.put_nowait(self.prepare(warning))
+            except queue.Full:
+                self.dropped += dropped
+
+
+class RequestContextMiddleware:
+    """Expose the request id and URL name to log records; echoes the id as X-Request-ID"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request_id, tokens = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            self.finish(tokens)
+        response['X-Request-ID'] = request_id
+        return response
+
+    async def __acall__(self, request):
+        request_id, tokens = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.finish(tokens)
+        response['X-Request-ID'] = request_id
+        return response
+
+    def start(self, request):
+        request_id = request.headers.get('X-Request-ID', '')
+        if not REQUEST_ID.fullmatch(request_id):
+            request_id = uuid.uuid4().hex
+        return request_id, (request_id_var.set(request_id), route_var.set(None))
+
+    def finish(self, tokens):
+        request_id_var.reset(tokens[0])
+        route_var.reset(tokens[1])
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = getattr(request, 'resolver_match', None)
+        route_var.set(match.url_name if match else None)
@@ -1,5 +1,6 @@
+import os
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 from datetime import timedelta
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -36,6 +37,8 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'vendor_hub.compression.CompressionMiddleware',
+    'vendor_hub.log.RequestContextMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -104,10 +107,13 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# orjson-backed renderer and parser (vendors/api/renderers.py) instead of DRF's stock json ones
+API_FAST_JSON = config('API_FAST_JSON', default=False, cast=bool)
+
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'vendors.api.authentication.PresenceJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
@@ -115,15 +121,132 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'vendors.api.renderers.ORJSONRenderer' if API_FAST_JSON else 'rest_framework.renderers.JSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'vendors.api.renderers.ORJSONParser' if API_FAST_JSON else 'rest_framework.parsers.JSONParser',
         'rest_framework.parsers.MultiPartParser',
         'rest_framework.parsers.FormParser',
     ],
 }
 
+# Response compression (vendor_hub/compression.py): brotli when installed and
+# accepted, else Django's padded gzip, for text/JSON bodies of at least MIN_SIZE
+# bytes. Routes in SKIP_URL_NAMES return tokens and are never compressed (BREACH)
+COMPRESSION = {
+    'ENABLED': config('API_COMPRESSION', default=True, cast=bool),
+    'MIN_SIZE': config('API_COMPRESSION_MIN_SIZE', default=1024, cast=int),
+    'BROTLI_QUALITY': config('API_COMPRESSION_BROTLI_QUALITY', default=4, cast=int),
+    'SKIP_URL_NAMES': ('vendor-register', 'vendor-login'),
+}
+
+# Shared cache of rendered marketplace listing pages (vendors/listing_cache.py).
+# Entries are invalidated by writes; TIMEOUT bounds how stale is_online can get.
+# Concurrent misses for one page wait up to LOCK_TIMEOUT seconds for one render.
+LISTING_CACHE = {
+    'ENABLED': config('LISTING_CACHE', default=True, cast=bool),
+    'TIMEOUT': config('LISTING_CACHE_TIMEOUT', default=60, cast=int),
+    'LOCK_TIMEOUT': config('LISTING_CACHE_LOCK_TIMEOUT', default=5, cast=int),
+}
+
+# Platform-wide booking analytics (vendors/cube.py).
+# ADMIN_EMAILS: accounts allowed to query the cube (vendor accounts have no is_staff).
+# CUBE_REFRESH_OVERLAP: seconds each refresh re-reads before the last high-water
+#   mark, to catch rollup changes committed after it was taken.
+ANALYTICS = {
+    'ADMIN_EMAILS': config('ANALYTICS_ADMIN_EMAILS', default='', cast=Csv()),
+    'CUBE_REFRESH_OVERLAP': config('ANALYTICS_CUBE_REFRESH_OVERLAP', default=300, cast=int),
+}
+
+# Nightly Parquet snapshots for analysts (vendors/exporting.py, export_snapshot).
+# LAG: seconds of the most recent changes left for the next run, so rows
+#   committed late with an earlier timestamp aren't skipped.
+SNAPSHOT_EXPORT = {
+    'DIR': config('SNAPSHOT_EXPORT_DIR', default=str(BASE_DIR / 'exports')),
+    'CHUNK_SIZE': config('SNAPSHOT_EXPORT_CHUNK_SIZE', default=10000, cast=int),
+    'LAG': config('SNAPSHOT_EXPORT_LAG', default=300, cast=int),
+}
+
+# Vendor notification emails (vendors/notifications.py, send_notifications).
+# DIGEST_DELAY: seconds a new event waits so later ones join the same email.
+# BATCH_SIZE: vendors (digests) sent per SMTP connection. LEASE: seconds a claimed
+#   batch is hidden from other workers. Failed digests are retried after
+#   RETRY_BASE * 2^(attempt - 1) seconds, at most RETRY_MAX, MAX_ATTEMPTS times.
+NOTIFICATIONS = {
+    'DIGEST_DELAY': config('NOTIFICATION_DIGEST_DELAY', default=60, cast=int),
+    'BATCH_SIZE': config('NOTIFICATION_BATCH_SIZE', default=100, cast=int),
+    'LEASE': config('NOTIFICATION_LEASE', default=300, cast=int),
+    'RETRY_BASE': config('NOTIFICATION_RETRY_BASE', default=60, cast=int),
+    'RETRY_MAX': config('NOTIFICATION_RETRY_MAX', default=3600, cast=int),
+    'MAX_ATTEMPTS': config('NOTIFICATION_MAX_ATTEMPTS', default=8, cast=int),
+    'POLL_INTERVAL': config('NOTIFICATION_POLL_INTERVAL', default=10, cast=float),
+}
+
+# Hard cap on ?page_size= / ?limit= for cursor-paginated endpoints
+API_MAX_PAGE_SIZE = config('API_MAX_PAGE_SIZE', default=100, cast=int)
+
+# Websocket chat persistence.
+# MODE: 'sync' writes each message before broadcasting it; 'write_behind' broadcasts
+#   first and inserts buffered messages in batches (see vendors/chat_buffer.py).
+# ACK: 'none', 'received' (ack once buffered) or 'persisted' (ack once committed).
+CHAT_PERSISTENCE = {
+    'MODE': config('CHAT_PERSISTENCE_MODE', default='sync'),
+    'FLUSH_BATCH_SIZE': config('CHAT_FLUSH_BATCH_SIZE', default=200, cast=int),
+    'FLUSH_INTERVAL': config('CHAT_FLUSH_INTERVAL', default=0.25, cast=float),
+    'ACK': config('CHAT_ACK', default='persisted'),
+}
+
+# Vendor presence (vendors/presence.py): heartbeats expire from the cache after TTL
+# seconds, each process refreshes a vendor's key at most every TOUCH_INTERVAL, and
+# `flush_presence --loop` brings UserDetails.is_online up to date every FLUSH_INTERVAL
+PRESENCE = {
+    'TTL': config('PRESENCE_TTL', default=90, cast=int),
+    'TOUCH_INTERVAL': config('PRESENCE_TOUCH_INTERVAL', default=30, cast=int),
+    'FLUSH_INTERVAL': config('PRESENCE_FLUSH_INTERVAL', default=60, cast=int),
+}
+
+# Most missed messages replayed per websocket resume request; clients page with repeated resumes
+CHAT_RESUME_LIMIT = config('CHAT_RESUME_LIMIT', default=500, cast=int)
+
+# Login/registration hash passwords on a dedicated pool of WORKERS threads (vendors/passwords.py);
+# once MAX_PENDING hashes are waiting, further attempts get 503 instead of queueing
+PASSWORD_HASHING = {
+    'WORKERS': config('PASSWORD_HASHING_WORKERS', default=os.cpu_count() or 2, cast=int),
+    'MAX_PENDING': config('PASSWORD_HASHING_MAX_PENDING', default=256, cast=int),
+}
+
+# Uploaded profile/service photos (vendors/images.py): originals are stored once per
+# content hash and resized to each of WIDTHS as WebP and JPEG by WORKERS threads.
+# MODE 'inline' resizes before the upload request returns instead.
+IMAGE_PIPELINE = {
+    'MODE': config('IMAGE_PIPELINE_MODE', default='background'),
+    'WORKERS': config('IMAGE_PIPELINE_WORKERS', default=2, cast=int),
+    'WIDTHS': [320, 640, 1280],
+    'QUALITY': config('IMAGE_PIPELINE_QUALITY', default=80, cast=int),
+}
+
+# Media serving (vendors/media.py). OFFLOAD: '' streams files from Django,
+# 'x-accel-redirect' hands them to nginx at ACCEL_PREFIX (an `internal` location
+# aliased to MEDIA_ROOT), 'x-sendfile' to Apache/lighttpd. MAX_AGE is the browser
+# cache lifetime for public media whose names are not content hashes, and
+# SIGNED_URL_MAX_AGE how long a signed verification document URL stays valid.
+MEDIA_SERVING = {
+    'OFFLOAD': config('MEDIA_OFFLOAD', default=''),
+    'ACCEL_PREFIX': config('MEDIA_ACCEL_PREFIX', default='/protected-media/'),
+    'MAX_AGE': config('MEDIA_MAX_AGE', default=3600, cast=int),
+    'SIGNED_URL_MAX_AGE': config('MEDIA_SIGNED_URL_MAX_AGE', default=300, cast=int),
+}
+
+# Resumable verification uploads (vendors/uploads.py). Chunks are staged in DIR,
+# outside MEDIA_ROOT, until the upload is completed; sessions idle for longer
+# than EXPIRY_HOURS are removed by the purge_uploads command.
+CHUNKED_UPLOADS = {
+    'DIR': config('CHUNKED_UPLOAD_DIR', default=str(BASE_DIR / 'uploads')),
+    'MAX_SIZE': config('CHUNKED_UPLOAD_MAX_SIZE', default=5 * 1024 * 1024, cast=int),
+    'MAX_CHUNK_SIZE': config('CHUNKED_UPLOAD_MAX_CHUNK_SIZE', default=1024 * 1024, cast=int),
+    'EXPIRY_HOURS': config('CHUNKED_UPLOAD_EXPIRY_HOURS', default=24, cast=int),
+}
+
 # JWT Configuration
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=180),
@@ -163,46 +286,76 @@ DATABASES = {
 }
 
 # Logging Configuration
+# Loggers only enqueue records; a listener thread writes them (JSON to the file).
+# See vendor_hub/log.py for the filters applied before queueing.
+LOG_LEVEL = config('LOG_LEVEL', default='INFO')
+
+# Fraction of DEBUG/INFO records kept per URL name (WARNING and above are always kept)
+LOG_SAMPLING = {
+    'services-list': config('LOG_SAMPLE_SERVICES', default=0.1, cast=float),
+    'vendors-list': config('LOG_SAMPLE_VENDORS', default=0.1, cast=float),
+    'vendor-list-chat': config('LOG_SAMPLE_CHAT', default=0.1, cast=float),
+}
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'formatters': {
-        'verbose': {
-            'format': '{levelname} {asctime} {module} {process:d} {thread:d} {message}',
-            'style': '{',
+        'json': {
+            '()': 'vendor_hub.log.JsonFormatter',
         },
         'simple': {
             'format': '{levelname} {message}',
             'style': '{',
         },
     },
+    'filters': {
+        'context': {
+            '()': 'vendor_hub.log.ContextFilter',
+        },
+        'sampling': {
+            '()': 'vendor_hub.log.SamplingFilter',
+            'rates': LOG_SAMPLING,
+        },
+        'redact': {
+            '()': 'vendor_hub.log.RedactingFilter',
+            'max_length': 200,
+        },
+    },
     'handlers': {
+        'console': {
+            'level': 'DEBUG',
+            'class': 'logging.StreamHandler',
+            'formatter': 'simple',
+        },
         'file': {
             'level': 'INFO',
             'class': 'logging.FileHandler',
             'filename': BASE_DIR / 'logs' / 'django.log',
-            'formatter': 'verbose',
+            'formatter': 'json',
         },
-        'console': {
-            'level': 'DEBUG',
-            'class': 'logging.StreamHandler',
-            'formatter': 'simple',
+        # Must sort after the handlers it feeds. Built with '()' rather than 'class':
+        # on Python 3.12+ dictConfig treats 'handlers' on a QueueHandler class itself
+        'queue': {
+            '()': 'vendor_hub.log.QueueListenerHandler',
+            'handlers': ['cfg://handlers.console', 'cfg://handlers.file'],
+            'filters': ['context', 'sampling', 'redact'],
         },
     },
     'root': {
-        'handlers': ['console', 'file'],
+        'handlers': ['queue'],
         'level': 'INFO',
     },
     'loggers': {
         'django': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
         'vendors': {
-            'handlers': ['console', 'file'],
-            'level': 'DEBUG',
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
             'propagate': False,
         },
     },
-}
\ No newline at end of file
+}
@@ -0,0 +1,109 @@
+"""Booking analytics (GET analytics/bookings/) from daily rollups.
+
+BookingDailyRollup holds one row per vendor, day and status with the number of
+bookings created that day and their summed amount. apply_rollup_changes() keeps
+it in step with the same (old, new) booking snapshots that drive VendorStats,
+so a chart over any window groups at most a few rows per day in the database
+(Trunc to day/week/month) instead of scanning the bookings table; two years of
+weekly data is a few hundred rows. Queryset update()/delete() on bookings
+bypass it, as they do VendorStats; rebuild_booking_rollups recomputes it.
+Rollup rows record when they last changed, which is what the platform-wide
+cube (vendors/cube.py) refreshes from.
+"""
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, Sum
+from django.db.models.functions import Trunc, TruncDate
+from django.utils import timezone
+
+from .models import BookingDailyRollup, BookingDetails
+
+INTERVALS = ('day', 'week', 'month')
+CENT = Decimal('0.01')
+
+
+def rollup_key(snapshot):
+    vendor_id, status, amount, created_at = snapshot
+    return (vendor_id, timezone.localdate(created_at), status), Decimal(str(amount or 0))
+
+
+def apply_rollup_changes(changes):
+    """Move the daily rollups from each booking snapshot ``old`` to ``new`` (None for create/delete)"""
+    deltas = {}
+    for old, new in changes:
+        if old == new:
+            continue
+        for snapshot, sign in ((old, -1), (new, 1)):
+            if snapshot is None:
+                continue
+            key, amount = rollup_key(snapshot)
+            bookings, revenue = deltas.get(key, (0, 0))
+            deltas[key] = (bookings + sign, revenue + sign * amount)
+
+    now = timezone.now()
+    for (vendor_id, date, status), (bookings, revenue) in deltas.items():
+        if not bookings and not revenue:
+            continue
+        rows = BookingDailyRollup.objects.filter(vendor_id=vendor_id, date=date, status=status)
+        update = {'bookings': F('bookings') + bookings, 'revenue': F('revenue') + revenue, 'updated_at': now}
+        if rows.update(**update):
+            continue
+        try:
+            with transaction.atomic():
+                BookingDailyRollup.objects.create(
+                    vendor_id=vendor_id, date=date, status=status, bookings=bookings, revenue=revenue, updated_at=now
+                )
+        except IntegrityError:
+            # Another transaction created the row first
+            rows.update(**update)
+
+
+def compute_rollups(vendor_ids=None):
+    """BookingDailyRollup rows (unsaved) aggregated from the bookings table"""
+    bookings = BookingDetails.objects.all()
+    if vendor_ids is not None:
+        bookings = bookings.filter(vendor_id__in=vendor_ids)
+    rows = bookings.annotate(day=TruncDate('created_at')).values('vendor_id', 'day', 'status').annotate(
+        count=Count('id'), total=Sum('amount'),
+    ).order_by()
+    return [
+        BookingDailyRollup(vendor_id=row['vendor_id'], date=row['day'], status=row['status'],
+                           bookings=row['count'], revenue=row['total'] or 0)
+        for row in rows
+    ]
+
+
+def measures(bookings, revenue):
+    revenue = Decimal(revenue or 0).quantize(CENT)
+    average = (revenue / bookings).quantize(CENT) if bookings else Decimal(0)
+    return {'count': bookings, 'revenue': revenue, 'average_value': average}
+
+
+def booking_series(vendor, start, end, interval='day'):
+    """Count, revenue and average value per ``interval`` and status for bookings created from ``start`` to ``end``.
+
+    Periods are labelled with their first day (Monday for weeks); the first and
+    last only cover the part inside the window. Periods without bookings are
+    left out.
+    """
+    rows = BookingDailyRollup.objects.filter(
+        vendor=vendor, date__range=(start, end), bookings__gt=0
+    ).annotate(
+        period=Trunc('date', interval, output_field=DateField())
+    ).values('period', 'status').annotate(
+        count=Sum('bookings'), total=Sum('revenue'),
+    ).order_by('period', 'status')
+    return [
+        {'period': row['period'], 'status': row['status'], **measures(row['count'], row['total'])}
+        for row in rows
+    ]
+
+
+def booking_totals(series):
+    """Count, revenue and average value per status over a booking_series()"""
+    sums = {status: [0, Decimal(0)] for status, _ in BookingDetails.STATUS_CHOICES}
+    for point in series:
+        sums[point['status']][0] += point['count']
+        sums[point['status']][1] += point['revenue']
+    return {status: measures(bookings, revenue) for status, (bookings, revenue) in sums.items()}
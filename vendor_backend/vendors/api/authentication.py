@@ -0,0 +1,43 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from ..presence import touch
+
+
+class PresenceJWTAuthentication(JWTAuthentication):
+    """JWT authentication that counts every authenticated request as a presence heartbeat"""
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            touch(result[0].pk)
+        return result
+
+
+class QueryStringJWTAuthMiddleware(BaseMiddleware):
+    """Websocket authentication from ``?token=<access token>``, as browsers can't set headers on websockets.
+
+    A valid token replaces ``scope['user']``; a missing or bad one leaves whatever
+    the session middleware found (usually AnonymousUser).
+    """
+
+    async def __call__(self, scope, receive, send):
+        token = parse_qs(scope.get('query_string', b'').decode()).get('token')
+        if token:
+            user = await self.authenticate(token[0])
+            if user is not None:
+                scope = dict(scope, user=user)
+        return await super().__call__(scope, receive, send)
+
+    @database_sync_to_async
+    def authenticate(self, raw_token):
+        authentication = JWTAuthentication()
+        try:
+            return authentication.get_user(authentication.get_validated_token(raw_token))
+        except (InvalidToken, TokenError, AuthenticationFailed):
+            return None
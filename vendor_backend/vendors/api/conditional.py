@@ -0,0 +1,66 @@
+import hashlib
+
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from ..models import UserDetails, VendorService
+from ..presence import is_online
+
+
+class ConditionalGetMixin:
+    """Answer GET with 304 Not Modified before serializing anything.
+
+    Views return from get_version() a tuple of cheap values (timestamps, counts)
+    that changes whenever the representation would, read with a single aggregate
+    query; its hash is a weak ETag. get_last_modified() is optional and only
+    worth giving where a deletion can't hide behind an older timestamp.
+    get_version() returning None (e.g. no such object) skips the check.
+    """
+
+    def get_version(self):
+        raise NotImplementedError
+
+    def get_last_modified(self, version):
+        return None
+
+    def get(self, request, *args, **kwargs):
+        version = self.get_version()
+        if version is None:
+            return super().get(request, *args, **kwargs)
+
+        etag = 'W/' + quote_etag(hashlib.sha256(repr((request.user.pk,) + tuple(version)).encode()).hexdigest()[:32])
+        last_modified = self.get_last_modified(version)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(timestamp)
+            # Private to this vendor, and always revalidated rather than reused blindly
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+def services_version(services):
+    """(latest update, count, latest image processing) of a VendorService queryset"""
+    return tuple(services.aggregate(
+        updated=Max('updated_at'), count=Count('pk'), images=Max('image_asset__processed_at')
+    ).values())
+
+
+def vendor_version(vendor_id):
+    """Everything VendorProfileSerializer shows for one vendor changes one of these values"""
+    active = VendorService.objects.filter(user=OuterRef('pk'), is_active=True).order_by().values('user')
+    row = UserDetails.objects.filter(pk=vendor_id).annotate(
+        services_updated=Subquery(active.annotate(value=Max('updated_at')).values('value')),
+        services_count=Subquery(active.annotate(value=Count('pk')).values('value')),
+        services_images=Subquery(active.annotate(value=Max('image_asset__processed_at')).values('value')),
+    ).values_list(
+        'updated_at', 'profile__updated_at', 'profile__profile_image_asset__processed_at',
+        'verification__is_verified', 'services_updated', 'services_count', 'services_images',
+    ).first()
+    # Presence lives in the cache, not in any row
+    return row and row + (is_online(vendor_id),)
@@ -0,0 +1,217 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination that seeks on the ordering columns instead of using OFFSET.
+
+    The cursor holds the ordering values of the last (or first) row of a page and
+    the next page is fetched with ``WHERE (a, id) > (:a, :id)``, so page 1000 costs
+    the same as page 1 and rows inserted meanwhile never shift or repeat a page.
+    ``ordering`` must end with a unique column. A queryset that is already ordered
+    by something ending in ``id`` (e.g. search rank) keeps its own ordering.
+    """
+    ordering = ('-created_at', '-id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    # Serve the last page first (chat history: newest messages, oldest first)
+    start_at_end = False
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self):
+        self.page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 20
+        self.max_page_size = settings.API_MAX_PAGE_SIZE
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_ordering(self, queryset):
+        ordering = tuple(str(field) for field in queryset.query.order_by)
+        if ordering and ordering[-1].lstrip('-') in ('id', 'pk'):
+            return ordering
+        return self.ordering
+
+    def encode_cursor(self, position, forward):
+        payload = json.dumps({'p': position, 'f': forward}, separators=(',', ':'), default=str)
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, not self.start_at_end
+        try:
+            return self.read_cursor(json.loads(base64.urlsafe_b64decode(encoded.encode()).decode()))
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def read_cursor(self, payload):
+        position = payload['p']
+        if not isinstance(position, list) or len(position) != len(self.fields):
+            raise ValueError
+        return [self.to_python(name, value) for (name, _), value in zip(self.fields, position)], bool(payload['f'])
+
+    def to_python(self, name, value):
+        try:
+            return self.model._meta.get_field(name).to_python(value)
+        except FieldDoesNotExist:
+            # Annotations such as search_rank round-trip through JSON as-is
+            return value
+
+    def get_position(self, instance):
+        return [getattr(instance, 'pk' if name == 'pk' else name) for name, _ in self.fields]
+
+    def seek_filter(self, position, forward):
+        """Rows strictly after ``position`` in ``self.fields`` order (before, when not ``forward``)"""
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self.fields, position):
+            lookup = 'lt' if descending == forward else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def use_queryset(self, queryset):
+        self.model = queryset.model
+        self.fields = [(field.lstrip('-'), field.startswith('-')) for field in self.get_ordering(queryset)]
+
+    def page_queryset(self, queryset, position, forward, limit):
+        """``queryset`` limited to ``limit`` rows after ``position`` (before, when not ``forward``), nearest first"""
+        order_by = [f'-{name}' if descending == forward else name for name, descending in self.fields]
+        queryset = queryset.order_by(*order_by)
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(position, forward))
+        return queryset[:limit]
+
+    def fetch(self, queryset, position, forward, limit):
+        return list(self.page_queryset(queryset, position, forward, limit))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_queryset(queryset)
+        self.base_url = remove_query_param(request.build_absolute_uri(), self.cursor_query_param)
+        page_size = self.get_page_size(request)
+        position, forward = self.decode_cursor(request)
+
+        rows = self.fetch(queryset, position, forward, page_size + 1)
+        # Everything the page depended on, look-ahead row included (see vendors/listing_cache.py)
+        self.row_ids = [row.pk for row in rows]
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if not forward:
+            rows.reverse()
+
+        # Coming from a cursor guarantees rows on the side we came from
+        more_after = has_more if forward else position is not None
+        more_before = position is not None if forward else has_more
+        self.next = self.previous = None
+        if rows and more_after:
+            self.next = self.encode_cursor(self.get_position(rows[-1]), True)
+        if rows and more_before:
+            self.previous = self.encode_cursor(self.get_position(rows[0]), False)
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.next),
+            ('previous', self.previous),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class BookingPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
+
+
+class ChatMessagePagination(KeysetPagination):
+    ordering = ('timestamp', 'id')
+    start_at_end = True
+
+
+class ChainedKeysetPagination(KeysetPagination):
+    """Keyset pagination over a list of querysets read one after the other.
+
+    Each queryset must be ordered by columns ending in ``id``, which an index
+    should serve. A page that runs off the end of one queryset continues at the
+    start of the next, so it costs one query per queryset it spans. Cursors
+    also record which queryset the boundary row came from.
+    """
+
+    def encode_segment_cursor(self, segment, row, forward):
+        self.segment = segment
+        self.use_queryset(self.querysets[segment])
+        return self.encode_cursor(self.get_position(row), forward)
+
+    def encode_cursor(self, position, forward):
+        payload = json.dumps({'s': self.segment, 'p': position, 'f': forward}, separators=(',', ':'), default=str)
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def read_cursor(self, payload):
+        segment = payload['s']
+        if not isinstance(segment, int) or not 0 <= segment < len(self.querysets):
+            raise ValueError
+        self.segment = segment
+        self.use_queryset(self.querysets[segment])
+        return super().read_cursor(payload)
+
+    def paginate_queryset(self, querysets, request, view=None):
+        self.querysets = list(querysets)
+        self.base_url = remove_query_param(request.build_absolute_uri(), self.cursor_query_param)
+        page_size = self.get_page_size(request)
+        self.segment = len(self.querysets) - 1 if self.start_at_end else 0
+        position, forward = self.decode_cursor(request)
+        from_cursor = position is not None
+
+        rows, segment, step = [], self.segment, 1 if forward else -1
+        while 0 <= segment < len(self.querysets) and len(rows) <= page_size:
+            self.use_queryset(self.querysets[segment])
+            rows += [(segment, row) for row in self.fetch(self.querysets[segment], position, forward,
+                                                          page_size + 1 - len(rows))]
+            segment, position = segment + step, None
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if not forward:
+            rows.reverse()
+
+        more_after = has_more if forward else from_cursor
+        more_before = from_cursor if forward else has_more
+        self.next = self.previous = None
+        if rows and more_after:
+            self.next = self.encode_segment_cursor(*rows[-1], True)
+        if rows and more_before:
+            self.previous = self.encode_segment_cursor(*rows[0], False)
+        return [row for _, row in rows]
+
+
+class ConversationPagination(ChainedKeysetPagination):
+    """The chat sidebar: a vendor's conversations, then everyone else (vendors.chat.sidebar_querysets)"""
+
+
+class VendorPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
+    # The marketplace has always sent ?limit=
+    page_size_query_param = 'limit'
@@ -0,0 +1,12 @@
+from django.conf import settings
+from rest_framework import permissions
+
+
+class IsPlatformAdmin(permissions.BasePermission):
+    """Operations staff: the accounts listed in ANALYTICS['ADMIN_EMAILS']"""
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not (user and user.is_authenticated):
+            return False
+        return user.email.lower() in {email.lower() for email in settings.ANALYTICS['ADMIN_EMAILS']}
@@ -1,7 +1,40 @@
+import logging
+from datetime import timedelta
+
 from rest_framework import serializers
-from django.contrib.auth import authenticate
+from django.conf import settings
 from django.db import models
-from ..models import UserDetails, BookingDetails, VendorChat, VerificationDetails, CalendarEvent, ProfileDetails, VendorService
+from django.db.models import Prefetch
+from django.utils import timezone
+from ..models import UserDetails, BookingDetails, VendorChat, VerificationDetails, CalendarEvent, ProfileDetails, VendorService, UploadSession
+from ..analytics import INTERVALS
+from ..cube import DIMENSIONS, GRAINS
+from ..images import attach_image, image_payload
+from ..media import signed_media_url
+from ..presence import is_online, online_vendor_ids
+from ..uploads import SIGNATURES, extension
+
+logger = logging.getLogger(__name__)
+
+
+class PresenceField(serializers.Field):
+    """Vendor presence from the cache; PresenceListSerializer looks up a whole page at once"""
+
+    def __init__(self, **kwargs):
+        super().__init__(source='*', read_only=True, **kwargs)
+
+    def to_representation(self, vendor):
+        online_ids = self.context.get('online_ids')
+        if online_ids is None:
+            return is_online(vendor.pk)
+        return vendor.pk in online_ids
+
+
+class PresenceListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        vendors = list(data.all() if isinstance(data, models.Manager) else data)
+        self.context['online_ids'] = online_vendor_ids([vendor.pk for vendor in vendors])
+        return super().to_representation(vendors)
 
 class VendorRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
@@ -19,6 +52,8 @@ class VendorRegistrationSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         password = validated_data.pop('password')
+        # vendor_register hashes on the password pool and passes the result to save()
+        password_hash = validated_data.pop('password_hash', None)
         services_str = validated_data.pop('services', '')
         email = validated_data.pop('email')
         
@@ -33,10 +68,10 @@ class VendorRegistrationSerializer(serializers.ModelSerializer):
             validated_data['experience_level'] = 'Beginner'
         
         # Extract profile fields from request data
-        location = self.context['request'].data.get('location', '')
-        city = self.context['request'].data.get('city', '')
-        state = self.context['request'].data.get('state', '')
-        pincode = self.context['request'].data.get('pincode', '')
+        location = self.initial_data.get('location', '')
+        city = self.initial_data.get('city', '')
+        state = self.initial_data.get('state', '')
+        pincode = self.initial_data.get('pincode', '')
         
         # Create user
         user = UserDetails(
@@ -44,7 +79,10 @@ class VendorRegistrationSerializer(serializers.ModelSerializer):
             email=email,
             **validated_data
         )
-        user.set_password(password)
+        if password_hash:
+            user.password = password_hash
+        else:
+            user.set_password(password)
         user.save()
         
         # Create profile
@@ -69,67 +107,70 @@ class VendorRegistrationSerializer(serializers.ModelSerializer):
         return vendor
 
 class VendorLoginSerializer(serializers.Serializer):
+    """Shape of a login request; vendor_login checks the credentials off-thread"""
     email = serializers.EmailField()
     password = serializers.CharField()
-    
-    def validate(self, data):
-        email = data.get('email')
-        password = data.get('password')
-        
-        if email and password:
-            vendor = authenticate(username=email, password=password)
-            if vendor and vendor.is_active:
-                data['vendor'] = vendor
-                return data
-            else:
-                raise serializers.ValidationError('Invalid credentials')
-        else:
-            raise serializers.ValidationError('Email and password required')
 
 class VendorProfileSerializer(serializers.ModelSerializer):
+    is_online = PresenceField()
     is_verified = serializers.SerializerMethodField()
     services = serializers.SerializerMethodField()
     location = serializers.SerializerMethodField()
     city = serializers.SerializerMethodField()
     profile_image = serializers.SerializerMethodField()
+    profile_image_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = UserDetails
         fields = ['id', 'email', 'full_name', 'mobile', 'business', 'experience_level', 
-                 'is_online', 'is_verified', 'services', 'location', 'city', 'profile_image', 'created_at']
+                 'is_online', 'is_verified', 'services', 'location', 'city', 'profile_image',
+                 'profile_image_variants', 'created_at']
         read_only_fields = ['id', 'email', 'created_at']
+        list_serializer_class = PresenceListSerializer
+    
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Load everything the serializer reads in a fixed number of queries"""
+        return queryset.select_related('profile__profile_image_asset', 'verification').prefetch_related(
+            Prefetch(
+                'services',
+                queryset=VendorService.objects.filter(is_active=True).select_related('image_asset'),
+                to_attr='active_services'
+            )
+        )
+    
+    def _get_profile(self, obj):
+        # Reverse one-to-one raises when the row is missing; select_related caches that too
+        return getattr(obj, 'profile', None)
     
     def get_is_verified(self, obj):
-        try:
-            verification = VerificationDetails.objects.filter(user=obj).first()
-            return verification.is_verified if verification else False
-        except:
-            return False
+        verification = getattr(obj, 'verification', None)
+        return verification.is_verified if verification else False
     
     def get_location(self, obj):
-        try:
-            return obj.profile.location if hasattr(obj, 'profile') and obj.profile.location else None
-        except:
-            return None
+        profile = self._get_profile(obj)
+        return profile.location if profile and profile.location else None
     
     def get_city(self, obj):
-        try:
-            return obj.profile.city if hasattr(obj, 'profile') and obj.profile.city else None
-        except:
-            return None
+        profile = self._get_profile(obj)
+        return profile.city if profile and profile.city else None
     
     def get_profile_image(self, obj):
-        try:
-            if hasattr(obj, 'profile') and obj.profile.profile_image:
-                return obj.profile.profile_image.url
-            return None
-        except:
-            return None
+        variants = self.get_profile_image_variants(obj)
+        return variants['src'] if variants else None
+    
+    def get_profile_image_variants(self, obj):
+        profile = self._get_profile(obj)
+        return image_payload(profile.profile_image, profile.profile_image_asset) if profile else None
     
     def get_services(self, obj):
-        vendor_services = VendorService.objects.filter(user=obj, is_active=True)
+        vendor_services = getattr(obj, 'active_services', None)
+        if vendor_services is None:
+            # Single instances that did not go through setup_eager_loading
+            vendor_services = VendorService.objects.filter(user=obj, is_active=True).select_related('image_asset')
         services_data = []
         for service in vendor_services:
+            image = image_payload(service.image, service.image_asset)
             service_data = {
                 'id': service.id,
                 'service_name': service.service_name,
@@ -140,10 +181,11 @@ class VendorProfileSerializer(serializers.ModelSerializer):
                 'minimum_people': service.minimum_people,
                 'maximum_people': service.maximum_people,
                 'description': service.description,
-                'image': service.image.url if service.image else None,
+                'image': image['src'] if image else None,
+                'image_variants': image,
                 'is_active': service.is_active
             }
-            print(f"Service: {service.service_name}, Price: {service.service_price}, Data: {service_data}")
+            logger.debug("Serialized service %s for vendor %s", service.pk, obj.pk)
             services_data.append(service_data)
         return services_data
 
@@ -159,6 +201,20 @@ class BookingStatusUpdateSerializer(serializers.ModelSerializer):
         model = BookingDetails
         fields = ['status']
 
+class BookingStatusChangeSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=BookingDetails.STATUS_CHOICES)
+    expected_status = serializers.ChoiceField(choices=BookingDetails.STATUS_CHOICES, required=False)
+
+class BookingBulkStatusSerializer(serializers.Serializer):
+    changes = BookingStatusChangeSerializer(many=True, allow_empty=False, max_length=500)
+
+    def validate_changes(self, changes):
+        ids = [change['id'] for change in changes]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError('Each booking may appear only once.')
+        return changes
+
 class VendorChatSerializer(serializers.ModelSerializer):
     sender_name = serializers.CharField(source='sender.full_name', read_only=True)
     receiver_name = serializers.CharField(source='receiver.full_name', read_only=True)
@@ -170,33 +226,96 @@ class VendorChatSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'sender', 'timestamp']
 
 class VendorListSerializer(serializers.ModelSerializer):
+    """Chat sidebar entry; expects vendors from vendors.chat.sidebar_entries"""
+    is_online = PresenceField()
     last_message = serializers.SerializerMethodField()
+    unread_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = UserDetails
-        fields = ['id', 'full_name', 'business', 'is_online', 'last_message']
+        fields = ['id', 'full_name', 'business', 'is_online', 'last_message', 'unread_count']
+        list_serializer_class = PresenceListSerializer
     
     def get_last_message(self, obj):
-        current_vendor = self.context['request'].user
-        last_msg = VendorChat.objects.filter(
-            models.Q(sender=current_vendor, receiver=obj) | 
-            models.Q(sender=obj, receiver=current_vendor)
-        ).order_by('-timestamp').first()
+        if obj.last_message_at is None:
+            return None
         
-        if last_msg:
-            return {
-                'message': last_msg.message,
-                'timestamp': last_msg.timestamp,
-                'is_read': last_msg.is_read
-            }
-        return None
+        # The last message is read once its receiver has no unread messages left
+        sent_by_me = obj.last_sender_id != obj.id
+        return {
+            'message': obj.last_message_text,
+            'timestamp': obj.last_message_at,
+            'is_read': (obj.their_unread_count if sent_by_me else obj.unread_count) == 0
+        }
+
+class SignedMediaField(serializers.FileField):
+    """A private file as a short-lived signed URL (see vendors/media.py)"""
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        url = signed_media_url(value.name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
 
 class VerificationSerializer(serializers.ModelSerializer):
+    aadhaar_document = SignedMediaField()
+    pan_document = SignedMediaField()
+
     class Meta:
         model = VerificationDetails
         fields = ['id', 'aadhaar_document', 'pan_document', 'status', 'submitted_at', 'reviewed_at']
         read_only_fields = ['id', 'status', 'submitted_at', 'reviewed_at']
 
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Starts a chunked verification upload and reports how far it has got"""
+    offset = serializers.IntegerField(source='received', read_only=True)
+    max_chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'field', 'filename', 'size', 'offset', 'max_chunk_size', 'created_at']
+        read_only_fields = ['id', 'created_at']
+
+    def get_max_chunk_size(self, obj):
+        return settings.CHUNKED_UPLOADS['MAX_CHUNK_SIZE']
+
+    def validate_filename(self, value):
+        if extension(value) not in SIGNATURES:
+            raise serializers.ValidationError(f"File type not allowed. Allowed types: {', '.join(SIGNATURES)}")
+        return value
+
+    def validate_size(self, value):
+        max_size = settings.CHUNKED_UPLOADS['MAX_SIZE']
+        if not 0 < value <= max_size:
+            raise serializers.ValidationError(f'Size must be between 1 and {max_size} bytes.')
+        return value
+
+class VerificationCompleteSerializer(serializers.Serializer):
+    """Names the finished upload sessions to attach; the first submission needs both documents"""
+    aadhaar_document = serializers.UUIDField(required=False)
+    pan_document = serializers.UUIDField(required=False)
+
+    def validate(self, attrs):
+        user = self.context['request'].user
+        if not attrs:
+            raise serializers.ValidationError('Name at least one completed upload.')
+        missing = {'aadhaar_document', 'pan_document'} - set(attrs)
+        if missing and not VerificationDetails.objects.filter(user=user).exists():
+            raise serializers.ValidationError({field: ['Required for the first submission.'] for field in missing})
+
+        sessions = UploadSession.objects.in_bulk(list(attrs.values()))
+        errors = {}
+        for field, pk in attrs.items():
+            session = sessions.get(pk)
+            if session is None or session.user_id != user.pk or session.field != field:
+                errors[field] = ['No such upload for this document.']
+            elif session.received != session.size:
+                errors[field] = [f'Upload incomplete: {session.received} of {session.size} bytes received.']
+        if errors:
+            raise serializers.ValidationError(errors)
+        return {field: sessions[pk] for field, pk in attrs.items()}
+
 class CalendarEventSerializer(serializers.ModelSerializer):
     class Meta:
         model = CalendarEvent
@@ -205,15 +324,55 @@ class CalendarEventSerializer(serializers.ModelSerializer):
 
 class VendorServiceSerializer(serializers.ModelSerializer):
     category = serializers.CharField(required=False)
+    image_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = VendorService
-        fields = ['id', 'service_name', 'category', 'service_price', 'minimum_people', 'maximum_people', 'description', 'image', 'is_active', 'created_at', 'updated_at']
+        fields = ['id', 'service_name', 'category', 'service_price', 'minimum_people', 'maximum_people', 'description', 'image', 'image_variants', 'is_active', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
         extra_kwargs = {
             'service_name': {'required': False},
             'category': {'required': False}
         }
+    
+    def get_image_variants(self, obj):
+        return image_payload(obj.image, obj.image_asset)
+    
+    def create(self, validated_data):
+        upload = validated_data.pop('image', None)
+        service = super().create(validated_data)
+        if upload:
+            attach_image(service, 'image', 'image_asset', upload)
+        return service
+    
+    def update(self, instance, validated_data):
+        upload = validated_data.pop('image', None)
+        service = super().update(instance, validated_data)
+        if upload:
+            attach_image(service, 'image', 'image_asset', upload)
+        return service
+
+class VendorServiceUpsertSerializer(serializers.ModelSerializer):
+    """One row of a bulk catalog upsert; omitted fields are reset to their defaults"""
+    category = serializers.CharField(required=False, allow_blank=True)
+
+    class Meta:
+        model = VendorService
+        fields = ['service_name', 'category', 'service_price', 'minimum_people', 'maximum_people', 'description', 'is_active']
+
+class VendorServiceBulkSerializer(serializers.Serializer):
+    services = VendorServiceUpsertSerializer(many=True, allow_empty=False, max_length=500)
+
+    def validate_services(self, services):
+        # Errors line up with the rows, like the per-row field errors
+        seen, errors = set(), []
+        for service in services:
+            name = service['service_name']
+            errors.append({'service_name': ['Duplicate service name in this request.']} if name in seen else {})
+            seen.add(name)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return services
 
 class DashboardStatsSerializer(serializers.Serializer):
     total_bookings = serializers.IntegerField()
@@ -221,4 +380,60 @@ class DashboardStatsSerializer(serializers.Serializer):
     in_progress_bookings = serializers.IntegerField()
     completed_bookings = serializers.IntegerField()
     total_revenue = serializers.DecimalField(max_digits=10, decimal_places=2)
-    monthly_revenue = serializers.DecimalField(max_digits=10, decimal_places=2)
\ No newline at end of file
+    monthly_revenue = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+class BookingAnalyticsQuerySerializer(serializers.Serializer):
+    interval = serializers.ChoiceField(choices=INTERVALS, default='day')
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        # Defaults to the last 30 days
+        end = attrs.setdefault('end', timezone.localdate())
+        start = attrs.setdefault('start', end - timedelta(days=29))
+        if start > end:
+            raise serializers.ValidationError({'start': ['Must not be after end.']})
+        return attrs
+
+class BookingAnalyticsPointSerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    average_value = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+class BookingSeriesPointSerializer(BookingAnalyticsPointSerializer):
+    period = serializers.DateField()
+    status = serializers.CharField()
+
+def split_values(value):
+    return list(dict.fromkeys(part.strip() for part in value.split(',') if part.strip()))
+
+class BookingCubeQuerySerializer(serializers.Serializer):
+    MONTH_FORMATS = ['%Y-%m', 'iso-8601']
+    FILTERS = ('category', 'city', 'status')
+
+    group_by = serializers.CharField(required=False, default='')
+    grain = serializers.ChoiceField(choices=GRAINS, default='month')
+    start = serializers.DateField(required=False, input_formats=MONTH_FORMATS)
+    end = serializers.DateField(required=False, input_formats=MONTH_FORMATS)
+    category = serializers.CharField(required=False, default='')
+    city = serializers.CharField(required=False, default='')
+    status = serializers.CharField(required=False, default='')
+
+    def validate_group_by(self, value):
+        dimensions = split_values(value)
+        unknown = [dimension for dimension in dimensions if dimension not in DIMENSIONS]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown dimension {', '.join(unknown)}; choose from {', '.join(DIMENSIONS)}."
+            )
+        return dimensions
+
+    def validate(self, attrs):
+        # Months are whole: any day of a month stands for the month
+        for bound in ('start', 'end'):
+            if attrs.get(bound):
+                attrs[bound] = attrs[bound].replace(day=1)
+        if attrs.get('start') and attrs.get('end') and attrs['start'] > attrs['end']:
+            raise serializers.ValidationError({'start': ['Must not be after end.']})
+        attrs['filters'] = {dimension: split_values(attrs.pop(dimension)) for dimension in self.FILTERS}
+        return attrs
@@ -3,7 +3,7 @@ from . import views
 
 urlpatterns = [
     # Authentication
-    path('auth/register/', views.VendorRegistrationView.as_view(), name='vendor-register'),
+    path('auth/register/', views.vendor_register, name='vendor-register'),
     path('auth/check-email/', views.check_email_exists, name='check-email'),
     path('auth/login/', views.vendor_login, name='vendor-login'),
     path('auth/logout/', views.vendor_logout, name='vendor-logout'),
@@ -11,9 +11,12 @@ urlpatterns = [
     
     # Dashboard
     path('dashboard/stats/', views.dashboard_stats, name='dashboard-stats'),
+    path('analytics/bookings/', views.booking_analytics, name='booking-analytics'),
+    path('analytics/cube/', views.booking_cube, name='booking-cube'),
     
     # Bookings
     path('bookings/', views.BookingListView.as_view(), name='booking-list'),
+    path('bookings/bulk-status/', views.bulk_update_booking_status, name='booking-bulk-status'),
     path('bookings/<int:pk>/status/', views.BookingStatusUpdateView.as_view(), name='booking-status-update'),
     
     # Chat
@@ -23,9 +26,13 @@ urlpatterns = [
     
     # Verification
     path('verification/', views.VerificationView.as_view(), name='verification'),
+    path('verification/uploads/', views.start_verification_upload, name='verification-uploads'),
+    path('verification/uploads/<uuid:pk>/', views.verification_upload_detail, name='verification-upload-detail'),
+    path('verification/complete/', views.complete_verification_upload, name='verification-complete'),
     
     # Services
     path('services/', views.VendorServicesListView.as_view(), name='services-list'),
+    path('services/bulk/', views.bulk_upsert_services, name='services-bulk'),
     path('services/<int:pk>/', views.VendorServiceDetailView.as_view(), name='service-detail'),
     
     # Calendar
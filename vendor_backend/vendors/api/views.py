@@ -1,57 +1,115 @@
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ParseError
+from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.db.models import Q, Sum
+from django.db.models import Q
+from django.http import HttpResponse
 from django.utils import timezone
 from datetime import datetime, timedelta
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.utils.html import escape
+from asgiref.sync import sync_to_async
+import functools
 import logging
 
 logger = logging.getLogger(__name__)
-from ..models import UserDetails, BookingDetails, VendorChat, VerificationDetails, CalendarEvent, VendorService, ProfileDetails
+from ..models import UserDetails, BookingDetails, VendorChat, VerificationDetails, CalendarEvent, VendorService, ProfileDetails, UploadSession, BookingCubeRefresh
+from ..analytics import booking_series, booking_totals
+from ..bookings import bulk_update_status
+from ..catalog import upsert_services
+from ..chat import mark_conversation_read, record_message, sidebar_entries, sidebar_querysets
+from ..cube import query_cube
+from ..images import attach_image
+from .. import listing_cache
+from ..locations import filter_by_location, normalize_places
+from ..passwords import HashingBusy, aauthenticate_vendor, amake_password
+from ..presence import mark_offline, touch
+from ..search import search_vendors, tokenize
+from ..stats import get_dashboard_stats
+from ..uploads import UploadConflict, complete_uploads, discard, write_chunk
+from .conditional import ConditionalGetMixin, services_version, vendor_version
+from .pagination import BookingPagination, ChatMessagePagination, ConversationPagination, VendorPagination
+from .permissions import IsPlatformAdmin
 from .serializers import (
     VendorRegistrationSerializer, VendorLoginSerializer, VendorProfileSerializer,
-    BookingSerializer, BookingStatusUpdateSerializer, VendorChatSerializer,
+    BookingSerializer, BookingStatusUpdateSerializer, BookingBulkStatusSerializer, VendorChatSerializer,
     VendorListSerializer, VerificationSerializer, CalendarEventSerializer,
-    DashboardStatsSerializer, VendorServiceSerializer
+    DashboardStatsSerializer, VendorServiceSerializer, VendorServiceBulkSerializer,
+    UploadSessionSerializer, VerificationCompleteSerializer,
+    BookingAnalyticsQuerySerializer, BookingAnalyticsPointSerializer, BookingSeriesPointSerializer,
+    BookingCubeQuerySerializer
 )
 
-class VendorRegistrationView(generics.CreateAPIView):
-    queryset = UserDetails.objects.all()
-    serializer_class = VendorRegistrationSerializer
-    permission_classes = [permissions.AllowAny]
-    
-    def create(self, request, *args, **kwargs):
+def _render(data, status_code=status.HTTP_200_OK, headers=None):
+    """DRF Response for the async views below, rendered the way APIView would"""
+    response = Response(data, status=status_code, headers=headers)
+    response.accepted_renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    response.accepted_media_type = response.accepted_renderer.media_type
+    response.renderer_context = {}
+    return response
+
+def async_post_view(view):
+    """POST-only, CSRF-exempt async view; DRF's APIView can only run sync views,
+    which under ASGI share one thread with every other sync view"""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'POST':
+            return _render({'detail': f'Method "{request.method}" not allowed.'},
+                           status.HTTP_405_METHOD_NOT_ALLOWED, headers={'Allow': 'POST'})
         try:
-            logger.info("API: Vendor registration attempt")
-            logger.info(f"API: Registration data: {request.data}")
-            
-            serializer = self.get_serializer(data=request.data)
-            if not serializer.is_valid():
-                logger.warning(f"API: Registration validation failed: {serializer.errors}")
-                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-            
-            vendor = serializer.save()
-            logger.info(f"API: Vendor created successfully: {vendor.email}")
-            
-            refresh = RefreshToken.for_user(vendor)
-            response_data = {
-                'vendor': VendorProfileSerializer(vendor).data,
-                'refresh': str(refresh),
-                'access': str(refresh.access_token),
-            }
-            logger.info(f"API: Registration response vendor data: {response_data['vendor']}")
-            
-            return Response(response_data, status=status.HTTP_201_CREATED)
-        except ValidationError as e:
-            logger.error(f"API: Validation error during registration: {e}")
-            return Response({'error': 'Invalid data provided'}, status=status.HTTP_400_BAD_REQUEST)
-        except Exception as e:
-            logger.error(f"API: Unexpected error during registration: {e}")
-            return Response({'error': 'Registration failed'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            request = Request(request, parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES])
+            request.data  # Parse up front so a malformed body is a 400, as with APIView
+        except ParseError as e:
+            return _render({'detail': e.detail}, status.HTTP_400_BAD_REQUEST)
+        try:
+            return await view(request, *args, **kwargs)
+        except HashingBusy:
+            logger.warning("API: Password hashing pool saturated")
+            return _render({'error': 'Server busy, please retry'}, status.HTTP_503_SERVICE_UNAVAILABLE,
+                           headers={'Retry-After': '1'})
+    wrapper.csrf_exempt = True
+    return wrapper
+
+def _auth_response(vendor):
+    # Runs in a worker thread: serializing the profile touches the database
+    refresh = RefreshToken.for_user(vendor)
+    return {
+        'vendor': VendorProfileSerializer(vendor).data,
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+    }
+
+@async_post_view
+async def vendor_register(request):
+    try:
+        logger.info("API: Vendor registration attempt")
+        logger.debug("API: Registration data", extra={'payload': request.data})
+
+        serializer = VendorRegistrationSerializer(data=request.data)
+        if not await sync_to_async(serializer.is_valid)():
+            logger.warning("API: Registration validation failed", extra={'errors': serializer.errors})
+            return _render(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+        password_hash = await amake_password(serializer.validated_data['password'])
+        vendor = await sync_to_async(serializer.save)(password_hash=password_hash)
+        logger.info("API: Vendor created successfully: %s", vendor.pk)
+
+        response_data = await sync_to_async(_auth_response)(vendor)
+        logger.debug("API: Registration response vendor data", extra={'payload': response_data['vendor']})
+
+        return _render(response_data, status.HTTP_201_CREATED)
+    except HashingBusy:
+        raise
+    except ValidationError as e:
+        logger.error("API: Validation error during registration: %s", e)
+        return _render({'error': 'Invalid data provided'}, status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        logger.exception("API: Unexpected error during registration")
+        return _render({'error': 'Registration failed'}, status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
@@ -63,51 +121,49 @@ def check_email_exists(request):
     exists = UserDetails.objects.filter(email=email).exists()
     return Response({'exists': exists})
 
-@api_view(['POST'])
-@permission_classes([permissions.AllowAny])
-def vendor_login(request):
-    logger.info(f"API: Login attempt for email: {request.data.get('email')}")
-    
+@async_post_view
+async def vendor_login(request):
+    logger.debug("API: Login attempt", extra={'payload': {'email': request.data.get('email')}})
+
     serializer = VendorLoginSerializer(data=request.data)
-    serializer.is_valid(raise_exception=True)
-    
-    vendor = serializer.validated_data['vendor']
-    vendor.is_online = True
-    vendor.save()
-    
-    logger.info(f"API: Login successful for vendor: {vendor.email}")
-    
-    refresh = RefreshToken.for_user(vendor)
-    response_data = {
-        'vendor': VendorProfileSerializer(vendor).data,
-        'refresh': str(refresh),
-        'access': str(refresh.access_token),
-    }
-    logger.info(f"API: Login response vendor data: {response_data['vendor']}")
-    
-    return Response(response_data)
+    if not serializer.is_valid():
+        return _render(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+    vendor = await aauthenticate_vendor(request, **serializer.validated_data)
+    if vendor is None:
+        return _render({api_settings.NON_FIELD_ERRORS_KEY: ['Invalid credentials']}, status.HTTP_400_BAD_REQUEST)
+    await sync_to_async(touch)(vendor.pk, force=True)
+
+    logger.info("API: Login successful for vendor: %s", vendor.pk)
+
+    response_data = await sync_to_async(_auth_response)(vendor)
+    logger.debug("API: Login response vendor data", extra={'payload': response_data['vendor']})
+
+    return _render(response_data)
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def vendor_logout(request):
-    vendor = request.user
-    vendor.is_online = False
-    vendor.save()
+    mark_offline(request.user.pk)
     return Response({'message': 'Logged out successfully'})
 
-class VendorProfileView(generics.RetrieveUpdateAPIView):
+class VendorProfileView(ConditionalGetMixin, generics.RetrieveUpdateAPIView):
     serializer_class = VendorProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
         return self.request.user
     
+    def get_version(self):
+        return vendor_version(self.request.user.pk)
+    
     def retrieve(self, request, *args, **kwargs):
         vendor = self.get_object()
         if not vendor:
             return Response({'error': 'No vendor found'}, status=status.HTTP_400_BAD_REQUEST)
         
-        logger.info(f"Profile retrieved for vendor: {vendor.email}")
+        vendor = VendorProfileSerializer.setup_eager_loading(UserDetails.objects.all()).get(pk=vendor.pk)
+        logger.debug("Profile retrieved for vendor: %s", vendor.pk)
         serializer = self.get_serializer(vendor)
         return Response(serializer.data)
     
@@ -119,8 +175,10 @@ class VendorProfileView(generics.RetrieveUpdateAPIView):
         # Handle profile image upload
         if 'profile_image' in request.FILES:
             profile, created = ProfileDetails.objects.get_or_create(user=vendor)
-            profile.profile_image = request.FILES['profile_image']
-            profile.save()
+            try:
+                attach_image(profile, 'profile_image', 'profile_image_asset', request.FILES['profile_image'])
+            except ValidationError as e:
+                return Response({'profile_image': e.messages}, status=status.HTTP_400_BAD_REQUEST)
             
             # Return updated profile data
             serializer = self.get_serializer(vendor)
@@ -140,37 +198,53 @@ def dashboard_stats(request):
     if not vendor:
         return Response({'error': 'No vendor found'}, status=status.HTTP_400_BAD_REQUEST)
         
-    bookings = BookingDetails.objects.filter(vendor=vendor)
-    
-    total_bookings = bookings.count()
-    pending_bookings = bookings.filter(status='pending').count()
-    in_progress_bookings = bookings.filter(status='in_progress').count()
-    completed_bookings = bookings.filter(status='completed').count()
-    
-    total_revenue = bookings.filter(status='completed').aggregate(
-        total=Sum('amount'))['total'] or 0
-    
-    current_month = timezone.now().replace(day=1)
-    monthly_revenue = bookings.filter(
-        status='completed',
-        created_at__gte=current_month
-    ).aggregate(total=Sum('amount'))['total'] or 0
-    
-    stats = {
-        'total_bookings': total_bookings,
-        'pending_bookings': pending_bookings,
-        'in_progress_bookings': in_progress_bookings,
-        'completed_bookings': completed_bookings,
-        'total_revenue': total_revenue,
-        'monthly_revenue': monthly_revenue,
-    }
+    stats = get_dashboard_stats(vendor)
     
     serializer = DashboardStatsSerializer(stats)
     return Response(serializer.data)
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def booking_analytics(request):
+    query = BookingAnalyticsQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    params = query.validated_data
+
+    series = booking_series(request.user, params['start'], params['end'], params['interval'])
+    totals = booking_totals(series)
+    return Response({
+        'interval': params['interval'],
+        'start': params['start'],
+        'end': params['end'],
+        'series': BookingSeriesPointSerializer(series, many=True).data,
+        'totals': {status: BookingAnalyticsPointSerializer(point).data for status, point in totals.items()},
+    })
+
+@api_view(['GET'])
+@permission_classes([IsPlatformAdmin])
+def booking_cube(request):
+    query = BookingCubeQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    params = query.validated_data
+
+    group_by = params['group_by']
+    rows = query_cube(group_by, params['grain'], params.get('start'), params.get('end'), params['filters'])
+    state = BookingCubeRefresh.objects.filter(pk=1).first()
+    return Response({
+        'group_by': group_by,
+        'grain': params['grain'],
+        # Bookings changed after this may not be in the cube yet
+        'as_of': state.high_water if state else None,
+        'results': [
+            {**{dimension: row[dimension] for dimension in group_by}, **BookingAnalyticsPointSerializer(row).data}
+            for row in rows
+        ],
+    })
+
 class BookingListView(generics.ListAPIView):
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = BookingPagination
     
     def get_queryset(self):
         return BookingDetails.objects.filter(vendor=self.request.user).order_by('-created_at')
@@ -182,30 +256,49 @@ class BookingStatusUpdateView(generics.UpdateAPIView):
     def get_queryset(self):
         return BookingDetails.objects.filter(vendor=self.request.user)
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_update_booking_status(request):
+    # Accept a bare list of changes as well as {"changes": [...]}
+    data = {'changes': request.data} if isinstance(request.data, list) else request.data
+    serializer = BookingBulkStatusSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+    results = bulk_update_status(request.user, serializer.validated_data['changes'])
+    logger.info("API: Bulk status update for vendor %s: %d changes", request.user.pk, len(results))
+    return Response({'results': results})
+
 class VendorListForChatView(generics.ListAPIView):
     serializer_class = VendorListSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ConversationPagination
     
     def get_queryset(self):
-        return UserDetails.objects.exclude(id=self.request.user.id)
+        # A list of querysets, read in turn by ConversationPagination
+        return sidebar_querysets(self.request.user)
+    
+    def paginate_queryset(self, queryset):
+        return sidebar_entries(super().paginate_queryset(queryset), self.request.user)
 
 class ChatMessagesView(generics.ListCreateAPIView):
     serializer_class = VendorChatSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ChatMessagePagination
     
     def get_queryset(self):
         vendor_id = self.kwargs['vendor_id']
         
         return VendorChat.objects.filter(
             Q(receiver_id=vendor_id) | Q(sender_id=vendor_id)
-        ).order_by('timestamp')
+        ).select_related('sender', 'receiver').order_by('timestamp')
     
     def perform_create(self, serializer):
         vendor_id = self.kwargs['vendor_id']
-        serializer.save(
-            sender=self.request.user,
-            receiver_id=vendor_id
-        )
+        with transaction.atomic():
+            message = serializer.save(
+                sender=self.request.user,
+                receiver_id=vendor_id
+            )
+            record_message(message)
 
 @api_view(['PUT'])
 @permission_classes([permissions.IsAuthenticated])
@@ -215,6 +308,7 @@ def mark_messages_read(request, vendor_id):
         receiver=request.user,
         is_read=False
     ).update(is_read=True)
+    mark_conversation_read(request.user.id, vendor_id)
     
     return Response({'message': 'Messages marked as read'})
 
@@ -231,7 +325,7 @@ class VerificationView(generics.CreateAPIView, generics.RetrieveAPIView):
             if not vendor:
                 return Response({'error': 'No vendor found'}, status=status.HTTP_400_BAD_REQUEST)
             
-            logger.info(f"Verification submission for vendor: {vendor.email}")
+            logger.info("Verification submission for vendor: %s", vendor.pk)
             
             # Check if verification already exists
             existing_verification = VerificationDetails.objects.filter(user=vendor).first()
@@ -241,7 +335,7 @@ class VerificationView(generics.CreateAPIView, generics.RetrieveAPIView):
                 serializer.is_valid(raise_exception=True)
                 verification = serializer.save(status='approved', is_verified=True)
                 
-                logger.info(f"Updated existing verification for vendor: {vendor.email}, status: approved")
+                logger.info("Updated existing verification for vendor: %s, status: approved", vendor.pk)
                 return Response(VerificationSerializer(verification).data, status=status.HTTP_200_OK)
             
             # Create new verification with approved status and is_verified=True
@@ -249,50 +343,83 @@ class VerificationView(generics.CreateAPIView, generics.RetrieveAPIView):
             serializer.is_valid(raise_exception=True)
             verification = serializer.save(user=vendor, status='approved', is_verified=True)
             
-            logger.info(f"Created new verification for vendor: {vendor.email}, status: approved")
+            logger.info("Created new verification for vendor: %s, status: approved", vendor.pk)
             return Response(VerificationSerializer(verification).data, status=status.HTTP_201_CREATED)
         except Exception as e:
-            logger.error(f"Verification error: {e}")
+            logger.exception("Verification error")
             return Response({'error': 'Verification failed'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def start_verification_upload(request):
+    serializer = UploadSessionSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    session = serializer.save(user=request.user)
+    logger.info("Started %s upload %s for vendor %s (%d bytes)", session.field, session.pk, request.user.pk, session.size)
+    return Response(UploadSessionSerializer(session).data, status=status.HTTP_201_CREATED)
+
+@api_view(['GET', 'PUT', 'DELETE'])
+@permission_classes([permissions.IsAuthenticated])
+def verification_upload_detail(request, pk):
+    session = generics.get_object_or_404(UploadSession, pk=pk, user=request.user)
+    if request.method == 'PUT':
+        # Read request.stream directly: touching request.data would buffer the chunk
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        try:
+            write_chunk(session, request.stream, request.headers.get('Content-Range'), content_length)
+        except UploadConflict as e:
+            return Response({'error': 'Chunk does not start at the current offset', 'offset': e.offset},
+                            status=status.HTTP_409_CONFLICT)
+    elif request.method == 'DELETE':
+        discard(session)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(UploadSessionSerializer(session).data)
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def complete_verification_upload(request):
+    serializer = VerificationCompleteSerializer(data=request.data, context={'request': request})
+    serializer.is_valid(raise_exception=True)
+    try:
+        verification = complete_uploads(request.user, serializer.validated_data)
+    except UploadConflict as e:
+        return Response({'error': 'Upload was lost; send it again from the start',
+                         'upload': str(e.session.pk), 'offset': e.offset}, status=status.HTTP_409_CONFLICT)
+    logger.info("Completed chunked verification upload for vendor: %s", request.user.pk)
+    return Response(VerificationSerializer(verification).data)
+
 class CalendarEventsView(generics.ListCreateAPIView):
     serializer_class = CalendarEventSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return CalendarEvent.objects.filter(vendor=self.request.user)
+        return CalendarEvent.objects.filter(vendor=self.request.user).order_by('event_date')
     
     def perform_create(self, serializer):
         serializer.save(vendor=self.request.user)
 
-class VendorServicesListView(generics.ListCreateAPIView):
+class VendorServicesListView(ConditionalGetMixin, generics.ListCreateAPIView):
     serializer_class = VendorServiceSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return VendorService.objects.filter(user=self.request.user)
+        return VendorService.objects.filter(user=self.request.user).select_related('image_asset')
     
-    def list(self, request, *args, **kwargs):
-        logger.info(f"SERVICE LIST REQUEST - User: {request.user.email}")
-        queryset = self.get_queryset()
-        logger.info(f"Found {queryset.count()} services for user")
-        for service in queryset:
-            logger.info(f"Service: {service.service_name}, Price: {service.service_price}")
-        return super().list(request, *args, **kwargs)
+    def get_version(self):
+        return services_version(VendorService.objects.filter(user=self.request.user))
     
     def create(self, request, *args, **kwargs):
         try:
-            logger.info(f"SERVICE CREATE REQUEST - User: {request.user.email}")
-            logger.info(f"Request data: {request.data}")
+            logger.debug("Service create request", extra={'vendor_id': request.user.pk, 'payload': request.data})
             
             serializer = self.get_serializer(data=request.data)
             serializer.is_valid(raise_exception=True)
             service = serializer.save(user=self.request.user)
             
-            logger.info(f"Created service: {service.service_name}, Price: {service.service_price}")
+            logger.info("Created service %s for vendor %s", service.pk, request.user.pk)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         except IntegrityError as e:
-            logger.error(f"IntegrityError in service creation: {e}")
+            logger.error("IntegrityError in service creation: %s", e)
             if 'duplicate key value violates unique constraint' in str(e):
                 return Response(
                     {'error': 'Service with this name already exists for your account'}, 
@@ -303,52 +430,77 @@ class VendorServicesListView(generics.ListCreateAPIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
         except Exception as e:
-            logger.error(f"Service creation error: {e}")
+            logger.exception("Service creation error")
             return Response(
                 {'error': 'Failed to create service'}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-class VendorServiceDetailView(generics.RetrieveUpdateDestroyAPIView):
+class VendorServiceDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = VendorServiceSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return VendorService.objects.filter(user=self.request.user)
+        return VendorService.objects.filter(user=self.request.user).select_related('image_asset')
+    
+    def get_version(self):
+        return VendorService.objects.filter(user=self.request.user, pk=self.kwargs['pk']).values_list(
+            'updated_at', 'image_asset__processed_at'
+        ).first()
+    
+    def get_last_modified(self, version):
+        return max(timestamp for timestamp in version if timestamp)
     
     def update(self, request, *args, **kwargs):
         try:
-            logger.info(f"=== SERVICE UPDATE REQUEST ===")
-            logger.info(f"User: {request.user.email}")
-            logger.info(f"Service ID: {kwargs.get('pk')}")
-            logger.info(f"Request data: {request.data}")
-            logger.info(f"Request FILES: {request.FILES}")
+            logger.debug("Service update request", extra={
+                'vendor_id': request.user.pk, 'service_id': kwargs.get('pk'),
+                'payload': request.data, 'files': request.FILES,
+            })
             
             service = self.get_object()
-            logger.info(f"BEFORE UPDATE - Service: {service.service_name}, Price: {service.service_price}")
             
             # Handle image upload
             if 'image' in request.FILES:
-                service.image = request.FILES['image']
-                service.save()
-                logger.info(f"Service image updated: {service.image}")
+                try:
+                    attach_image(service, 'image', 'image_asset', request.FILES['image'])
+                except ValidationError as e:
+                    return Response({'image': e.messages}, status=status.HTTP_400_BAD_REQUEST)
+                logger.info("Service image updated: %s", service.pk)
                 return Response(VendorServiceSerializer(service).data)
             
             # Handle other updates
             serializer = self.get_serializer(service, data=request.data, partial=True)
             if not serializer.is_valid():
-                logger.error(f"Serializer validation failed: {serializer.errors}")
+                logger.warning("Service update validation failed", extra={'errors': serializer.errors})
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             
             serializer.save()
             service.refresh_from_db()
-            logger.info(f"AFTER UPDATE - Service: {service.service_name}, New Price: {service.service_price}")
+            logger.debug("Service %s updated, price %s", service.pk, service.service_price)
             
             return Response(serializer.data)
         except Exception as e:
-            logger.error(f"Service update error: {e}")
+            logger.exception("Service update error")
             return Response({'error': 'Failed to update service'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_upsert_services(request):
+    # Accept a bare list of services as well as {"services": [...]}
+    data = {'services': request.data} if isinstance(request.data, list) else request.data
+    serializer = VendorServiceBulkSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+
+    services, created = upsert_services(request.user, serializer.validated_data['services'])
+    logger.info("Upserted %d services for vendor %s (%d new)", len(services), request.user.pk, len(created))
+    return Response({
+        'results': [
+            {**VendorServiceSerializer(service).data, 'created': service.service_name in created}
+            for service in services
+        ],
+    })
+
 class CalendarEventDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = CalendarEventSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -356,25 +508,31 @@ class CalendarEventDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         return CalendarEvent.objects.filter(vendor=self.request.user)
 
-class VendorDetailView(generics.RetrieveUpdateDestroyAPIView):
+class VendorDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = VendorProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return UserDetails.objects.all()
+        return VendorProfileSerializer.setup_eager_loading(UserDetails.objects.all())
+    
+    def get_version(self):
+        return vendor_version(self.kwargs['pk'])
     
     def update(self, request, *args, **kwargs):
         try:
             vendor = self.get_object()
-            logger.info(f"Updating vendor: {vendor.email}")
+            logger.debug("Updating vendor: %s", vendor.pk)
             
             # Handle profile image upload
             if 'profile_image' in request.FILES:
                 profile, created = ProfileDetails.objects.get_or_create(user=vendor)
-                profile.profile_image = request.FILES['profile_image']
-                profile.save()
-                logger.info(f"Profile image updated for vendor: {vendor.email}")
-                return Response(VendorProfileSerializer(vendor).data)
+                try:
+                    attach_image(profile, 'profile_image', 'profile_image_asset', request.FILES['profile_image'])
+                except ValidationError as e:
+                    return Response({'profile_image': e.messages}, status=status.HTTP_400_BAD_REQUEST)
+                logger.info("Profile image updated for vendor: %s", vendor.pk)
+                # Re-fetch so the eagerly loaded profile reflects the new image
+                return Response(VendorProfileSerializer(self.get_object()).data)
             
             # Handle other profile updates
             serializer = self.get_serializer(vendor, data=request.data, partial=True)
@@ -383,45 +541,36 @@ class VendorDetailView(generics.RetrieveUpdateDestroyAPIView):
             
             return Response(serializer.data)
         except Exception as e:
-            logger.error(f"Vendor update error: {e}")
+            logger.exception("Vendor update error")
             return Response({'error': 'Failed to update vendor'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 class VendorListView(generics.ListAPIView):
     serializer_class = VendorProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = VendorPagination
+    # Cleared while rendering a page for the shared listing cache
+    exclude_viewer = True
     
     def get_queryset(self):
-        queryset = UserDetails.objects.exclude(id=self.request.user.id).prefetch_related('services', 'profile')
+        queryset = VendorProfileSerializer.setup_eager_loading(UserDetails.objects.all())
+        if self.exclude_viewer:
+            queryset = queryset.exclude(id=self.request.user.id)
         
         # Apply filters
         category = self.request.query_params.get('category')
         location = self.request.query_params.get('location')
         search = self.request.query_params.get('search')
         price_range = self.request.query_params.get('price_range')
-        limit = self.request.query_params.get('limit')
         
         if category:
             queryset = queryset.filter(business__icontains=category)
         
         if location and location != 'All':
-            # Add logging to debug location filtering
-            logger.info(f"Filtering by location: {location}")
-            queryset = queryset.filter(
-                Q(profile__city__icontains=location) | 
-                Q(profile__location__icontains=location) |
-                Q(profile__state__icontains=location) |
-                Q(verification__address__icontains=location)
-            ).distinct()
-            logger.info(f"After location filter, found {queryset.count()} vendors")
+            logger.debug("Filtering by location: %s", location)
+            queryset = filter_by_location(queryset, location)
         
         if search:
-            queryset = queryset.filter(
-                Q(full_name__icontains=search) |
-                Q(business__icontains=search) |
-                Q(services__service_name__icontains=search) |
-                Q(services__category__icontains=search) |
-                Q(services__description__icontains=search)
-            ).distinct()
+            queryset = search_vendors(queryset, search)
         
         if price_range and price_range != 'All':
             if price_range == 'Under ₹10,000':
@@ -434,20 +583,44 @@ class VendorListView(generics.ListAPIView):
                 queryset = queryset.filter(services__service_price__gt=50000)
             queryset = queryset.distinct()
         
-        # Apply limit if specified
-        if limit:
-            try:
-                limit_int = int(limit)
-                queryset = queryset[:limit_int]
-            except ValueError:
-                pass
-        
         return queryset
     
-    @property
-    def paginator(self):
-        # Disable pagination when no limit is specified (i.e., when filters are applied)
-        limit = self.request.query_params.get('limit')
-        if not limit:
-            return None
-        return super().paginator
\ No newline at end of file
+    def list(self, request, *args, **kwargs):
+        if not listing_cache.enabled() or request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+        
+        page, outcome = listing_cache.get_or_render(self.cache_params(), request.user.pk, self.render_shared_page)
+        if page is None:
+            response = super().list(request, *args, **kwargs)
+        elif isinstance(page, bytes):
+            response = HttpResponse(page, content_type=request.accepted_media_type)
+        else:
+            response = page
+        response['X-Cache'] = outcome.upper()
+        return response
+    
+    def cache_params(self):
+        """The request as get_queryset() and the paginator see it"""
+        params = self.request.query_params
+        location = params.get('location')
+        price_range = params.get('price_range')
+        return {
+            'base_url': self.request.build_absolute_uri(self.request.path),
+            'category': params.get('category') or None,
+            'location': sorted(normalize_places(location)) if location and location != 'All' else None,
+            'search': sorted(tokenize(params.get('search') or '')),
+            'price_range': price_range if price_range and price_range != 'All' else None,
+            'limit': self.paginator.get_page_size(self.request),
+            'cursor': params.get(self.paginator.cursor_query_param),
+        }
+    
+    def render_shared_page(self):
+        self.exclude_viewer = False
+        try:
+            response = super().list(self.request)
+        finally:
+            self.exclude_viewer = True
+        response.accepted_renderer = self.request.accepted_renderer
+        response.accepted_media_type = self.request.accepted_media_type
+        response.renderer_context = self.get_renderer_context()
+        return response.render(), self.paginator.row_ids
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class VendorsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'vendors'
\ No newline at end of file
+    name = 'vendors'
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,67 @@
+"""Bulk booking status changes (POST bookings/bulk-status/).
+
+The vendor's affected bookings are locked and read once, then each group of
+changes sharing a target and expected status is written with a single
+conditional UPDATE (``WHERE vendor_id = ? AND id IN (...) AND status = ?``).
+Because queryset updates bypass BookingDetails.save(), the dashboard counters
+for the whole batch are applied afterwards in one apply_booking_changes() call,
+and the vendor notifications queued in one insert.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import BookingDetails
+from .notifications import notify_booking_changes
+from .stats import apply_booking_changes
+
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+CONFLICT = 'conflict'
+NOT_FOUND = 'not_found'
+
+
+def bulk_update_status(vendor, changes):
+    """Apply ``changes`` ({id, status, expected_status?} dicts) to ``vendor``'s bookings.
+
+    Returns one {id, result, status} dict per change, in order; ``status`` is
+    the booking's status afterwards (None if the vendor has no such booking).
+    A change whose expected_status doesn't match the stored status is a conflict
+    and leaves the booking alone.
+    """
+    ids = [change['id'] for change in changes]
+    with transaction.atomic():
+        bookings = {
+            booking.pk: booking
+            for booking in BookingDetails.objects.select_for_update().filter(vendor=vendor, id__in=ids)
+            .only('id', 'vendor_id', 'status', 'amount', 'created_at', 'customer_name', 'service_type')
+        }
+
+        results, groups = [], {}
+        for change in changes:
+            booking = bookings.get(change['id'])
+            if booking is None:
+                results.append({'id': change['id'], 'result': NOT_FOUND, 'status': None})
+                continue
+            expected = change.get('expected_status')
+            if expected is not None and booking.status != expected:
+                results.append({'id': booking.pk, 'result': CONFLICT, 'status': booking.status})
+            elif booking.status == change['status']:
+                results.append({'id': booking.pk, 'result': UNCHANGED, 'status': booking.status})
+            else:
+                results.append({'id': booking.pk, 'result': UPDATED, 'status': change['status']})
+                groups.setdefault((change['status'], booking.status), []).append(booking)
+
+        now = timezone.now()
+        stats_changes, status_changes = [], []
+        for (status, previous), group in groups.items():
+            BookingDetails.objects.filter(
+                vendor=vendor, id__in=[booking.pk for booking in group], status=previous
+            ).update(status=status, updated_at=now)
+            for booking in group:
+                old = booking.stats_snapshot()
+                booking.status = status
+                stats_changes.append((old, booking.stats_snapshot()))
+                status_changes.append((booking, previous))
+        apply_booking_changes(stats_changes)
+        notify_booking_changes(status_changes)
+    return results
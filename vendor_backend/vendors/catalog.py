@@ -0,0 +1,54 @@
+"""Bulk upsert of a vendor's service catalog (POST services/bulk/).
+
+Rows are keyed on VendorService's (user, service_name) unique constraint and
+written with one INSERT ... ON CONFLICT DO UPDATE, so a 100-package menu costs
+the same handful of queries as a single service. bulk_create() skips the
+post_save signal that keeps the search document current, so the vendor is
+reindexed once afterwards.
+"""
+from django.db import connection, transaction
+
+from . import listing_cache
+from .models import VendorService
+from .search import reindex_vendors
+
+# Every row sets all of these; the image is only changed through services/<id>/
+UPSERT_FIELDS = ['category', 'service_price', 'minimum_people', 'maximum_people', 'description', 'is_active']
+
+
+def upsert_services(vendor, rows):
+    """Create or replace ``vendor``'s services from validated ``rows``.
+
+    Returns (services in row order, names that were newly created).
+    """
+    names = [row['service_name'] for row in rows]
+    with transaction.atomic():
+        existing = set(VendorService.objects.filter(user=vendor, service_name__in=names)
+                       .values_list('service_name', flat=True))
+        VendorService.objects.bulk_create(
+            [
+                VendorService(
+                    user=vendor,
+                    service_name=row['service_name'],
+                    category=row.get('category') or vendor.business,
+                    service_price=row.get('service_price'),
+                    minimum_people=row.get('minimum_people'),
+                    maximum_people=row.get('maximum_people'),
+                    description=row.get('description', ''),
+                    is_active=row.get('is_active', True),
+                )
+                for row in rows
+            ],
+            update_conflicts=True,
+            # MySQL's ON DUPLICATE KEY UPDATE takes no conflict target
+            unique_fields=['user', 'service_name'] if connection.features.supports_update_conflicts_with_target else None,
+            update_fields=UPSERT_FIELDS + ['updated_at'],
+        )
+        # Django 4.2 doesn't set primary keys on upserted objects; read the rows back
+        services = {service.service_name: service
+                    for service in VendorService.objects.filter(user=vendor, service_name__in=names)
+                    .select_related('image_asset')}
+        reindex_vendors([vendor.pk])
+        # bulk_create() sends no post_save for vendors/signals.py to act on
+        transaction.on_commit(listing_cache.invalidate)
+    return [services[name] for name in names], set(names) - existing
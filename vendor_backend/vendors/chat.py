@@ -0,0 +1,261 @@
+"""Conversation summaries for the chat sidebar.
+
+Every new VendorChat row goes through record_message(), from both
+ChatMessagesView and ChatConsumer, which keeps the pair's Conversation row
+(last message and per-side unread counts) current, along with one
+ConversationParticipant row per side. The sidebar (sidebar_querysets()) pages
+through the user's participant rows in (last_message_at, id) index order and
+then through the vendors they have never chatted with, instead of sorting
+every vendor by a joined value.
+
+persist_messages() is the batched write path used by the websocket consumer
+(see chat_buffer.py): a fixed number of queries for a whole batch of messages.
+missed_messages() serves the consumer's resume handshake.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Greatest, Least
+
+from .models import Conversation, ConversationParticipant, UserDetails, VendorChat
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_FIELDS = [
+    'last_message', 'last_message_text', 'last_message_at', 'last_sender', 'unread_for_low', 'unread_for_high',
+]
+
+
+def conversation_key(vendor_a_id, vendor_b_id):
+    return (vendor_a_id, vendor_b_id) if vendor_a_id <= vendor_b_id else (vendor_b_id, vendor_a_id)
+
+
+def unread_field(conversation, reader_id):
+    return 'unread_for_low' if conversation.vendor_low_id == reader_id else 'unread_for_high'
+
+
+def participants(pairs):
+    """ConversationParticipant rows (unsaved) for {(low, high): conversation id}"""
+    return [
+        ConversationParticipant(conversation_id=conversation_id, user_id=user_id, other_id=other_id,
+                                last_message_at=last_message_at)
+        for (low, high), (conversation_id, last_message_at) in pairs.items()
+        if low != high
+        for user_id, other_id in ((low, high), (high, low))
+    ]
+
+
+def group_by_pair(messages):
+    by_pair = {}
+    for message in messages:
+        by_pair.setdefault(conversation_key(message.sender_id, message.receiver_id), []).append(message)
+    return by_pair
+
+
+def lock_conversations(pairs):
+    """Lock the Conversation rows of ``pairs`` ((low, high) keys), creating missing ones; call in a transaction"""
+    def pair_ids():
+        # Cheap superset filter, narrowed to the batch's pairs in Python
+        candidates = Conversation.objects.filter(
+            vendor_low_id__in={low for low, _ in pairs}, vendor_high_id__in={high for _, high in pairs}
+        ).values_list('vendor_low_id', 'vendor_high_id', 'id')
+        return {(low, high): pk for low, high, pk in candidates if (low, high) in pairs}
+
+    ids = pair_ids()
+    missing = [(low, high) for low, high in pairs if (low, high) not in ids]
+    if missing:
+        Conversation.objects.bulk_create(
+            [Conversation(vendor_low_id=low, vendor_high_id=high) for low, high in missing], ignore_conflicts=True
+        )
+        ids = pair_ids()
+        ConversationParticipant.objects.bulk_create(
+            participants({pair: (ids[pair], None) for pair in missing}), ignore_conflicts=True
+        )
+    return list(Conversation.objects.select_for_update().filter(id__in=ids.values()).order_by('id'))
+
+
+def fold_messages(conversations, by_pair):
+    """Apply the new messages in ``by_pair`` to the locked ``conversations`` and their participant rows"""
+    changed = []
+    for conversation in conversations:
+        pair_messages = by_pair.get((conversation.vendor_low_id, conversation.vendor_high_id))
+        if not pair_messages:
+            continue
+        for message in pair_messages:
+            if conversation.last_message_at is None or (message.timestamp, message.pk) > (
+                conversation.last_message_at, conversation.last_message_id or 0
+            ):
+                conversation.last_message = message
+                conversation.last_message_text = message.message
+                conversation.last_message_at = message.timestamp
+                conversation.last_sender_id = message.sender_id
+            field = unread_field(conversation, message.receiver_id)
+            setattr(conversation, field, getattr(conversation, field) + 1)
+        changed.append(conversation)
+    if not changed:
+        return
+    Conversation.objects.bulk_update(changed, SUMMARY_FIELDS)
+    ConversationParticipant.objects.filter(conversation_id__in=[conversation.pk for conversation in changed]).update(
+        last_message_at=Subquery(Conversation.objects.filter(pk=OuterRef('conversation_id')).values('last_message_at'))
+    )
+
+
+def record_messages(messages):
+    """Fold newly created VendorChat rows into their Conversation summaries.
+
+    Takes a fixed number of queries however many pairs the batch touches: create
+    any missing rows, lock them all, then one bulk UPDATE of the conversations and
+    one of their participant rows.
+    """
+    by_pair = group_by_pair(messages)
+    if not by_pair:
+        return
+    with transaction.atomic():
+        fold_messages(lock_conversations(by_pair), by_pair)
+
+
+def record_message(message):
+    record_messages([message])
+
+
+def persist_messages(messages):
+    """Insert unsaved VendorChat objects (uid already set) with one bulk INSERT.
+
+    Messages whose uid is already stored, e.g. a client resending after a lost
+    ack, are skipped, so replays never duplicate rows or unread counts. The
+    pairs' Conversation rows are locked before the uids are checked, so a resend
+    persisted concurrently by another worker waits for the first insert and is
+    then skipped instead of being counted twice. Messages naming an unknown
+    sender or receiver are dropped (and logged) rather than failing the whole
+    batch. Returns the messages that are now stored, which includes replays that
+    were already there.
+    """
+    vendor_ids = {message.sender_id for message in messages} | {message.receiver_id for message in messages}
+    with transaction.atomic():
+        known = set(UserDetails.objects.filter(id__in=vendor_ids).values_list('id', flat=True))
+        stored = []
+        for message in messages:
+            if message.sender_id not in known or message.receiver_id not in known:
+                logger.warning('Dropping chat message %s: unknown vendor %s -> %s',
+                               message.uid, message.sender_id, message.receiver_id)
+                continue
+            stored.append(message)
+        if not stored:
+            return stored
+        conversations = lock_conversations(group_by_pair(stored))
+
+        # A locking read: sees rows committed while we waited for the locks, even under REPEATABLE READ
+        existing = set(VendorChat.objects.select_for_update().filter(
+            uid__in=[message.uid for message in stored]
+        ).values_list('uid', flat=True))
+        fresh = list({message.uid: message for message in stored if message.uid not in existing}.values())
+        VendorChat.objects.bulk_create(fresh, ignore_conflicts=True)
+        ids = dict(VendorChat.objects.filter(uid__in=[message.uid for message in fresh]).values_list('uid', 'id'))
+        for message in fresh:
+            message.pk = ids[message.uid]
+        fold_messages(conversations, group_by_pair(fresh))
+    return stored
+
+
+def missed_messages(vendor_id, after_uid=None, after=None, limit=500):
+    """Messages to or from ``vendor_id`` that a reconnecting client has not seen, oldest first.
+
+    The cursor is the uid of the last message the client received, or failing
+    that the timestamp it was sent at. Returns ``(messages, since)`` with up to
+    ``limit + 1`` messages, so callers can tell whether more remain, and the
+    cursor timestamp; or None when the cursor can't be resolved.
+    """
+    last = VendorChat.objects.filter(uid=after_uid).values('timestamp', 'id').first() if after_uid else None
+    messages = VendorChat.objects.filter(Q(sender_id=vendor_id) | Q(receiver_id=vendor_id))
+    if last is not None:
+        since = last['timestamp']
+        messages = messages.filter(Q(timestamp__gt=since) | Q(timestamp=since, id__gt=last['id']))
+    elif after is not None:
+        # Ties on the timestamp are replayed; clients drop ids they already have
+        since = after
+        messages = messages.filter(timestamp__gte=since)
+        if after_uid:
+            messages = messages.exclude(uid=after_uid)
+    else:
+        return None
+    return list(messages.order_by('timestamp', 'id')[:limit + 1]), since
+
+
+def mark_conversation_read(reader_id, other_id):
+    low, high = conversation_key(reader_id, other_id)
+    field = 'unread_for_low' if reader_id == low else 'unread_for_high'
+    Conversation.objects.filter(vendor_low_id=low, vendor_high_id=high).update(**{field: 0})
+
+
+def sidebar_querysets(user):
+    """The chat sidebar of ``user`` as querysets listed one after the other (ChainedKeysetPagination):
+    their conversations, most recent first, then every vendor they have not chatted with, newest first.
+    """
+    entries = ConversationParticipant.objects.filter(user=user)
+    return [
+        entries.select_related('other', 'conversation').order_by('-last_message_at', '-id'),
+        UserDetails.objects.exclude(id=user.pk).exclude(id__in=entries.values('other_id')).order_by('-id'),
+    ]
+
+
+def sidebar_entries(rows, user):
+    """The vendors behind a page of sidebar_querysets() rows, with the summary VendorListSerializer reads:
+    last_message_text, last_message_at, last_sender_id, unread_count (messages waiting for ``user``) and
+    their_unread_count.
+    """
+    vendors = []
+    for row in rows:
+        if isinstance(row, ConversationParticipant):
+            vendor, conversation = row.other, row.conversation
+            mine = unread_field(conversation, user.pk)
+            theirs = 'unread_for_high' if mine == 'unread_for_low' else 'unread_for_low'
+            vendor.last_message_text = conversation.last_message_text
+            vendor.last_message_at = conversation.last_message_at
+            vendor.last_sender_id = conversation.last_sender_id
+            vendor.unread_count = getattr(conversation, mine)
+            vendor.their_unread_count = getattr(conversation, theirs)
+        else:
+            vendor = row
+            vendor.last_message_text, vendor.last_message_at, vendor.last_sender_id = '', None, None
+            vendor.unread_count = vendor.their_unread_count = 0
+        vendors.append(vendor)
+    return vendors
+
+
+def rebuild_conversations():
+    """Recreate every Conversation row, and their participant rows, from the VendorChat table"""
+    pairs = VendorChat.objects.annotate(
+        low=Least('sender_id', 'receiver_id'),
+        high=Greatest('sender_id', 'receiver_id'),
+    ).values('low', 'high').annotate(
+        last_id=Max('id'),
+        unread_for_low=Count('id', filter=Q(is_read=False, receiver_id=F('low'))),
+        unread_for_high=Count('id', filter=Q(is_read=False, receiver_id=F('high')) & ~Q(receiver_id=F('low'))),
+    ).order_by()
+
+    with transaction.atomic():
+        Conversation.objects.all().delete()
+        pairs = list(pairs)
+        messages = VendorChat.objects.in_bulk([pair['last_id'] for pair in pairs])
+        conversations = []
+        for pair in pairs:
+            last = messages[pair['last_id']]
+            conversations.append(Conversation(
+                vendor_low_id=pair['low'],
+                vendor_high_id=pair['high'],
+                last_message=last,
+                last_message_text=last.message,
+                last_message_at=last.timestamp,
+                last_sender_id=last.sender_id,
+                unread_for_low=pair['unread_for_low'],
+                unread_for_high=pair['unread_for_high'],
+            ))
+        Conversation.objects.bulk_create(conversations, batch_size=1000)
+        ConversationParticipant.objects.bulk_create(participants({
+            (low, high): (pk, last_message_at)
+            for low, high, pk, last_message_at in Conversation.objects.values_list(
+                'vendor_low_id', 'vendor_high_id', 'id', 'last_message_at'
+            )
+        }), batch_size=1000)
+    return len(conversations)
@@ -0,0 +1,118 @@
+"""Write-behind buffer for websocket chat messages.
+
+With CHAT_PERSISTENCE['MODE'] = 'write_behind' the ChatConsumer broadcasts a
+message as soon as it has a uid and timestamp and then hands it to the
+process-wide buffer returned by get_buffer(). The buffer writes everything
+pending through persist_messages() once FLUSH_BATCH_SIZE messages are queued
+or FLUSH_INTERVAL seconds after the first one, whichever comes first. It is
+also flushed when a socket disconnects and, synchronously, at interpreter exit.
+
+A failed flush puts the batch back at the head of the queue and retries on the
+next trigger. Senders using ACK='persisted' only hear about a message after its
+batch has committed, so a client that resends anything unacked after a crash
+gets at-least-once delivery; persist_messages() drops the duplicates by uid.
+"""
+import asyncio
+import atexit
+import logging
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+
+from .chat import persist_messages
+
+logger = logging.getLogger(__name__)
+
+
+class ChatWriteBuffer:
+    def __init__(self, batch_size, interval):
+        self.batch_size = batch_size
+        self.interval = interval
+        # (VendorChat, on_persisted) pairs; on_persisted is an async callable taking uids
+        self.pending = []
+        self.in_flight = []
+        self._timer = None
+        self._tasks = set()
+
+    def add(self, message, on_persisted=None):
+        self.pending.append((message, on_persisted))
+        if len(self.pending) >= self.batch_size:
+            self._schedule(0)
+        elif self._timer is None:
+            self._schedule(self.interval)
+
+    def _schedule(self, delay):
+        self._cancel_timer()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._start_flush)
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _start_flush(self):
+        self._timer = None
+        task = asyncio.ensure_future(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self):
+        """Write every pending message in one batch and ack the senders"""
+        self._cancel_timer()
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        self.in_flight.append(batch)
+        try:
+            stored = await database_sync_to_async(persist_messages)([message for message, _ in batch])
+        except Exception:
+            logger.exception('Chat flush of %d messages failed; retrying', len(batch))
+            self.pending[:0] = batch
+            self._schedule(self.interval)
+            return
+        finally:
+            self.in_flight.remove(batch)
+        await self._ack(batch, {message.uid for message in stored})
+
+    async def _ack(self, batch, stored_uids):
+        by_callback = {}
+        for message, on_persisted in batch:
+            if on_persisted is not None and message.uid in stored_uids:
+                by_callback.setdefault(on_persisted, []).append(message.uid)
+        for on_persisted, uids in by_callback.items():
+            try:
+                await on_persisted(uids)
+            except Exception:
+                # The socket went away; the client resends whatever it never saw acked
+                logger.debug('Could not ack %d chat messages', len(uids), exc_info=True)
+
+    def buffered_for(self, vendor_id):
+        """Messages to or from ``vendor_id`` that may not be committed yet"""
+        return [
+            message for batch in [*self.in_flight, self.pending] for message, _ in batch
+            if vendor_id in (message.sender_id, message.receiver_id)
+        ]
+
+    def flush_sync(self):
+        """Last-chance flush at shutdown, outside the event loop"""
+        self._cancel_timer()
+        messages = [message for batch in [*self.in_flight, self.pending] for message, _ in batch]
+        self.pending = []
+        if not messages:
+            return
+        try:
+            persist_messages(messages)
+        except Exception:
+            logger.exception('Lost %d buffered chat messages at shutdown', len(messages))
+
+
+_buffer = None
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        config = settings.CHAT_PERSISTENCE
+        _buffer = ChatWriteBuffer(config['FLUSH_BATCH_SIZE'], config['FLUSH_INTERVAL'])
+        atexit.register(_buffer.flush_sync)
+    return _buffer
@@ -1,12 +1,48 @@
 import json
+import uuid
+from datetime import timezone as dt_timezone
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from .models import VendorChat, Vendor
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .chat import missed_messages, persist_messages
+from .chat_buffer import get_buffer
+from .presence import touch
+from .models import VendorChat
+
+
+def parse_client_id(value):
+    """Use the client's message id when it is a UUID so resends are deduplicated"""
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return uuid.uuid4()
+
+
+def message_payload(chat):
+    return {
+        'id': str(chat.uid) if chat.uid else None,
+        'timestamp': chat.timestamp.isoformat(),
+        'message': chat.message,
+        'sender_id': chat.sender_id,
+        'receiver_id': chat.receiver_id,
+    }
+
 
 class ChatConsumer(AsyncWebsocketConsumer):
+    room_group_name = None
+
     async def connect(self):
-        self.vendor_id = self.scope['url_route']['kwargs']['vendor_id']
+        vendor_id = self.scope['url_route']['kwargs']['vendor_id']
+        if not vendor_id.isdecimal():
+            await self.close()
+            return
+        self.vendor_id = int(vendor_id)
         self.room_group_name = f'chat_{self.vendor_id}'
+        self.persistence = settings.CHAT_PERSISTENCE
+        # Live events that arrive while a resume replay is being sent
+        self.held_events = None
 
         await self.channel_layer.group_add(
             self.room_group_name,
@@ -14,8 +50,14 @@ class ChatConsumer(AsyncWebsocketConsumer):
         )
 
         await self.accept()
+        await self.heartbeat()
 
     async def disconnect(self, close_code):
+        if self.room_group_name is None:
+            return  # Rejected in connect()
+        if self.persistence['MODE'] == 'write_behind':
+            await get_buffer().flush()
+
         await self.channel_layer.group_discard(
             self.room_group_name,
             self.channel_name
@@ -23,42 +65,118 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     async def receive(self, text_data):
         text_data_json = json.loads(text_data)
-        message = text_data_json['message']
-        sender_id = text_data_json['sender_id']
-        receiver_id = text_data_json['receiver_id']
+        # Any frame, including {"type": "heartbeat"}, keeps the vendor online
+        await self.heartbeat()
+        if text_data_json.get('type') == 'heartbeat':
+            return
+        if text_data_json.get('type') == 'resume':
+            await self.resume(text_data_json)
+            return
+
+        chat = VendorChat(
+            uid=parse_client_id(text_data_json.get('client_id')),
+            sender_id=int(text_data_json['sender_id']),
+            receiver_id=int(text_data_json['receiver_id']),
+            message=text_data_json['message'],
+        )
+        ack = self.persistence['ACK']
+
+        if self.persistence['MODE'] == 'write_behind':
+            # Broadcast first; the buffer inserts the message with the next batch
+            await self.broadcast(chat)
+            get_buffer().add(chat, self.send_ack if ack == 'persisted' else None)
+            if ack == 'received':
+                await self.send_ack([chat.uid])
+        else:
+            stored = await self.save_messages([chat])
+            await self.broadcast(chat)
+            if ack != 'none':
+                await self.send_ack([message.uid for message in stored])
+
+    @database_sync_to_async
+    def save_messages(self, messages):
+        return persist_messages(messages)
+
+    def user_id(self):
+        """The authenticated user's id (QueryStringJWTAuthMiddleware or session), None when anonymous"""
+        user = self.scope.get('user')
+        return user.pk if user is not None and user.is_authenticated else None
 
-        # Save message to database
-        await self.save_message(sender_id, receiver_id, message)
+    @database_sync_to_async
+    def heartbeat(self):
+        # Presence belongs to whoever is signed in, not to the room in the URL
+        user_id = self.user_id()
+        if user_id is not None:
+            touch(user_id)
 
-        # Send message to room group
+    async def broadcast(self, chat):
         await self.channel_layer.group_send(
             self.room_group_name,
-            {
-                'type': 'chat_message',
-                'message': message,
-                'sender_id': sender_id,
-                'receiver_id': receiver_id,
-            }
+            {'type': 'chat_message', **message_payload(chat)}
         )
 
+    async def send_ack(self, uids):
+        if uids:
+            await self.send(text_data=json.dumps({'type': 'ack', 'ids': [str(uid) for uid in uids]}))
+
     async def chat_message(self, event):
-        message = event['message']
-        sender_id = event['sender_id']
-        receiver_id = event['receiver_id']
+        if self.held_events is not None:
+            self.held_events.append(event)
+            return
+        await self.send(text_data=json.dumps({key: value for key, value in event.items() if key != 'type'}))
+
+    async def resume(self, request):
+        """Replay messages sent since the client's last seen message, then go live.
+
+        The client sends ``{"type": "resume", "last_id": ..., "last_timestamp": ...}``
+        (either field may be omitted) and gets the missed messages, oldest first,
+        followed by ``{"type": "resumed", "complete": bool, "last_id": ...}``. While
+        ``complete`` is false it resumes again from ``last_id`` for the next page.
+        Live messages arriving during the replay are held and sent afterwards.
+        Only the vendor themself may resume; anyone else is disconnected.
+        """
+        if self.user_id() != self.vendor_id:
+            await self.close(code=4403)
+            return
+        after_uid = parse_client_id(request['last_id']) if request.get('last_id') else None
+        after = parse_datetime(request['last_timestamp']) if request.get('last_timestamp') else None
+        if after is not None and timezone.is_naive(after):
+            after = timezone.make_aware(after, dt_timezone.utc)
+        vendor_id = self.vendor_id
+        limit = settings.CHAT_RESUME_LIMIT
 
+        replayed = set()
+        self.held_events = []
+        try:
+            found = await database_sync_to_async(missed_messages)(vendor_id, after_uid, after, limit)
+            if found is None:
+                await self.send(text_data=json.dumps({'type': 'resume_failed'}))
+            else:
+                replayed = await self.replay(*found, vendor_id, after_uid, limit, request.get('last_id'))
+        finally:
+            held, self.held_events = self.held_events, None
+
+        for event in held:
+            if event['id'] not in replayed:
+                await self.chat_message(event)
+
+    async def replay(self, messages, since, vendor_id, after_uid, limit, last_id):
+        complete = len(messages) <= limit
+        messages = messages[:limit]
+        if complete and self.persistence['MODE'] == 'write_behind':
+            # Messages this process broadcast but has not flushed yet
+            seen = {message.uid for message in messages} | {after_uid}
+            messages += [
+                message for message in get_buffer().buffered_for(vendor_id)
+                if message.uid not in seen and message.timestamp >= since
+            ]
+            messages.sort(key=lambda message: message.timestamp)
+
+        for message in messages:
+            await self.send(text_data=json.dumps(message_payload(message)))
         await self.send(text_data=json.dumps({
-            'message': message,
-            'sender_id': sender_id,
-            'receiver_id': receiver_id,
+            'type': 'resumed',
+            'complete': complete,
+            'last_id': str(messages[-1].uid) if messages else last_id,
         }))
-
-    @database_sync_to_async
-    def save_message(self, sender_id, receiver_id, message):
-        sender = Vendor.objects.get(id=sender_id)
-        receiver = Vendor.objects.get(id=receiver_id)
-        
-        VendorChat.objects.create(
-            sender=sender,
-            receiver=receiver,
-            message=message
-        )
\ No newline at end of file
+        return {str(message.uid) for message in messages}
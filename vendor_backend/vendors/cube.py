@@ -0,0 +1,148 @@
+"""Platform-wide booking cube: category x city x month x status (GET analytics/cube/).
+
+BookingCubeCell holds the bookings created in a month by vendors of one
+category (UserDetails.business) in one city (ProfileDetails.city), per status,
+with their summed amount, plus the same totals over all cities, over all
+categories and over both (NULL city/category). Queries slice (one value of a
+dimension), dice (several values of several dimensions) and roll up (group by
+fewer dimensions, or months into quarters/years) over these cells only, reading
+the coarsest level that has the dimensions they use. Their cost depends on the
+number of categories, cities and months, never on the bookings table: a
+query without city reads ~10 categories x 3 statuses per month whatever the
+number of cities, and the (month, ...), (category, city, month) and (city, month)
+indexes narrow slices of the finest level.
+
+refresh() rebuilds the cells of every month with changes since the previous
+refresh's high-water mark: BookingDailyRollup rows whose updated_at moved
+(bookings created, edited or deleted) and the rollups of vendors whose
+category or city may have changed. Rollups are updated in the booking's own
+transaction, so the mark is taken back by ANALYTICS['CUBE_REFRESH_OVERLAP']
+seconds to catch late commits; rebuilding a month twice is harmless. The cube
+only reads the rollups and the two vendor tables, so the refresh never scans
+booking_details; run it from a schedule (booking_cube --refresh).
+"""
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DateField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, Trunc, TruncMonth
+from django.utils import timezone
+
+from .analytics import measures
+from .models import BookingCubeCell, BookingCubeRefresh, BookingDailyRollup, ProfileDetails, UserDetails
+
+DIMENSIONS = ('category', 'city', 'month', 'status')
+GRAINS = ('month', 'quarter', 'year')
+
+
+def refresh_state():
+    state, _ = BookingCubeRefresh.objects.get_or_create(pk=1)
+    return state
+
+
+def changed_months(since):
+    """First days of the months whose cells may differ from the rollups changed since ``since``"""
+    rollups = BookingDailyRollup.objects.annotate(month=TruncMonth('date')).order_by()
+    months = set(rollups.filter(updated_at__gte=since).values_list('month', flat=True).distinct())
+    moved = set(UserDetails.objects.filter(updated_at__gte=since).values_list('pk', flat=True))
+    moved.update(ProfileDetails.objects.filter(updated_at__gte=since).values_list('user_id', flat=True))
+    if moved:
+        months.update(rollups.filter(vendor_id__in=moved).values_list('month', flat=True).distinct())
+    return months
+
+
+def compute_cells(months=None):
+    """BookingCubeCell rows (unsaved), all levels, for ``months`` (all months if None) from the daily rollups"""
+    rollups = BookingDailyRollup.objects.filter(bookings__gt=0)
+    if months is not None:
+        in_months = Q()
+        for month in months:
+            in_months |= Q(date__gte=month, date__lt=next_month(month))
+        rollups = rollups.filter(in_months)
+    rows = rollups.annotate(
+        month=TruncMonth('date'),
+        category=F('vendor__business'),
+        city=Coalesce('vendor__profile__city', Value('')),
+    ).values('month', 'category', 'city', 'status').annotate(
+        count=Sum('bookings'), total=Sum('revenue'),
+    ).order_by()
+
+    totals = {}
+    for row in rows:
+        for category in (row['category'], None):
+            for city in (row['city'], None):
+                key = (row['month'], category, city, row['status'])
+                bookings, revenue = totals.get(key, (0, 0))
+                totals[key] = (bookings + row['count'], revenue + row['total'])
+    return [
+        BookingCubeCell(month=month, category=category, city=city, status=status, bookings=bookings, revenue=revenue)
+        for (month, category, city, status), (bookings, revenue) in totals.items()
+    ]
+
+
+def refresh(full=False):
+    """Fold rollup changes since the last refresh into the cube; returns (months rebuilt, cells written).
+
+    ``full`` (or a first refresh) rebuilds every month. Months is None for a
+    full rebuild.
+    """
+    started = timezone.now()
+    with transaction.atomic():
+        state = BookingCubeRefresh.objects.select_for_update().get(pk=refresh_state().pk)
+        months = None
+        if not full and state.high_water is not None:
+            overlap = timedelta(seconds=settings.ANALYTICS['CUBE_REFRESH_OVERLAP'])
+            months = changed_months(state.high_water - overlap)
+            if not months:
+                state.high_water = started
+                state.refreshed_at = timezone.now()
+                state.save()
+                return set(), 0
+
+        stale = BookingCubeCell.objects.all()
+        if months is not None:
+            stale = stale.filter(month__in=months)
+        stale.delete()
+        cells = BookingCubeCell.objects.bulk_create(compute_cells(months), batch_size=1000)
+
+        state.high_water = started
+        state.refreshed_at = timezone.now()
+        state.save()
+    return months, len(cells)
+
+
+def query_cube(group_by=(), grain='month', start=None, end=None, filters=None):
+    """Count, revenue and average value per combination of the ``group_by`` dimensions.
+
+    ``filters`` maps dimensions other than month to the values to keep;
+    ``start``/``end`` bound the months (inclusive). With month in ``group_by``,
+    months are rolled up to ``grain`` and labelled with the period's first month.
+    """
+    filters = {dimension: values for dimension, values in (filters or {}).items() if values}
+    used = {*group_by, *filters}
+    cells = BookingCubeCell.objects.filter(category__isnull='category' not in used, city__isnull='city' not in used)
+    if start is not None:
+        cells = cells.filter(month__gte=start)
+    if end is not None:
+        cells = cells.filter(month__lte=end)
+    for dimension, values in filters.items():
+        cells = cells.filter(**{f'{dimension}__in': values})
+
+    if not group_by:
+        row = cells.aggregate(count=Sum('bookings'), total=Sum('revenue'))
+        return [measures(row['count'] or 0, row['total'])]
+
+    fields = list(group_by)
+    if 'month' in fields and grain != 'month':
+        cells = cells.annotate(period=Trunc('month', grain, output_field=DateField()))
+        fields[fields.index('month')] = 'period'
+    rows = cells.values(*fields).annotate(count=Sum('bookings'), total=Sum('revenue')).order_by(*fields)
+    return [
+        {**{dimension: row[field] for dimension, field in zip(group_by, fields)}, **measures(row['count'], row['total'])}
+        for row in rows
+    ]
+
+
+def next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
@@ -0,0 +1,174 @@
+"""Columnar snapshot export for analysts (the export_snapshot command).
+
+Each dataset - bookings, services, vendors (with their profile) and chat
+message metadata - streams from one ordered query read with
+``.iterator(chunk_size=...)`` (a server-side cursor on PostgreSQL) into
+Parquet files partitioned by the day of the row's change cursor:
+
+    <dir>/bookings/date=2025-01-31/part-20250201T020000123456Z.parquet
+
+Rows are converted and written one chunk (one Parquet row group) at a time, so
+memory stays flat whatever the table size. Contact details, passwords,
+customer names and free text (booking descriptions, service descriptions,
+chat message bodies) are not exported.
+
+Runs are incremental: ``<dir>/_export_state.json`` records, per dataset, the
+cursor value the last run exported up to, and the next run exports rows
+changed after it. Rows changed within the last ``lag`` seconds are left for the
+next run, so a transaction that commits late with an older timestamp isn't
+skipped. Files are written under a hidden name and renamed once the whole
+dataset is exported, so readers never see a partial run; a crashed run just
+leaves hidden files that the next one removes. Deleted rows and chat read
+receipts (which don't move ``timestamp``) only show up in a full export,
+which replaces the dataset's earlier files once it has been written.
+"""
+import os
+from collections import namedtuple
+
+from django.db.models import F
+from django.db.models.functions import Coalesce, Greatest, Length
+from django.utils import timezone
+
+from .importing import read_progress, write_progress
+from .models import BookingDetails, UserDetails, VendorChat, VendorService
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional: only needed by export_snapshot
+    pa = pq = None
+
+STATE_FILE = '_export_state.json'
+
+Dataset = namedtuple('Dataset', ['queryset', 'cursor', 'columns'])
+
+
+def datasets():
+    """Dataset specs by name; columns are (name, Arrow type) in file order"""
+    timestamp = pa.timestamp('us', tz='UTC')
+    return {
+        'bookings': Dataset(BookingDetails.objects.all(), 'updated_at', [
+            ('id', pa.int64()), ('vendor_id', pa.int64()), ('service_type', pa.string()),
+            ('event_date', pa.date32()), ('amount', pa.decimal128(10, 2)), ('status', pa.string()),
+            ('location', pa.string()), ('created_at', timestamp), ('updated_at', timestamp),
+        ]),
+        'services': Dataset(VendorService.objects.all(), 'updated_at', [
+            ('id', pa.int64()), ('user_id', pa.int64()), ('service_name', pa.string()), ('category', pa.string()),
+            ('service_price', pa.decimal128(10, 2)), ('minimum_people', pa.int32()),
+            ('maximum_people', pa.int32()), ('is_active', pa.bool_()), ('created_at', timestamp),
+            ('updated_at', timestamp),
+        ]),
+        # A profile edit is a vendor change too
+        'vendors': Dataset(UserDetails.objects.annotate(
+            city=F('profile__city'), state=F('profile__state'), pincode=F('profile__pincode'),
+            changed_at=Greatest('updated_at', Coalesce('profile__updated_at', 'updated_at')),
+        ), 'changed_at', [
+            ('id', pa.int64()), ('business', pa.string()), ('experience_level', pa.string()),
+            ('is_active', pa.bool_()), ('city', pa.string()), ('state', pa.string()), ('pincode', pa.string()),
+            ('created_at', timestamp), ('changed_at', timestamp),
+        ]),
+        'chat': Dataset(VendorChat.objects.annotate(message_length=Length('message')), 'timestamp', [
+            ('id', pa.int64()), ('uid', pa.string()), ('sender_id', pa.int64()), ('receiver_id', pa.int64()),
+            ('message_length', pa.int32()), ('is_read', pa.bool_()), ('timestamp', timestamp),
+        ]),
+    }
+
+
+def read_state(directory):
+    return read_progress(os.path.join(directory, STATE_FILE)) or {}
+
+
+def write_state(directory, state):
+    write_progress(os.path.join(directory, STATE_FILE), state)
+
+
+def column_array(values, arrow_type):
+    if arrow_type == pa.string():
+        values = [None if value is None else str(value) for value in values]  # UUIDs
+    return pa.array(values, type=arrow_type)
+
+
+class PartitionedWriter:
+    """Parquet files under <root>/date=<day>/, one open at a time; rows must arrive in day order"""
+
+    def __init__(self, root, schema, run_id):
+        self.root = root
+        self.schema = schema
+        self.run_id = run_id
+        self.day = None
+        self.writer = None
+        self.pending = []  # (hidden path, final path) for commit()
+
+    def write(self, day, rows):
+        if day != self.day:
+            self.close()
+            directory = os.path.join(self.root, f'date={day.isoformat()}')
+            os.makedirs(directory, exist_ok=True)
+            name = f'part-{self.run_id}.parquet'
+            hidden = os.path.join(directory, f'.{name}')
+            self.pending.append((hidden, os.path.join(directory, name)))
+            self.writer = pq.ParquetWriter(hidden, self.schema, compression='zstd')
+            self.day = day
+        columns = [column_array(values, field.type) for values, field in zip(zip(*rows), self.schema)]
+        self.writer.write_batch(pa.RecordBatch.from_arrays(columns, schema=self.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def commit(self):
+        self.close()
+        for hidden, final in self.pending:
+            os.replace(hidden, final)
+        return [final for _, final in self.pending]
+
+
+def remove_partial_files(root):
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if name.startswith('.part-'):
+                os.remove(os.path.join(directory, name))
+
+
+def remove_other_runs(root, keep):
+    """Delete the Parquet files of earlier runs, after a full export replaced them"""
+    keep = set(keep)
+    for directory, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(directory, name)
+            if name.startswith('part-') and path not in keep:
+                os.remove(path)
+
+
+def export_dataset(name, dataset, directory, since, until, run_id, chunk_size):
+    """Write ``dataset`` rows whose cursor is in (since, until] as Parquet; returns (rows, files)"""
+    root = os.path.join(directory, name)
+    remove_partial_files(root)
+    names = [column for column, _ in dataset.columns]
+    schema = pa.schema(dataset.columns)
+    cursor_index = names.index(dataset.cursor)
+
+    rows = dataset.queryset.filter(**{f'{dataset.cursor}__lte': until})
+    if since is not None:
+        rows = rows.filter(**{f'{dataset.cursor}__gt': since})
+    rows = rows.order_by(dataset.cursor, 'pk').values_list(*names)
+
+    writer = PartitionedWriter(root, schema, run_id)
+    tz = timezone.get_current_timezone()  # Once, not per row: it's a context-local lookup
+    chunk, chunk_day, exported = [], None, 0
+    try:
+        for row in rows.iterator(chunk_size=chunk_size):
+            day = row[cursor_index].astimezone(tz).date()
+            if chunk and (day != chunk_day or len(chunk) >= chunk_size):
+                writer.write(chunk_day, chunk)
+                exported += len(chunk)
+                chunk = []
+            chunk.append(row)
+            chunk_day = day
+        if chunk:
+            writer.write(chunk_day, chunk)
+            exported += len(chunk)
+    finally:
+        writer.close()
+    return exported, writer.commit()
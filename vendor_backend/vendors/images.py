@@ -0,0 +1,167 @@
+"""Uploaded image pipeline for profile and service photos.
+
+attach_image() runs in the request: it hashes the upload while streaming it,
+stores the original once under ``images/<ab>/<sha256>.<ext>`` (a second upload of
+the same bytes writes nothing) and points the model at its ImageAsset. Resizing
+happens afterwards on a small thread pool (Pillow releases the GIL while it
+resamples): each of IMAGE_PIPELINE['WIDTHS'] narrower than the original is
+written as WebP and JPEG next to it. Until an asset is ready, serializers show
+a placeholder; see image_payload().
+
+IMAGE_PIPELINE['MODE'] = 'inline' processes before the request returns (tests,
+single-process setups). Assets left pending by a restart are picked up by the
+process_images command.
+"""
+import hashlib
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.templatetags.static import static
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import ImageAsset
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {'webp': ('WEBP', 'webp'), 'jpeg': ('JPEG', 'jpg')}
+EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+PLACEHOLDER = 'vendors/image-placeholder.svg'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_PIPELINE['WORKERS'], thread_name_prefix='image-pipeline'
+            )
+    return _executor
+
+
+def ingest(upload):
+    """The ImageAsset for ``upload``, storing the original only if these bytes are new"""
+    digest = hashlib.sha256()
+    for chunk in upload.chunks():
+        digest.update(chunk)
+    sha256 = digest.hexdigest()
+
+    asset = ImageAsset.objects.filter(pk=sha256).first()
+    if asset is not None:
+        return asset
+
+    upload.seek(0)
+    try:
+        with Image.open(upload) as image:
+            image_format, (width, height) = image.format, image.size
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise ValidationError('Upload a valid JPEG, PNG, WebP or GIF image.')
+    if image_format not in EXTENSIONS:
+        raise ValidationError('Upload a valid JPEG, PNG, WebP or GIF image.')
+
+    name = f'images/{sha256[:2]}/{sha256}.{EXTENSIONS[image_format]}'
+    if not default_storage.exists(name):
+        upload.seek(0)
+        name = default_storage.save(name, upload)
+    asset, created = ImageAsset.objects.get_or_create(
+        pk=sha256, defaults={'original': name, 'width': width, 'height': height}
+    )
+    return schedule(asset) if created else asset
+
+
+def attach_image(instance, field_name, asset_field_name, upload):
+    """Store ``upload`` and point ``instance.<field_name>`` and its asset field at it"""
+    asset = ingest(upload)
+    setattr(instance, field_name, asset.original)
+    setattr(instance, asset_field_name, asset)
+    instance.save(update_fields=[field_name, asset_field_name, 'updated_at'])
+    return asset
+
+
+def schedule(asset):
+    if settings.IMAGE_PIPELINE['MODE'] == 'inline':
+        return process_image(asset.pk)
+    # Only once the asset row is committed, or the worker may not see it
+    transaction.on_commit(lambda: _get_executor().submit(_process_in_pool, asset.pk))
+    return asset
+
+
+def _process_in_pool(sha256):
+    # Pool threads outlive any request, so nothing else closes their connections
+    close_old_connections()
+    try:
+        return process_image(sha256)
+    finally:
+        close_old_connections()
+
+
+def process_image(sha256):
+    """Write the resized variants of one asset; returns the updated asset"""
+    asset = ImageAsset.objects.get(pk=sha256)
+    config = settings.IMAGE_PIPELINE
+    try:
+        with default_storage.open(asset.original) as f, Image.open(f) as source:
+            image = ImageOps.exif_transpose(source)
+            image.load()
+        base = os.path.splitext(asset.original)[0]
+        widths = [width for width in config['WIDTHS'] if width < image.width] or [image.width]
+        variants = {}
+        for width in widths:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+            for key, (pil_format, extension) in FORMATS.items():
+                name = f'{base}/{width}.{extension}'
+                if not default_storage.exists(name):
+                    default_storage.save(name, ContentFile(encode(resized, pil_format, config['QUALITY'])))
+                variants.setdefault(key, {})[str(width)] = name
+        asset.variants = variants
+        asset.status = 'ready'
+    except Exception:
+        logger.exception("Image %s could not be processed", sha256)
+        asset.status = 'failed'
+    asset.processed_at = timezone.now()
+    asset.save(update_fields=['variants', 'status', 'processed_at'])
+    return asset
+
+
+def encode(image, pil_format, quality):
+    if pil_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, quality=quality, optimize=pil_format == 'JPEG')
+    return buffer.getvalue()
+
+
+def image_payload(file, asset):
+    """What serializers show for an image field: {src, status, srcset per format}.
+
+    ``src`` is the placeholder while the asset is pending, the largest JPEG
+    variant once it is ready, and the original for failed or legacy uploads.
+    """
+    if not file:
+        return None
+    if asset is None or asset.status == 'failed':
+        return {'src': file.url, 'status': 'original', 'srcset': {}}
+    if asset.status == 'pending':
+        return {'src': static(PLACEHOLDER), 'status': 'pending', 'srcset': {}}
+    srcset = {
+        key: ', '.join(f'{default_storage.url(name)} {width}w'
+                       for width, name in sorted(names.items(), key=lambda item: int(item[0])))
+        for key, names in asset.variants.items()
+    }
+    jpeg = asset.variants.get('jpeg', {})
+    src = default_storage.url(jpeg[max(jpeg, key=int)]) if jpeg else file.url
+    return {'src': src, 'status': 'ready', 'srcset': srcset}
@@ -0,0 +1,203 @@
+"""Bulk vendor import for partner directories (the import_vendors command).
+
+Rows stream from a CSV or JSONL file in chunks. The CPU-heavy part of a
+registration - field validation with the registration serializer's rules and
+password hashing - runs in worker processes (prepare_rows); the main process
+then writes each chunk in one transaction with a handful of statements:
+COPY on PostgreSQL, bulk_create elsewhere, followed by the batched search and
+location reindex that the post_save signals would otherwise run per row.
+
+Emails already in the database are skipped rather than rejected, so an
+interrupted import can simply be run again.
+"""
+import csv
+import io
+import json
+import os
+
+import django
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import AutoField, Q
+from rest_framework import serializers
+
+from . import listing_cache
+from .api.serializers import VendorRegistrationSerializer
+from .locations import reindex_vendor_locations
+from .models import ProfileDetails, UserDetails, VendorService
+from .search import reindex_vendors
+
+
+class VendorImportSerializer(VendorRegistrationSerializer):
+    """Registration rules for one import row; duplicate emails are checked per chunk"""
+    password = serializers.CharField(write_only=True, required=False, allow_blank=True)
+    location = serializers.CharField(required=False, allow_blank=True, max_length=255)
+    city = serializers.CharField(required=False, allow_blank=True, max_length=100)
+    state = serializers.CharField(required=False, allow_blank=True, max_length=100)
+    pincode = serializers.CharField(required=False, allow_blank=True, max_length=10)
+
+    class Meta(VendorRegistrationSerializer.Meta):
+        fields = VendorRegistrationSerializer.Meta.fields + ['location', 'city', 'state', 'pincode']
+
+    def validate_email(self, value):
+        return value
+
+    def validate_services(self, value):
+        services = [s.strip() for s in value.split(',') if s.strip()]
+        if any(len(service) > 255 for service in services):
+            raise serializers.ValidationError('Service names are limited to 255 characters.')
+        return list(dict.fromkeys(services))
+
+
+def read_rows(path):
+    """Yield (line number, row dict) from a .csv (with a header) or .jsonl file"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = line  # Rejected by validation like any other malformed row
+                if isinstance(row, dict) and isinstance(row.get('services'), list):
+                    row['services'] = ', '.join(map(str, row['services']))
+                yield line_no, row
+
+
+def init_worker():
+    # Forked workers inherit the configured app registry; spawned ones start empty
+    if not apps.ready:
+        django.setup()
+
+
+_serializer = None
+
+
+def prepare_rows(rows):
+    """Validate and hash one chunk; returns (last line, records, rejects).
+
+    Each record is the validated row with ``password`` replaced by its hash; a
+    row without a password gets an unusable one. Runs in a worker process, so
+    it must not touch the database.
+    """
+    global _serializer
+    if _serializer is None:
+        # One serializer validates every row; building its fields is the slow part
+        _serializer = VendorImportSerializer()
+    records, rejects = [], []
+    for line_no, row in rows:
+        try:
+            record = _serializer.run_validation(row)
+        except serializers.ValidationError as e:
+            email = row.get('email') if isinstance(row, dict) else None
+            rejects.append({'line': line_no, 'email': email, 'errors': e.detail})
+            continue
+        record['password'] = make_password(record.get('password') or None)
+        record['line'] = line_no
+        records.append(record)
+    return rows[-1][0], records, rejects
+
+
+def import_records(records):
+    """Insert one chunk of prepared records; returns (imported vendor ids, skipped records).
+
+    Call inside a transaction: the chunk should land completely or not at all.
+    """
+    emails = {record['email'] for record in records}
+    existing = set()
+    for email, username in UserDetails.objects.filter(
+        Q(email__in=emails) | Q(username__in=emails)
+    ).values_list('email', 'username'):
+        existing.update((email, username))
+    fresh, skipped, seen = [], [], set()
+    for record in records:
+        if record['email'] in existing or record['email'] in seen:
+            skipped.append(record)
+        else:
+            seen.add(record['email'])
+            fresh.append(record)
+    if not fresh:
+        return [], skipped
+
+    insert(UserDetails, [
+        UserDetails(
+            username=record['email'], email=record['email'], password=record['password'],
+            full_name=record['full_name'], mobile=record['mobile'], business=record['business'],
+            experience_level=record.get('experience_level', '').strip() or 'Beginner',
+        )
+        for record in fresh
+    ])
+    ids = dict(UserDetails.objects.filter(username__in=seen).values_list('username', 'id'))
+
+    insert(ProfileDetails, [
+        ProfileDetails(user_id=ids[record['email']], location=record.get('location', ''),
+                       city=record.get('city', ''), state=record.get('state', ''), pincode=record.get('pincode', ''))
+        for record in fresh
+    ])
+    insert(VendorService, [
+        VendorService(user_id=ids[record['email']], service_name=service_name, category=record['business'])
+        for record in fresh
+        for service_name in record.get('services', [])
+    ])
+
+    vendor_ids = list(ids.values())
+    reindex_vendors(vendor_ids, batch_size=len(vendor_ids))
+    reindex_vendor_locations(vendor_ids)
+    transaction.on_commit(listing_cache.invalidate)
+    return vendor_ids, skipped
+
+
+def insert(model, objs):
+    if not objs:
+        return
+    if connection.vendor == 'postgresql':
+        copy_into(model, objs)
+    else:
+        model.objects.bulk_create(objs, batch_size=1000)
+
+
+def copy_into(model, objs):
+    """PostgreSQL COPY of unsaved ``objs``, filling defaults and auto_now fields like save()"""
+    fields = [field for field in model._meta.concrete_fields if not isinstance(field, AutoField)]
+    buffer = io.StringIO()
+    for obj in objs:
+        buffer.write('\t'.join(
+            copy_value(field.get_db_prep_save(field.pre_save(obj, True), connection)) for field in fields
+        ))
+        buffer.write('\n')
+    buffer.seek(0)
+    quote = connection.ops.quote_name
+    sql = f'COPY {quote(model._meta.db_table)} ({", ".join(quote(field.column) for field in fields)}) FROM STDIN'
+    with connection.cursor() as cursor:
+        cursor.copy_expert(sql, buffer)
+
+
+def copy_value(value):
+    """One column in COPY's text format"""
+    if value is None:
+        return r'\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    text = value.isoformat() if hasattr(value, 'isoformat') else str(value)
+    return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def read_progress(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_progress(path, progress):
+    # Replace atomically so a crash never leaves a half-written file
+    with open(f'{path}.tmp', 'w') as f:
+        json.dump(progress, f)
+    os.replace(f'{path}.tmp', path)
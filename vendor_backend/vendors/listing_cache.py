@@ -0,0 +1,126 @@
+"""Shared cache of rendered marketplace listing pages (GET vendors/).
+
+Entries are keyed on the filters as VendorListView applies them (search tokens,
+location places, page size, cursor...), so ``?search=Wedding%20Photo`` and
+``?search=photo+wedding&_t=123`` share one entry, and hold the rendered JSON
+bytes. Keys embed a generation counter that every write to a vendor, profile,
+service, verification or image bumps (see vendors/signals.py), so no entry
+outlives the data it was rendered from; LISTING_CACHE['TIMEOUT'] only bounds
+how stale presence (``is_online``) can get and lets old generations expire.
+
+Pages are rendered for no one in particular: the listing normally leaves out
+the viewer's own vendor, so an entry also records which vendors its page read
+(including the look-ahead row) and a viewer among them gets a fresh, uncached
+page. On a miss, one request renders while concurrent ones for the same key
+wait up to LOCK_TIMEOUT for its result instead of all querying at once.
+
+Hits, misses, waits and bypasses are counted in the cache; the listing_cache
+command prints them.
+"""
+import hashlib
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'vendor-listing'
+GENERATION_KEY = f'{PREFIX}:generation'
+OUTCOMES = ('hit', 'miss', 'wait', 'bypass')
+POLL_INTERVAL = 0.05
+
+
+def enabled():
+    return settings.LISTING_CACHE['ENABLED']
+
+
+def generation():
+    # Seeded from the clock, so a generation key lost to eviction can't come back
+    # with a number that old entries were stored under
+    value = cache.get(GENERATION_KEY)
+    if value is None:
+        cache.add(GENERATION_KEY, time.time_ns(), None)
+        value = cache.get(GENERATION_KEY)
+    return value
+
+
+def invalidate():
+    """Make every cached listing page stale"""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, time.time_ns(), None)
+
+
+def make_key(params):
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    return f'{PREFIX}:{generation()}:{digest}'
+
+
+def record(outcome):
+    key = f'{PREFIX}:count:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def stats():
+    counts = cache.get_many([f'{PREFIX}:count:{outcome}' for outcome in OUTCOMES])
+    return {outcome: counts.get(f'{PREFIX}:count:{outcome}', 0) for outcome in OUTCOMES}
+
+
+def reset_stats():
+    cache.delete_many([f'{PREFIX}:count:{outcome}' for outcome in OUTCOMES])
+
+
+def get_or_render(params, viewer_id, render):
+    """Cached listing for ``params``; ``render()`` -> (response, vendor ids read) fills a miss.
+
+    Returns (cached bytes or the freshly rendered response, outcome); None when
+    ``viewer_id`` appears on the shared page and the caller must render the
+    viewer's own page.
+    """
+    config = settings.LISTING_CACHE
+    key = make_key(params)
+    entry = cache.get(key)
+    outcome, result = 'hit', None
+    if entry is None:
+        if cache.add(f'{key}:lock', 1, config['LOCK_TIMEOUT']):
+            try:
+                result, ids = render()
+                entry = {'body': result.content, 'ids': ids}
+                cache.set(key, entry, config['TIMEOUT'])
+            finally:
+                cache.delete(f'{key}:lock')
+            outcome = 'miss'
+        else:
+            entry = wait_for(key, config['LOCK_TIMEOUT'])
+            outcome = 'wait'
+            if entry is None:
+                # The renderer died or is too slow; don't pile up behind it
+                logger.warning("Listing cache lock for %s timed out", key)
+                result, ids = render()
+                entry = {'body': result.content, 'ids': ids}
+    if viewer_id in entry['ids']:
+        outcome, result = 'bypass', None
+    record(outcome)
+    if outcome == 'bypass':
+        return None, outcome
+    return result if result is not None else entry['body'], outcome
+
+
+def wait_for(key, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        if cache.get(f'{key}:lock') is None:
+            return cache.get(key)
+    return None
@@ -0,0 +1,136 @@
+"""Typo-tolerant location filter for the vendor marketplace.
+
+Place names from ProfileDetails (location, city, state, pincode) and the
+verification address are split into normalized Location rows, linked to vendors
+through VendorLocation. A location query is matched against the small Location table
+first and only then joined to vendors:
+
+- PostgreSQL: substring or pg_trgm similarity (``%``), both served by the GIN
+  trigram index on ``locations.name``
+- other backends (MySQL in production): the place's trigrams are looked up in
+  LocationTrigram through its (trigram, location) index, the names sharing the
+  most trigrams are fetched, and only those are checked for a substring or
+  difflib close match. The cost follows the trigrams' posting lists, not the
+  number of locations.
+"""
+import difflib
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, Count, F, Func, Q, Value
+
+from .models import Location, LocationTrigram, ProfileDetails, VendorLocation, VerificationDetails
+
+PLACE_SPLIT_RE = re.compile(r'[,;/\n()\-]+')
+MAX_MATCHED_PLACES = 50
+# Names sharing the most trigrams with the place that are checked in Python
+MAX_TRIGRAM_CANDIDATES = 200
+# difflib ratio; "bhubneswar" vs "bhubaneswar" scores 0.95
+FUZZY_CUTOFF = 0.8
+
+
+def normalize_places(*texts):
+    places = set()
+    for text in texts:
+        for part in PLACE_SPLIT_RE.split(text or ''):
+            name = ' '.join(part.lower().split())
+            if len(name) >= 2:
+                places.add(name[:255])
+    return places
+
+
+def trigrams(name):
+    padded = f' {name} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def index_location_trigrams(locations):
+    """Add the LocationTrigram rows of ``locations`` ({name: id})"""
+    LocationTrigram.objects.bulk_create([
+        LocationTrigram(location_id=location_id, trigram=trigram)
+        for name, location_id in locations.items()
+        for trigram in trigrams(name)
+    ], ignore_conflicts=True, batch_size=5000)
+
+
+def reindex_vendor_locations(vendor_ids):
+    """Replace the VendorLocation links of ``vendor_ids`` from their profile and verification"""
+    vendor_ids = list(vendor_ids)
+    places = {vendor_id: set() for vendor_id in vendor_ids}
+    for user_id, location, city, state, pincode in ProfileDetails.objects.filter(
+        user_id__in=vendor_ids
+    ).values_list('user_id', 'location', 'city', 'state', 'pincode'):
+        places[user_id] |= normalize_places(location, city, state, pincode)
+    for user_id, address in VerificationDetails.objects.filter(
+        user_id__in=vendor_ids
+    ).values_list('user_id', 'address'):
+        places[user_id] |= normalize_places(address)
+
+    names = set().union(*places.values())
+    location_ids = dict(Location.objects.filter(name__in=names).values_list('name', 'id'))
+    missing = names - location_ids.keys()
+    if missing:
+        Location.objects.bulk_create([Location(name=name) for name in missing], ignore_conflicts=True)
+        created = dict(Location.objects.filter(name__in=missing).values_list('name', 'id'))
+        index_location_trigrams(created)
+        location_ids.update(created)
+
+    VendorLocation.objects.filter(vendor_id__in=vendor_ids).delete()
+    VendorLocation.objects.bulk_create([
+        VendorLocation(vendor_id=vendor_id, location_id=location_ids[name])
+        for vendor_id, vendor_places in places.items()
+        for name in vendor_places
+    ], ignore_conflicts=True)
+
+
+def reindex_vendor_location(vendor_id):
+    reindex_vendor_locations([vendor_id])
+
+
+class TrigramMatch(Func):
+    """``lhs % rhs``: pg_trgm similarity above the threshold, answerable from a GIN index"""
+    arg_joiner = ' %% '
+    template = '%(expressions)s'
+    output_field = BooleanField()
+
+
+def _match_places_postgresql(place):
+    from django.contrib.postgres.search import TrigramSimilarity
+
+    return list(
+        Location.objects.filter(Q(name__contains=place) | TrigramMatch(F('name'), Value(place)))
+        .annotate(similarity=TrigramSimilarity('name', place))
+        .order_by('-similarity')
+        .values_list('id', flat=True)[:MAX_MATCHED_PLACES]
+    )
+
+
+def _match_places_fallback(place):
+    candidates = (
+        LocationTrigram.objects.filter(trigram__in=trigrams(place))
+        .values('location_id').annotate(shared=Count('id')).order_by('-shared', 'location_id')
+        .values_list('location_id', flat=True)[:MAX_TRIGRAM_CANDIDATES]
+    )
+    names = dict(Location.objects.filter(id__in=list(candidates)).values_list('name', 'id'))
+
+    matched = [name for name in names if place in name]
+    matched += difflib.get_close_matches(place, names.keys(), n=MAX_MATCHED_PLACES, cutoff=FUZZY_CUTOFF)
+    return [names[name] for name in dict.fromkeys(matched)][:MAX_MATCHED_PLACES]
+
+
+def match_places(place):
+    if connection.vendor == 'postgresql':
+        return _match_places_postgresql(place)
+    return _match_places_fallback(place)
+
+
+def filter_by_location(queryset, term):
+    """Filter a UserDetails queryset to vendors near every place named in ``term``"""
+    for place in normalize_places(term):
+        location_ids = match_places(place)
+        if not location_ids:
+            return queryset.none()
+        queryset = queryset.filter(
+            id__in=VendorLocation.objects.filter(location_id__in=location_ids).values('vendor_id')
+        )
+    return queryset
@@ -0,0 +1,109 @@
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from vendors.models import BookingDetails, CalendarEvent, UserDetails, VendorChat, VendorService
+from vendors.query_plans import analyze
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the query behind every API endpoint on seeded data and flag full scans and sorts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vendors', type=int, default=1000,
+                            help='Vendors to seed (with services, bookings, events and chats); 0 uses existing rows')
+        parser.add_argument('--planner-choice', action='store_true',
+                            help='PostgreSQL: report the plans the planner prefers instead of forbidding seq scans')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded rows instead of rolling back')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['vendors']:
+                vendor, other = self.seed(options['vendors'])
+            else:
+                vendor, other = self.existing_vendors()
+            if connection.vendor in ('postgresql', 'mysql'):
+                with connection.cursor() as cursor:
+                    tables = ['user_details', 'vendor_services', 'booking_details', 'vendors_vendorchat', 'vendors_calendarevent']
+                    cursor.execute(('ANALYZE ' if connection.vendor == 'postgresql' else 'ANALYZE TABLE ') + ', '.join(tables))
+                    if connection.vendor == 'mysql':
+                        cursor.fetchall()
+
+            reports = analyze(vendor, other, force_index=not options['planner_choice'])
+
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+        flagged = accepted = 0
+        for report in reports:
+            problems = [f'full scan of {table}' for table in report.full_scans]
+            if report.sorted:
+                problems.append('sort')
+            if problems:
+                if report.accepted:
+                    accepted += 1
+                    problems.append(f'accepted debt: {report.accepted}')
+                else:
+                    flagged += 1
+                self.stdout.write(self.style.WARNING(f'{report.name:<24} {", ".join(problems)}'))
+                if report.proposal:
+                    self.stdout.write(f'{"":<24} proposed index: {report.proposal}')
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{report.name:<24} OK'))
+            if options['verbosity'] > 1:
+                self.stdout.write('    ' + report.plan.replace('\n', '\n    '))
+
+        if flagged:
+            raise CommandError(f'{flagged} of {len(reports)} queries are not fully served by an index')
+        if accepted:
+            self.stdout.write(self.style.WARNING(
+                f'{accepted} of {len(reports)} queries are accepted debt; the other {len(reports) - accepted} use indexes'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'All {len(reports)} queries use indexes'))
+
+    def existing_vendors(self):
+        vendors = list(UserDetails.objects.order_by('id')[:2])
+        if len(vendors) < 2:
+            raise CommandError('Need at least two vendors; seed some with --vendors')
+        return vendors
+
+    def seed(self, vendor_count, batch_size=2000):
+        rng = random.Random(42)
+        now = timezone.now()
+        UserDetails.objects.bulk_create([
+            UserDetails(
+                username=f'plan{n}@example.com', email=f'plan{n}@example.com', password='!',
+                full_name=f'Plan Vendor {n}', mobile='9999999999', business='Photography',
+                experience_level='Expert',
+            )
+            for n in range(vendor_count)
+        ], batch_size=batch_size)
+        ids = list(UserDetails.objects.filter(username__startswith='plan').order_by('id').values_list('id', flat=True))
+
+        VendorService.objects.bulk_create([
+            VendorService(user_id=vendor_id, service_name=f'Service {n}', category='Photography',
+                          service_price=rng.randint(5, 100) * 1000, is_active=n != 2)
+            for vendor_id in ids for n in range(3)
+        ], batch_size=batch_size)
+        BookingDetails.objects.bulk_create([
+            BookingDetails(vendor_id=vendor_id, customer_name='Customer', service_type='Photography',
+                           event_date=(now + timedelta(days=rng.randint(-90, 90))).date(),
+                           amount=rng.randint(5, 100) * 1000, location='Puri',
+                           status=rng.choice(['pending', 'in_progress', 'completed']))
+            for vendor_id in ids for _ in range(10)
+        ], batch_size=batch_size)
+        CalendarEvent.objects.bulk_create([
+            CalendarEvent(vendor_id=vendor_id, title='Event', event_date=now + timedelta(days=rng.randint(-90, 90)))
+            for vendor_id in ids for _ in range(5)
+        ], batch_size=batch_size)
+        VendorChat.objects.bulk_create([
+            VendorChat(sender_id=sender, receiver_id=receiver, message='Hello', is_read=rng.random() < 0.8,
+                       timestamp=now - timedelta(minutes=rng.randint(0, 100000)))
+            for sender, receiver in (rng.sample(ids, 2) for _ in range(vendor_count * 20))
+        ], batch_size=batch_size)
+        self.stdout.write(f'Seeded {vendor_count} vendors')
+        return UserDetails.objects.get(pk=ids[0]), UserDetails.objects.get(pk=ids[1])
@@ -0,0 +1,104 @@
+import asyncio
+import random
+import statistics
+import time
+
+from channels.db import database_sync_to_async
+from django.core.management.base import BaseCommand
+
+from vendors.chat import persist_messages
+from vendors.chat_buffer import ChatWriteBuffer
+from vendors.models import UserDetails, VendorChat
+
+USERNAME_PREFIX = 'benchchat'
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000 if values else 0.0
+
+
+class Command(BaseCommand):
+    help = 'Compare per-message and write-behind chat persistence at a fixed message rate'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rate', type=int, default=1000, help='Messages per second')
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--vendors', type=int, default=50)
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--interval', type=float, default=0.25)
+
+    def handle(self, *args, **options):
+        vendor_ids = self.seed(options['vendors'])
+        try:
+            self.stdout.write(
+                f'{"mode":<13} {"msgs":>6} {"msg/s":>8} {"bcast p50":>10} {"bcast p99":>10} '
+                f'{"saved p50":>10} {"saved p99":>10}'
+            )
+            for mode in ('sync', 'write_behind'):
+                result = asyncio.run(self.run(mode, vendor_ids, options))
+                self.stdout.write(
+                    f'{mode:<13} {result["count"]:>6} {result["throughput"]:>8.0f} '
+                    f'{percentile(result["broadcast"], 0.5):>8.1f}ms {percentile(result["broadcast"], 0.99):>8.1f}ms '
+                    f'{percentile(result["persisted"], 0.5):>8.1f}ms {percentile(result["persisted"], 0.99):>8.1f}ms'
+                )
+        finally:
+            UserDetails.objects.filter(id__in=vendor_ids).delete()
+
+    def seed(self, vendor_count):
+        UserDetails.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        UserDetails.objects.bulk_create([
+            UserDetails(
+                username=f'{USERNAME_PREFIX}{n}@example.com',
+                email=f'{USERNAME_PREFIX}{n}@example.com',
+                password='!',
+                full_name=f'Chat Bench {n}',
+                mobile='9999999999',
+                business='Photography',
+                experience_level='Expert',
+            )
+            for n in range(vendor_count)
+        ])
+        return list(UserDetails.objects.filter(username__startswith=USERNAME_PREFIX).values_list('id', flat=True))
+
+    async def run(self, mode, vendor_ids, options):
+        """Feed messages at a fixed rate the way ChatConsumer.receive handles them"""
+        rng = random.Random(7)
+        buffer = ChatWriteBuffer(options['batch_size'], options['interval'])
+        save = database_sync_to_async(persist_messages)
+        broadcast, persisted = [], []
+        total = int(options['rate'] * options['seconds'])
+
+        async def receive(chat, arrived):
+            if mode == 'sync':
+                await save([chat])
+                broadcast.append(time.perf_counter() - arrived)
+                persisted.append(broadcast[-1])
+            else:
+                broadcast.append(time.perf_counter() - arrived)
+
+                async def acked(uids):
+                    persisted.append(time.perf_counter() - arrived)
+                buffer.add(chat, acked)
+
+        start = time.perf_counter()
+        tasks = []
+        for n in range(total):
+            delay = start + n / options['rate'] - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            sender, receiver = rng.sample(vendor_ids, 2)
+            chat = VendorChat(sender_id=sender, receiver_id=receiver, message=f'benchmark message {n}')
+            tasks.append(asyncio.ensure_future(receive(chat, time.perf_counter())))
+        await asyncio.gather(*tasks)
+        while len(persisted) < total:
+            await buffer.flush()
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+
+        return {
+            'count': total,
+            'throughput': total / elapsed,
+            'broadcast': broadcast,
+            'persisted': persisted,
+        }
@@ -0,0 +1,101 @@
+import io
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from vendor_hub.compression import brotli, compress
+from vendors.api.renderers import ORJSONParser, ORJSONRenderer
+from vendors.api.serializers import VendorProfileSerializer
+from vendors.models import ProfileDetails, UserDetails, VendorService
+from vendors.search import reindex_vendors
+
+from .benchmark_search import FIRST_NAMES, LAST_NAMES, SERVICE_KINDS, SERVICE_WORDS
+
+USERNAME_PREFIX = 'benchjson'
+
+
+class Command(BaseCommand):
+    help = 'CPU per response for the stock and orjson renderers/parsers and for gzip/brotli on vendor payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vendors', type=int, default=100, help='Vendors in the listing page')
+        parser.add_argument('--services-per-vendor', type=int, default=12)
+        parser.add_argument('--rounds', type=int, default=200)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options['vendors'], options['services_per_vendor'])
+            vendors = VendorProfileSerializer.setup_eager_loading(
+                UserDetails.objects.filter(username__startswith=USERNAME_PREFIX).order_by('id')
+            )
+            payloads = {
+                'profile': VendorProfileSerializer(vendors[0]).data,
+                'listing': {'next': None, 'previous': None,
+                            'results': VendorProfileSerializer(vendors, many=True).data},
+            }
+            transaction.set_rollback(True)
+
+        rounds = options['rounds']
+        for name, data in payloads.items():
+            stock = JSONRenderer().render(data)
+            fast = ORJSONRenderer().render(data)
+            self.stdout.write(f'{name}: {len(stock) / 1024:.1f} KB, orjson output '
+                              f'{"identical" if fast == stock else "DIFFERS"}')
+            self.stdout.write(f'  {"step":<18} {"µs/request":>11} {"bytes":>9}')
+            rows = [
+                ('render json', lambda: JSONRenderer().render(data), stock),
+                ('render orjson', lambda: ORJSONRenderer().render(data), fast),
+                ('parse json', lambda: JSONParser().parse(io.BytesIO(stock)), None),
+                ('parse orjson', lambda: ORJSONParser().parse(io.BytesIO(stock)), None),
+                ('gzip', lambda: compress(stock, 'gzip'), compress(stock, 'gzip')),
+            ]
+            if brotli is not None:
+                rows.append(('brotli', lambda: compress(stock, 'br'), compress(stock, 'br')))
+            for step, func, output in rows:
+                cpu = self.cpu_time(func, rounds)
+                self.stdout.write(f'  {step:<18} {cpu:>11.0f} {len(output) if output else "":>9}')
+        if brotli is None:
+            self.stdout.write('brotli is not installed; skipped')
+
+    def cpu_time(self, func, rounds):
+        func()  # Warm up
+        start = time.process_time()
+        for _ in range(rounds):
+            func()
+        return (time.process_time() - start) / rounds * 1e6
+
+    def seed(self, vendor_count, services_per_vendor):
+        rng = random.Random(42)
+        businesses = [choice for choice, _ in UserDetails.PROFESSION_CHOICES]
+        UserDetails.objects.bulk_create([
+            UserDetails(
+                username=f'{USERNAME_PREFIX}{n}@example.com', email=f'{USERNAME_PREFIX}{n}@example.com', password='!',
+                full_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}', mobile='9999999999',
+                business=rng.choice(businesses), experience_level='Expert',
+            )
+            for n in range(vendor_count)
+        ])
+        vendors = list(UserDetails.objects.filter(username__startswith=USERNAME_PREFIX))
+        ProfileDetails.objects.bulk_create([
+            ProfileDetails(user=vendor, location='Patia', city='Bhubaneswar', state='Odisha', pincode='751024')
+            for vendor in vendors
+        ])
+        VendorService.objects.bulk_create([
+            VendorService(
+                user=vendor,
+                service_name=f'{rng.choice(SERVICE_WORDS)} {rng.choice(SERVICE_KINDS)} {n}',
+                category=vendor.business,
+                description=f'{rng.choice(SERVICE_WORDS)} packages with {rng.choice(SERVICE_KINDS).lower()}, '
+                            f'setup and teardown included. Travel within 50 km.',
+                service_price=rng.randint(5, 100) * 1000,
+                minimum_people=rng.randint(10, 50),
+                maximum_people=rng.randint(100, 1000),
+            )
+            for vendor in vendors
+            for n in range(services_per_vendor)
+        ])
+        reindex_vendors([vendor.pk for vendor in vendors])
@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient
+from django.urls import reverse
+
+from vendors.models import UserDetails
+from vendors.passwords import aauthenticate_vendor
+
+from .benchmark_chat_persistence import percentile
+
+USERNAME_PREFIX = 'benchlogin'
+PASSWORD = 'benchmark-password'
+
+
+class Command(BaseCommand):
+    help = 'Measure login throughput with many concurrent clients, hashing inline vs on the password pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=200, help='Concurrent clients')
+        parser.add_argument('--rounds', type=int, default=1, help='Logins per client')
+        parser.add_argument('--probe-interval', type=float, default=0.05,
+                            help='Seconds between cheap requests timed alongside the logins')
+
+    def handle(self, *args, **options):
+        emails = self.seed(options['clients'])
+        try:
+            self.stdout.write(
+                f'{"mode":<10} {"logins":>6} {"login/s":>8} {"p50":>9} {"p99":>9} {"probe p50":>10} {"probe p99":>10}'
+            )
+            for mode in ('inline', 'pool', 'endpoint'):
+                result = asyncio.run(self.run(mode, emails, options))
+                self.stdout.write(
+                    f'{mode:<10} {result["count"]:>6} {result["throughput"]:>8.1f} '
+                    f'{percentile(result["latency"], 0.5):>7.0f}ms {percentile(result["latency"], 0.99):>7.0f}ms '
+                    f'{percentile(result["probe"], 0.5):>8.1f}ms {percentile(result["probe"], 0.99):>8.1f}ms'
+                )
+        finally:
+            UserDetails.objects.filter(username__in=emails).delete()
+
+    def seed(self, count):
+        UserDetails.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        password = make_password(PASSWORD)
+        emails = [f'{USERNAME_PREFIX}{n}@example.com' for n in range(count)]
+        UserDetails.objects.bulk_create([
+            UserDetails(username=email, email=email, password=password, full_name=f'Login Bench {n}',
+                        mobile='9999999999', business='Photography', experience_level='Expert')
+            for n, email in enumerate(emails)
+        ])
+        return emails
+
+    async def run(self, mode, emails, options):
+        """Each client logs in ``rounds`` times; a probe meanwhile times a cheap sync view.
+
+        inline:   ModelBackend on the shared sync thread, as the DRF login view did under ASGI
+        pool:     vendors.passwords.aauthenticate_vendor
+        endpoint: POST /auth/login/ end to end, including tokens and the profile payload
+        """
+        client = AsyncClient()
+        login_url, probe_url = reverse('vendor-login'), reverse('check-email')
+        inline = sync_to_async(authenticate)
+        latency, probe = [], []
+        probe_started = [None]
+
+        async def login(email):
+            for _ in range(options['rounds']):
+                started = time.perf_counter()
+                if mode == 'inline':
+                    ok = await inline(username=email, password=PASSWORD) is not None
+                elif mode == 'pool':
+                    ok = await aauthenticate_vendor(None, email, PASSWORD) is not None
+                else:
+                    response = await client.post(login_url, {'email': email, 'password': PASSWORD},
+                                                 content_type='application/json')
+                    ok = response.status_code == 200
+                if not ok:
+                    raise RuntimeError(f'{mode} login failed for {email}')
+                latency.append(time.perf_counter() - started)
+
+        async def probe_loop():
+            while True:
+                probe_started[0] = time.perf_counter()
+                await client.post(probe_url, {'email': emails[0]}, content_type='application/json')
+                probe.append(time.perf_counter() - probe_started[0])
+                probe_started[0] = None
+                await asyncio.sleep(options['probe_interval'])
+
+        prober = asyncio.ensure_future(probe_loop())
+        start = time.perf_counter()
+        await asyncio.gather(*(login(email) for email in emails))
+        elapsed = time.perf_counter() - start
+        prober.cancel()
+        if probe_started[0] is not None:
+            # A probe stuck behind the logins the whole time still counts
+            probe.append(time.perf_counter() - probe_started[0])
+
+        return {
+            'count': len(latency),
+            'throughput': len(latency) / elapsed,
+            'latency': latency,
+            'probe': probe,
+        }
@@ -0,0 +1,96 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from vendors.models import UserDetails, VendorService
+from vendors.search import reindex_vendors, search_vendors
+
+FIRST_NAMES = ['Aarav', 'Priya', 'Rohan', 'Ananya', 'Vikram', 'Sneha', 'Arjun', 'Kavya', 'Rahul', 'Meera']
+LAST_NAMES = ['Patra', 'Sharma', 'Das', 'Mohanty', 'Iyer', 'Reddy', 'Nair', 'Singh', 'Mishra', 'Rao']
+SERVICE_WORDS = ['Wedding', 'Birthday', 'Corporate', 'Haldi', 'Sangeet', 'Reception', 'Engagement', 'Anniversary']
+SERVICE_KINDS = ['Photography', 'Buffet', 'Decor', 'Lighting', 'Cake', 'Makeup', 'Band', 'Videography']
+SEARCH_TERMS = ['photo', 'wedding buffet', 'priya', 'sangeet decor', 'makeup', 'mohanty catering']
+
+
+def legacy_search(queryset, search):
+    """The OR-of-icontains query VendorListView ran before the search index existed"""
+    return queryset.filter(
+        Q(full_name__icontains=search) |
+        Q(business__icontains=search) |
+        Q(services__service_name__icontains=search) |
+        Q(services__category__icontains=search) |
+        Q(services__description__icontains=search)
+    ).distinct()
+
+
+class Command(BaseCommand):
+    help = 'Compare indexed vendor search with the legacy icontains query on seeded vendors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vendors', type=int, default=100000)
+        parser.add_argument('--services-per-vendor', type=int, default=3)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded rows instead of rolling back')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options['vendors'], options['services_per_vendor'])
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE user_details, vendor_services, vendor_search_documents;')
+
+            self.stdout.write(f'{"term":<20} {"legacy ms":>10} {"indexed ms":>11} {"speedup":>8}')
+            for term in SEARCH_TERMS:
+                legacy = self.time_query(legacy_search(UserDetails.objects.all(), term), options)
+                indexed = self.time_query(search_vendors(UserDetails.objects.all(), term), options)
+                self.stdout.write(f'{term:<20} {legacy:>10.2f} {indexed:>11.2f} {legacy / max(indexed, 0.001):>7.1f}x')
+
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    def time_query(self, queryset, options):
+        timings = []
+        for _ in range(options['repeat']):
+            start = time.perf_counter()
+            list(queryset.values_list('id', flat=True)[:options['page_size']])
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+
+    def seed(self, vendor_count, services_per_vendor, batch_size=5000):
+        rng = random.Random(42)
+        businesses = [choice for choice, _ in UserDetails.PROFESSION_CHOICES]
+        start = time.perf_counter()
+        for offset in range(0, vendor_count, batch_size):
+            vendors = UserDetails.objects.bulk_create([
+                UserDetails(
+                    username=f'bench{n}@example.com',
+                    email=f'bench{n}@example.com',
+                    password='!',
+                    full_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                    mobile='9999999999',
+                    business=rng.choice(businesses),
+                    experience_level='Expert',
+                )
+                for n in range(offset, min(offset + batch_size, vendor_count))
+            ])
+            if vendors[0].pk is None:
+                vendors = list(UserDetails.objects.filter(username__startswith='bench').order_by('-id')[:len(vendors)])
+
+            VendorService.objects.bulk_create([
+                VendorService(
+                    user=vendor,
+                    service_name=f'{rng.choice(SERVICE_WORDS)} {rng.choice(SERVICE_KINDS)} {n}',
+                    category=vendor.business,
+                    description=f'{rng.choice(SERVICE_WORDS)} packages with {rng.choice(SERVICE_KINDS).lower()}',
+                    service_price=rng.randint(5, 100) * 1000,
+                )
+                for vendor in vendors
+                for n in range(services_per_vendor)
+            ])
+            reindex_vendors([vendor.pk for vendor in vendors], batch_size=batch_size)
+        self.stdout.write(f'Seeded {vendor_count} vendors in {time.perf_counter() - start:.1f}s')
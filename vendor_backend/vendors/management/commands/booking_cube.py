@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vendors.api.serializers import BookingCubeQuerySerializer
+from vendors.cube import DIMENSIONS, GRAINS, query_cube, refresh
+
+
+class Command(BaseCommand):
+    help = 'Refresh or query the platform-wide booking cube (category x city x month x status)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--refresh', action='store_true',
+                            help='Fold booking changes since the last refresh into the cube')
+        parser.add_argument('--full', action='store_true', help='With --refresh: rebuild every month')
+        parser.add_argument('--group-by', default='', help=f'Comma-separated dimensions: {", ".join(DIMENSIONS)}')
+        parser.add_argument('--grain', default='month', choices=GRAINS, help='Roll months up to quarters or years')
+        parser.add_argument('--start', default='', help='First month (YYYY-MM)')
+        parser.add_argument('--end', default='', help='Last month (YYYY-MM)')
+        for dimension in BookingCubeQuerySerializer.FILTERS:
+            parser.add_argument(f'--{dimension}', default='', help=f'Only these {dimension} values (comma-separated)')
+
+    def handle(self, *args, **options):
+        if options['refresh']:
+            started = time.perf_counter()
+            months, cells = refresh(full=options['full'])
+            scope = 'all months' if months is None else f'{len(months)} months'
+            self.stdout.write(self.style.SUCCESS(
+                f'Rebuilt {scope} ({cells} cells) in {time.perf_counter() - started:.1f}s'
+            ))
+            return
+
+        data = {key: options[key] for key in ('group_by', 'grain', 'start', 'end', *BookingCubeQuerySerializer.FILTERS)
+                if options[key]}
+        query = BookingCubeQuerySerializer(data=data)
+        if not query.is_valid():
+            raise CommandError(query.errors)
+        params = query.validated_data
+
+        started = time.perf_counter()
+        rows = query_cube(params['group_by'], params['grain'], params.get('start'), params.get('end'),
+                          params['filters'])
+        elapsed = (time.perf_counter() - started) * 1000
+
+        columns = [*params['group_by'], 'count', 'revenue', 'average_value']
+        self.stdout.write('\t'.join(columns))
+        for row in rows:
+            self.stdout.write('\t'.join(str(row[column]) for column in columns))
+        self.stdout.write(self.style.SUCCESS(f'{len(rows)} rows in {elapsed:.1f} ms'))
@@ -0,0 +1,52 @@
+import os
+import time
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from vendors.exporting import datasets, export_dataset, pa, read_state, remove_other_runs, write_state
+
+DATASETS = ('bookings', 'services', 'vendors', 'chat')
+
+
+class Command(BaseCommand):
+    help = 'Export bookings, services, vendors and chat metadata as date-partitioned Parquet files'
+
+    def add_arguments(self, parser):
+        config = settings.SNAPSHOT_EXPORT
+        parser.add_argument('--dir', default=config['DIR'], help='Output directory (default: SNAPSHOT_EXPORT_DIR)')
+        parser.add_argument('--dataset', action='append', dest='datasets', choices=DATASETS,
+                            help='Only export these datasets (repeatable)')
+        parser.add_argument('--full', action='store_true',
+                            help='Export every row and replace the earlier files instead of continuing from the last run')
+        parser.add_argument('--chunk-size', type=int, default=config['CHUNK_SIZE'],
+                            help='Rows fetched and written per Parquet row group')
+        parser.add_argument('--lag', type=int, default=config['LAG'],
+                            help='Leave rows changed in the last LAG seconds for the next run')
+
+    def handle(self, *args, **options):
+        if pa is None:
+            raise CommandError('export_snapshot needs pyarrow (pip install pyarrow)')
+        directory = options['dir']
+        state = read_state(directory)
+        until = timezone.now() - timedelta(seconds=options['lag'])
+        run_id = until.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+        specs = datasets()
+
+        for name in options['datasets'] or DATASETS:
+            since = None if options['full'] else parse_datetime(state.get(name, {}).get('until', '') or '')
+            if since is not None and since >= until:
+                self.stdout.write(f'{name}: up to date')
+                continue
+            started = time.perf_counter()
+            rows, files = export_dataset(name, specs[name], directory, since, until, run_id, options['chunk_size'])
+            if options['full']:
+                remove_other_runs(os.path.join(directory, name), files)
+            state[name] = {'until': until.isoformat(), 'rows': rows}
+            write_state(directory, state)
+            self.stdout.write(self.style.SUCCESS(
+                f'{name}: {rows} rows in {len(files)} files ({time.perf_counter() - started:.1f}s)'
+            ))
@@ -0,0 +1,22 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from vendors.presence import flush_presence
+
+
+class Command(BaseCommand):
+    help = 'Copy cached vendor presence into UserDetails.is_online'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep flushing every PRESENCE["FLUSH_INTERVAL"] seconds instead of exiting')
+
+    def handle(self, *args, **options):
+        while True:
+            went_online, went_offline = flush_presence()
+            self.stdout.write(self.style.SUCCESS(f'Marked {went_online} vendors online and {went_offline} offline'))
+            if not options['loop']:
+                break
+            time.sleep(settings.PRESENCE['FLUSH_INTERVAL'])
@@ -0,0 +1,80 @@
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from vendors.importing import import_records, init_worker, prepare_rows, read_progress, read_rows, write_progress
+
+
+class Command(BaseCommand):
+    help = 'Import vendors from a CSV or JSONL partner directory in validated, batched chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='.csv with a header row, or .jsonl with one vendor object per line')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows per transaction')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Processes validating rows and hashing passwords; 0 does it in this process')
+        parser.add_argument('--progress', help='Progress file (default: <path>.progress.json)')
+        parser.add_argument('--rejects', help='Invalid rows are appended here as JSONL (default: <path>.rejects.jsonl)')
+        parser.add_argument('--restart', action='store_true', help='Ignore saved progress and start from the top')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'{path} does not exist')
+        progress_path = options['progress'] or f'{path}.progress.json'
+        rejects_path = options['rejects'] or f'{path}.rejects.jsonl'
+
+        progress = None if options['restart'] else read_progress(progress_path)
+        if progress:
+            self.stdout.write(f'Resuming after line {progress["line"]}')
+        else:
+            progress = {'line': 0, 'imported': 0, 'skipped': 0, 'rejected': 0}
+
+        rows = ((line, row) for line, row in read_rows(path) if line > progress['line'])
+        chunks = iter(lambda: list(islice(rows, options['chunk_size'])), [])
+        started = time.perf_counter()
+        imported = 0
+
+        with open(rejects_path, 'a') as rejects_file:
+            for last_line, records, rejects in self.prepared(chunks, options['workers']):
+                with transaction.atomic():
+                    vendor_ids, skipped = import_records(records)
+                for reject in rejects:
+                    rejects_file.write(json.dumps(reject) + '\n')
+                rejects_file.flush()
+
+                imported += len(vendor_ids)
+                progress['line'] = last_line
+                progress['imported'] += len(vendor_ids)
+                progress['skipped'] += len(skipped)
+                progress['rejected'] += len(rejects)
+                write_progress(progress_path, progress)
+                self.stdout.write(
+                    f'line {last_line}: {progress["imported"]} imported, {progress["skipped"]} skipped, '
+                    f'{progress["rejected"]} rejected ({imported / (time.perf_counter() - started):.0f} vendors/s)'
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {progress["imported"]} vendors; {progress["skipped"]} already existed, '
+            f'{progress["rejected"]} rejected (see {rejects_path})'
+        ))
+
+    def prepared(self, chunks, workers):
+        """prepare_rows() for each chunk, in order, keeping a few chunks in flight per worker"""
+        if not workers:
+            yield from map(prepare_rows, chunks)
+            return
+        with ProcessPoolExecutor(workers, initializer=init_worker) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(prepare_rows, chunk))
+                if len(pending) > workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from vendors import listing_cache
+
+
+class Command(BaseCommand):
+    help = 'Show marketplace listing cache hit/miss counts, or invalidate the cached pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--invalidate', action='store_true', help='Make every cached page stale')
+        parser.add_argument('--reset-stats', action='store_true', help='Start counting from zero')
+
+    def handle(self, *args, **options):
+        counts = listing_cache.stats()
+        total = sum(counts.values())
+        served = counts['hit'] + counts['wait']
+        self.stdout.write(' '.join(f'{outcome}={count}' for outcome, count in counts.items()))
+        self.stdout.write(f'Served from cache: {served / total:.1%} of {total} requests' if total else 'No requests yet')
+        if options['invalidate']:
+            listing_cache.invalidate()
+            self.stdout.write(self.style.SUCCESS('Invalidated cached listing pages'))
+        if options['reset_stats']:
+            listing_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS('Reset listing cache counters'))
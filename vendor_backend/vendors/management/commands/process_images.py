@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from vendors.images import process_image
+from vendors.models import ImageAsset
+
+
+class Command(BaseCommand):
+    help = 'Generate resized variants for uploaded images still waiting for the background pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retry-failed', action='store_true', help='Also retry images that failed before')
+
+    def handle(self, *args, **options):
+        statuses = ['pending', 'failed'] if options['retry_failed'] else ['pending']
+        counts = {'ready': 0, 'failed': 0}
+        for sha256 in ImageAsset.objects.filter(status__in=statuses).values_list('sha256', flat=True).iterator():
+            counts[process_image(sha256).status] += 1
+        self.stdout.write(self.style.SUCCESS(f'Processed {counts["ready"]} images, {counts["failed"]} failed'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from vendors.uploads import purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Delete chunked verification uploads that were abandoned before completion'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, help="Idle time before an upload is abandoned (default CHUNKED_UPLOAD_EXPIRY_HOURS)")
+
+    def handle(self, *args, **options):
+        purged = purge_expired(options['hours'])
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} abandoned uploads'))
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from vendors.analytics import compute_rollups
+from vendors.models import BookingDailyRollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild (or verify) the daily booking analytics rollups from the bookings table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true',
+                            help='Only compare stored rollups with the bookings table')
+        parser.add_argument('--vendor', type=int, action='append', dest='vendor_ids',
+                            help='Only check these vendor ids (repeatable)')
+
+    def handle(self, *args, **options):
+        vendor_ids = options['vendor_ids']
+        if options['verify']:
+            self.verify(vendor_ids)
+        else:
+            self.rebuild(vendor_ids)
+
+    def stored(self, vendor_ids):
+        rollups = BookingDailyRollup.objects.all()
+        if vendor_ids:
+            rollups = rollups.filter(vendor_id__in=vendor_ids)
+        return rollups
+
+    def rebuild(self, vendor_ids):
+        with transaction.atomic():
+            self.stored(vendor_ids).delete()
+            expected = compute_rollups(vendor_ids)
+            BookingDailyRollup.objects.bulk_create(expected, batch_size=1000)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(expected)} daily rollups'))
+
+    def verify(self, vendor_ids):
+        def key(rollup):
+            return rollup.vendor_id, rollup.date, rollup.status
+
+        expected = {key(rollup): rollup for rollup in compute_rollups(vendor_ids)}
+        # Rows emptied by deletes or status changes stay behind with zero bookings
+        stored = {key(rollup): rollup for rollup in self.stored(vendor_ids) if rollup.bookings or rollup.revenue}
+
+        mismatches = 0
+        for vendor_id, date, status in sorted(expected.keys() | stored.keys()):
+            want = expected.get((vendor_id, date, status)) or BookingDailyRollup()
+            have = stored.get((vendor_id, date, status)) or BookingDailyRollup()
+            if (have.bookings, have.revenue) != (want.bookings, want.revenue):
+                mismatches += 1
+                self.stdout.write(self.style.WARNING(
+                    f'Vendor {vendor_id} {date} {status}: stored {have.bookings} / {have.revenue}, '
+                    f'expected {want.bookings} / {want.revenue}'
+                ))
+
+        if mismatches:
+            raise CommandError(f'{mismatches} daily rollups are stale; run rebuild_booking_rollups')
+        self.stdout.write(self.style.SUCCESS(f'Rollups match for {len(expected)} vendor days'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from vendors.chat import rebuild_conversations
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the chat sidebar conversation summaries from the chat messages'
+
+    def handle(self, *args, **options):
+        total = rebuild_conversations()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} conversations'))
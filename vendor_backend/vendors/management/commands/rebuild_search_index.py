@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from vendors.locations import reindex_vendor_locations
+from vendors.models import UserDetails
+from vendors.search import reindex_vendors
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the vendor marketplace search documents and location links'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--vendor', type=int, action='append', dest='vendor_ids',
+                            help='Only reindex these vendor ids (repeatable)')
+
+    def handle(self, *args, **options):
+        vendor_ids = options['vendor_ids']
+        if not vendor_ids:
+            vendor_ids = UserDetails.objects.order_by('id').values_list('id', flat=True).iterator()
+
+        batch_size = options['batch_size']
+        batch = []
+        total = 0
+        for vendor_id in vendor_ids:
+            batch.append(vendor_id)
+            if len(batch) == batch_size:
+                self.reindex(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            self.reindex(batch)
+            total += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Reindexed {total} vendors'))
+
+    def reindex(self, vendor_ids):
+        reindex_vendors(vendor_ids, batch_size=len(vendor_ids))
+        reindex_vendor_locations(vendor_ids)
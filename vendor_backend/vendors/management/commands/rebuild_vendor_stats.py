@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from vendors.models import VendorStats
+from vendors.stats import COUNTER_FIELDS, compute_vendor_stats, current_month
+
+
+class Command(BaseCommand):
+    help = 'Rebuild (or verify) the per-vendor dashboard counters from the bookings table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true',
+                            help='Only compare stored counters with the bookings table')
+        parser.add_argument('--vendor', type=int, action='append', dest='vendor_ids',
+                            help='Only check these vendor ids (repeatable)')
+
+    def handle(self, *args, **options):
+        vendor_ids = options['vendor_ids']
+        if options['verify']:
+            self.verify(vendor_ids)
+        else:
+            self.rebuild(vendor_ids)
+
+    def rebuild(self, vendor_ids):
+        with transaction.atomic():
+            stored = VendorStats.objects.select_for_update()
+            if vendor_ids:
+                stored = stored.filter(vendor_id__in=vendor_ids)
+            stored.delete()
+            expected = compute_vendor_stats(vendor_ids)
+            VendorStats.objects.bulk_create(expected.values(), batch_size=1000)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt counters for {len(expected)} vendors'))
+
+    def verify(self, vendor_ids):
+        expected = compute_vendor_stats(vendor_ids)
+        stored = VendorStats.objects.all()
+        if vendor_ids:
+            stored = stored.filter(vendor_id__in=vendor_ids)
+        stored = {stats.vendor_id: stats for stats in stored}
+
+        month = current_month()
+        mismatches = 0
+        for vendor_id in sorted(expected.keys() | stored.keys()):
+            want = expected.get(vendor_id) or VendorStats(vendor_id=vendor_id)
+            have = stored.get(vendor_id) or VendorStats(vendor_id=vendor_id)
+            if have.revenue_month != month:
+                have.monthly_revenue = 0
+            diffs = [
+                f'{field}: stored {getattr(have, field)}, expected {getattr(want, field)}'
+                for field in COUNTER_FIELDS
+                if getattr(have, field) != getattr(want, field)
+            ]
+            if diffs:
+                mismatches += 1
+                self.stdout.write(self.style.WARNING(f'Vendor {vendor_id}: ' + '; '.join(diffs)))
+
+        if mismatches:
+            raise CommandError(f'{mismatches} vendors have stale counters; run rebuild_vendor_stats')
+        self.stdout.write(self.style.SUCCESS(f'Counters match for {len(expected)} vendors'))
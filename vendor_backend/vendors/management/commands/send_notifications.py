@@ -0,0 +1,31 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from vendors.notifications import send_batch
+
+
+class Command(BaseCommand):
+    help = 'Send queued vendor notifications as per-vendor digest emails, one connection per batch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Send everything due, then exit (for cron) instead of polling')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Vendors per batch (default: NOTIFICATIONS["BATCH_SIZE"])')
+
+    def handle(self, *args, **options):
+        poll_interval = settings.NOTIFICATIONS['POLL_INTERVAL']
+        total_sent = total_failed = 0
+        while True:
+            sent, failed, claimed = send_batch(options['batch_size'])
+            total_sent += sent
+            total_failed += failed
+            if claimed:
+                self.stdout.write(f'{sent} digests sent, {failed} failed ({claimed} notifications)')
+                continue
+            if options['once']:
+                break
+            time.sleep(poll_interval)
+        self.stdout.write(self.style.SUCCESS(f'Sent {total_sent} digests, {total_failed} failed'))
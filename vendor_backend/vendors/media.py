@@ -0,0 +1,179 @@
+"""Serving MEDIA_ROOT (uploaded photos and verification documents).
+
+serve_media answers conditional and ranged GETs itself so clients and CDNs
+can cache:
+
+- strong ETags: the content hash in the name for content-addressed files
+  (``images/``, see vendors/images.py), otherwise a SHA-256 of the file that is
+  cached per (path, size, mtime);
+- ``If-None-Match``/``If-Modified-Since`` -> 304, a single ``Range`` -> 206
+  (``If-Range`` honoured), multiple ranges -> the whole file;
+- ``Cache-Control``: a year and ``immutable`` for content-addressed files,
+  MEDIA_SERVING['MAX_AGE'] for other public media, ``private, no-cache`` for
+  verification documents.
+
+It is a plain Django view: public media needs no credentials, so a stale or
+bad ``Authorization`` header can't turn an ``<img>`` into a 401. Verification
+documents are only served with a signature from signed_media_url(), valid for
+MEDIA_SERVING['SIGNED_URL_MAX_AGE'] seconds, which the API hands to the owner
+alone.
+
+With MEDIA_SERVING['OFFLOAD'] set to 'x-accel-redirect' (nginx) or 'x-sendfile'
+(Apache, lighttpd) the view still checks permissions and sets the caching
+headers but leaves the bytes, and Range handling, to the front proxy.
+"""
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag, urlencode
+from django.views.decorators.http import require_safe
+
+CONTENT_ADDRESSED = re.compile(r'^images/[0-9a-f]{2}/(?P<hash>[0-9a-f]{64})(?:\.\w+|/\d+\.\w+)$')
+PRIVATE_PREFIXES = ('documents/',)
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+HASH_CHUNK_SIZE = 1024 * 1024
+SIGNATURE_PARAM = 'signature'
+SIGNING_SALT = 'vendors.media'
+
+
+def file_etag(path, name, stat):
+    match = CONTENT_ADDRESSED.match(name)
+    if match:
+        variant = name[match.end('hash'):]
+        return quote_etag(match['hash'] + variant.replace('/', '-'))
+    key = f'media-etag:{hashlib.sha256(name.encode()).hexdigest()}:{stat.st_size}:{stat.st_mtime_ns}'
+    etag = cache.get(key)
+    if etag is None:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        etag = quote_etag(digest.hexdigest())
+        cache.set(key, etag, None)
+    return etag
+
+
+def cache_control(name):
+    if name.startswith(PRIVATE_PREFIXES):
+        return 'private, no-cache'
+    if CONTENT_ADDRESSED.match(name):
+        return f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    return f'public, max-age={settings.MEDIA_SERVING["MAX_AGE"]}'
+
+
+def signed_media_url(name):
+    """URL of ``name`` that serve_media accepts for MEDIA_SERVING['SIGNED_URL_MAX_AGE'] seconds"""
+    signature = signing.TimestampSigner(salt=SIGNING_SALT).sign(name)[len(name) + 1:]
+    return f'{default_storage.url(name)}?{urlencode({SIGNATURE_PARAM: signature})}'
+
+
+def can_read(name, signature):
+    if not name.startswith(PRIVATE_PREFIXES):
+        return True
+    if not signature:
+        return False
+    try:
+        signing.TimestampSigner(salt=SIGNING_SALT).unsign(
+            f'{name}:{signature}', max_age=settings.MEDIA_SERVING['SIGNED_URL_MAX_AGE']
+        )
+    except signing.BadSignature:  # Includes SignatureExpired
+        return False
+    return True
+
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single satisfiable byte range; None to send everything;
+    False when unsatisfiable"""
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None  # Multiple or malformed ranges: ignoring Range is always allowed
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    else:
+        start, end = max(0, size - int(last)), size - 1
+        if int(last) == 0:
+            return False
+    if start >= size:
+        return False
+    return start, end
+
+
+def read_range(path, start, length, chunk_size=64 * 1024):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@require_safe
+def serve_media(request, path):
+    name = posixpath.normpath(path).lstrip('/')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, name)
+    except SuspiciousFileOperation:
+        raise Http404('Not found')
+    if not os.path.isfile(full_path) or not can_read(name, request.GET.get(SIGNATURE_PARAM)):
+        # Missing and forbidden look the same, so document names can't be probed
+        raise Http404('Not found')
+
+    stat = os.stat(full_path)
+    etag = file_etag(full_path, name, stat)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': cache_control(name),
+        'Accept-Ranges': 'bytes',
+        'X-Content-Type-Options': 'nosniff',
+    }
+    conditional = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if conditional is not None:
+        for header, value in headers.items():
+            conditional[header] = value
+        return conditional
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    offload = settings.MEDIA_SERVING['OFFLOAD']
+    if offload:
+        response = HttpResponse(content_type=content_type)
+        if offload == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = settings.MEDIA_SERVING['ACCEL_PREFIX'].rstrip('/') + '/' + name
+        else:
+            response['X-Sendfile'] = full_path
+    else:
+        byte_range = None
+        if 'Range' in request.headers and request.headers.get('If-Range', etag) == etag:
+            byte_range = parse_range(request.headers['Range'], stat.st_size)
+        if byte_range is False:
+            response = HttpResponse(status=416, content_type=content_type)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+        elif byte_range:
+            start, end = byte_range
+            response = StreamingHttpResponse(read_range(full_path, start, end - start + 1),
+                                             status=206, content_type=content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response['Content-Length'] = str(end - start + 1)
+        else:
+            response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+    for header, value in headers.items():
+        response[header] = value
+    return response
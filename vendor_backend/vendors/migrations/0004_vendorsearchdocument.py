@@ -0,0 +1,49 @@
+# Vendor marketplace search documents with a backend-specific full-text index
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        # Expression must match the one built in vendors.search._search_postgresql
+        schema_editor.execute(
+            "CREATE INDEX vendor_search_doc_gin ON vendor_search_documents "
+            "USING gin (to_tsvector('simple', document));"
+        )
+    elif vendor == 'mysql':
+        schema_editor.execute(
+            "CREATE FULLTEXT INDEX vendor_search_doc_ft ON vendor_search_documents (document);"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS vendor_search_doc_gin;")
+    elif vendor == 'mysql':
+        schema_editor.execute("DROP INDEX vendor_search_doc_ft ON vendor_search_documents;")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0003_add_vendor_functionality'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendorSearchDocument',
+            fields=[
+                ('vendor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('document', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'vendor_search_documents',
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
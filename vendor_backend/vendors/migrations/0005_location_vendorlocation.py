@@ -0,0 +1,54 @@
+# Normalized vendor locations with a trigram index for fuzzy matching
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        # Other backends match against the cached place names in Python;
+        # the unique index on locations.name still serves prefix lookups.
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    schema_editor.execute(
+        "CREATE INDEX locations_name_trgm ON locations USING gin (name gin_trgm_ops);"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS locations_name_trgm;")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0004_vendorsearchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+            ],
+            options={
+                'db_table': 'locations',
+            },
+        ),
+        migrations.CreateModel(
+            name='VendorLocation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vendor_links', to='vendors.location')),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vendor_locations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'vendor_locations',
+                'unique_together': {('location', 'vendor')},
+            },
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,64 @@
+# Per-vendor dashboard counters, backfilled from the existing bookings
+
+from datetime import datetime, time
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+
+def backfill_stats(apps, schema_editor):
+    # Same numbers as vendors.stats.compute_vendor_stats(); the counters are only
+    # ever moved by deltas, so they must start from the bookings already there
+    BookingDetails = apps.get_model('vendors', 'BookingDetails')
+    VendorStats = apps.get_model('vendors', 'VendorStats')
+    month = timezone.localdate().replace(day=1)
+    month_start = timezone.make_aware(datetime.combine(month, time.min))
+    completed = Q(status='completed')
+    rows = BookingDetails.objects.values('vendor_id').annotate(
+        total_bookings=Count('id'),
+        pending_bookings=Count('id', filter=Q(status='pending')),
+        in_progress_bookings=Count('id', filter=Q(status='in_progress')),
+        completed_bookings=Count('id', filter=completed),
+        total_revenue=Sum('amount', filter=completed),
+        monthly_revenue=Sum('amount', filter=completed & Q(created_at__gte=month_start)),
+    ).order_by()
+    VendorStats.objects.bulk_create([
+        VendorStats(
+            vendor_id=row['vendor_id'], revenue_month=month,
+            total_bookings=row['total_bookings'], pending_bookings=row['pending_bookings'],
+            in_progress_bookings=row['in_progress_bookings'], completed_bookings=row['completed_bookings'],
+            total_revenue=row['total_revenue'] or 0, monthly_revenue=row['monthly_revenue'] or 0,
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0005_location_vendorlocation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendorStats',
+            fields=[
+                ('vendor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_bookings', models.IntegerField(default=0)),
+                ('pending_bookings', models.IntegerField(default=0)),
+                ('in_progress_bookings', models.IntegerField(default=0)),
+                ('completed_bookings', models.IntegerField(default=0)),
+                ('total_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('monthly_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('revenue_month', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'vendor_stats',
+            },
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
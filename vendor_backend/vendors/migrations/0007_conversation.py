@@ -0,0 +1,34 @@
+# Chat sidebar summaries; backfill with `manage.py rebuild_conversations`
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0006_vendorstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_message_text', models.TextField(blank=True)),
+                ('last_message_at', models.DateTimeField(blank=True, null=True)),
+                ('unread_for_low', models.IntegerField(default=0)),
+                ('unread_for_high', models.IntegerField(default=0)),
+                ('last_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='vendors.vendorchat')),
+                ('last_sender', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('vendor_high', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversations_as_high', to=settings.AUTH_USER_MODEL)),
+                ('vendor_low', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversations_as_low', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'conversations',
+                'indexes': [models.Index(fields=['vendor_high', 'vendor_low'], name='conversation_high_low_idx')],
+                'unique_together': {('vendor_low', 'vendor_high')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Client-visible message ids for write-behind chat persistence
+
+import uuid
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0007_conversation'),
+    ]
+
+    operations = [
+        # Added without a default first: a callable default would give every
+        # existing row the same value. Old messages keep uid NULL.
+        migrations.AddField(
+            model_name='vendorchat',
+            name='uid',
+            field=models.UUIDField(editable=False, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='vendorchat',
+            name='uid',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='vendorchat',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Indexes for replaying missed chat messages on websocket resume
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0008_vendorchat_uid_timestamp'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vendorchat',
+            index=models.Index(fields=['sender', 'timestamp', 'id'], name='vendorchat_sender_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendorchat',
+            index=models.Index(fields=['receiver', 'timestamp', 'id'], name='vendorchat_receiver_ts_idx'),
+        ),
+    ]
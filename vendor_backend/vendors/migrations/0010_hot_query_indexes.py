@@ -0,0 +1,37 @@
+# Composite indexes for the API's hot filters, found with `manage.py analyze_queries`
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0009_vendorchat_resume_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vendorservice',
+            index=models.Index(fields=['user', 'is_active'], name='service_user_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookingdetails',
+            index=models.Index(fields=['vendor', 'created_at'], name='booking_vendor_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookingdetails',
+            index=models.Index(fields=['vendor', 'status', 'created_at'], name='booking_vendor_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendorchat',
+            index=models.Index(fields=['sender', 'receiver', 'timestamp'], name='vendorchat_pair_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendorchat',
+            index=models.Index(fields=['receiver', 'is_read'], name='vendorchat_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='calendarevent',
+            index=models.Index(fields=['vendor', 'event_date'], name='calendarevent_vendor_date_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Daily booking rollups for analytics, backfilled from the existing bookings
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollups(apps, schema_editor):
+    # Same rows as vendors.analytics.compute_rollups(); rollups are only ever moved
+    # by deltas, so they must start from the bookings already there
+    BookingDetails = apps.get_model('vendors', 'BookingDetails')
+    BookingDailyRollup = apps.get_model('vendors', 'BookingDailyRollup')
+    rows = BookingDetails.objects.annotate(day=TruncDate('created_at')).values('vendor_id', 'day', 'status').annotate(
+        count=Count('id'), total=Sum('amount'),
+    ).order_by()
+    BookingDailyRollup.objects.bulk_create([
+        BookingDailyRollup(vendor_id=row['vendor_id'], date=row['day'], status=row['status'],
+                           bookings=row['count'], revenue=row['total'] or 0)
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0012_upload_sessions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('completed', 'Completed')], max_length=20)),
+                ('bookings', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'booking_daily_rollups',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='bookingdailyrollup',
+            constraint=models.UniqueConstraint(fields=('vendor', 'date', 'status'), name='booking_rollup_vendor_day_status'),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Platform-wide booking cube (vendors/cube.py); fill with `manage.py booking_cube --refresh --full`
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0013_booking_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookingdailyrollup',
+            name='updated_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='BookingCubeCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('category', models.CharField(max_length=50, null=True)),
+                ('city', models.CharField(blank=True, max_length=100, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('completed', 'Completed')], max_length=20)),
+                ('bookings', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+            ],
+            options={
+                'db_table': 'booking_cube',
+                'indexes': [models.Index(fields=['category', 'city', 'month'], name='booking_cube_category_idx'), models.Index(fields=['city', 'month'], name='booking_cube_city_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BookingCubeRefresh',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('high_water', models.DateTimeField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'booking_cube_refresh',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='bookingcubecell',
+            constraint=models.UniqueConstraint(fields=('month', 'category', 'city', 'status'), name='booking_cube_cell'),
+        ),
+    ]
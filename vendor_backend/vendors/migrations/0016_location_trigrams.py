@@ -0,0 +1,45 @@
+# Trigram lookup table for location matching without pg_trgm (MySQL, SQLite)
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def trigrams(name):
+    # Same as vendors.locations.trigrams at the time of this migration
+    padded = f' {name} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def build_trigrams(apps, schema_editor):
+    Location = apps.get_model('vendors', 'Location')
+    LocationTrigram = apps.get_model('vendors', 'LocationTrigram')
+    batch = []
+    for location_id, name in Location.objects.values_list('id', 'name').iterator(chunk_size=2000):
+        batch.extend(LocationTrigram(location_id=location_id, trigram=trigram) for trigram in trigrams(name))
+        if len(batch) >= 10000:
+            LocationTrigram.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    LocationTrigram.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0015_notification_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='vendors.location')),
+            ],
+            options={
+                'db_table': 'location_trigrams',
+                'unique_together': {('trigram', 'location')},
+            },
+        ),
+        migrations.RunPython(build_trigrams, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Per-participant conversation rows, so the chat sidebar is read in index order
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_participants(apps, schema_editor):
+    Conversation = apps.get_model('vendors', 'Conversation')
+    ConversationParticipant = apps.get_model('vendors', 'ConversationParticipant')
+    batch = []
+    for pk, low, high, last_message_at in Conversation.objects.values_list(
+        'id', 'vendor_low_id', 'vendor_high_id', 'last_message_at'
+    ).iterator(chunk_size=2000):
+        if low == high:
+            continue
+        batch += [
+            ConversationParticipant(conversation_id=pk, user_id=low, other_id=high, last_message_at=last_message_at),
+            ConversationParticipant(conversation_id=pk, user_id=high, other_id=low, last_message_at=last_message_at),
+        ]
+        if len(batch) >= 10000:
+            ConversationParticipant.objects.bulk_create(batch)
+            batch = []
+    ConversationParticipant.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0017_userdetails_created_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationParticipant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_message_at', models.DateTimeField(blank=True, null=True)),
+                ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participants', to='vendors.conversation')),
+                ('other', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversation_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'conversation_participants',
+                'indexes': [models.Index(fields=['user', '-last_message_at', '-id'], name='participant_recent_idx')],
+                'unique_together': {('user', 'other')},
+            },
+        ),
+        migrations.RunPython(backfill_participants, migrations.RunPython.noop),
+    ]
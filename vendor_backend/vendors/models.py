@@ -1,6 +1,8 @@
-from django.db import models
+import uuid
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
+from django.utils import timezone
 from django.utils.html import escape
 
 class UserDetails(AbstractUser):
@@ -43,10 +45,40 @@ class UserDetails(AbstractUser):
 
     class Meta:
         db_table = 'user_details'
+        indexes = [
+            # Keyset order of the vendor listing (VendorPagination)
+            models.Index(fields=['-created_at', '-id'], name='user_created_id_idx'),
+        ]
 
     def __str__(self):
         return f"{escape(self.full_name)} - {escape(self.business)}"
 
+class ImageAsset(models.Model):
+    """An uploaded image stored once under its content hash, plus its resized variants.
+
+    Filled in by vendors/images.py; ``variants`` maps format -> width -> storage name.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    original = models.CharField(max_length=255)
+    width = models.PositiveIntegerField(default=0)
+    height = models.PositiveIntegerField(default=0)
+    variants = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'image_assets'
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.status})"
+
 class ProfileDetails(models.Model):
     user = models.OneToOneField(UserDetails, on_delete=models.CASCADE, related_name='profile')
     location = models.CharField(max_length=255)
@@ -54,6 +86,7 @@ class ProfileDetails(models.Model):
     state = models.CharField(max_length=100, blank=True)
     pincode = models.CharField(max_length=10, blank=True)
     profile_image = models.ImageField(upload_to='profiles/', null=True, blank=True)
+    profile_image_asset = models.ForeignKey(ImageAsset, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -85,6 +118,39 @@ class VerificationDetails(models.Model):
     def __str__(self):
         return f"{self.user.full_name} - {self.status}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets post_save tell a status change (which notifies the vendor) from a re-save
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
+class UploadSession(models.Model):
+    """A resumable, chunked upload of one verification document (vendors/uploads.py).
+
+    Chunks are appended to a staging file until ``received`` reaches ``size``;
+    completing the upload moves the file into storage and onto VerificationDetails.
+    """
+    FIELD_CHOICES = [
+        ('aadhaar_document', 'Aadhaar document'),
+        ('pan_document', 'PAN document'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(UserDetails, on_delete=models.CASCADE, related_name='upload_sessions')
+    field = models.CharField(max_length=20, choices=FIELD_CHOICES)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveIntegerField()
+    received = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'upload_sessions'
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+
 class VendorService(models.Model):
     user = models.ForeignKey(UserDetails, on_delete=models.CASCADE, related_name='services')
     service_name = models.CharField(max_length=255)
@@ -94,6 +160,7 @@ class VendorService(models.Model):
     maximum_people = models.IntegerField(null=True, blank=True)
     description = models.TextField(blank=True)
     image = models.ImageField(upload_to='services/', null=True, blank=True)
+    image_asset = models.ForeignKey(ImageAsset, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -101,6 +168,9 @@ class VendorService(models.Model):
     class Meta:
         db_table = 'vendor_services'
         unique_together = ['user', 'service_name']
+        indexes = [
+            models.Index(fields=['user', 'is_active'], name='service_user_active_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.full_name} - {self.service_name}"
@@ -128,23 +198,210 @@ class BookingDetails(models.Model):
 
     class Meta:
         db_table = 'booking_details'
+        indexes = [
+            models.Index(fields=['vendor', 'created_at'], name='booking_vendor_created_idx'),
+            models.Index(fields=['vendor', 'status', 'created_at'], name='booking_vendor_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.customer_name} - {self.service_type}"
 
+    STATS_FIELDS = ('vendor_id', 'status', 'amount', 'created_at')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Only from loaded fields: touching a deferred one (.only()/.defer()) costs a query per row.
+        # Without it, saved_stats_snapshot() reads the stored row when it is needed.
+        if all(name in instance.__dict__ for name in cls.STATS_FIELDS):
+            instance._stats_snapshot = tuple(instance.__dict__[name] for name in cls.STATS_FIELDS)
+        return instance
+
+    def stats_snapshot(self):
+        """The fields VendorStats counters depend on"""
+        return (self.vendor_id, self.status, self.amount, self.created_at)
+
+    def saved_stats_snapshot(self):
+        """stats_snapshot() as last written to the database, None for a new booking"""
+        if hasattr(self, '_stats_snapshot'):
+            return self._stats_snapshot
+        if self._state.adding or self.pk is None:
+            return None
+        return BookingDetails.objects.filter(pk=self.pk).values_list(*self.STATS_FIELDS).first()
+
+    def save(self, *args, **kwargs):
+        from .notifications import notify_booking_changes
+        from .stats import apply_booking_change
+
+        with transaction.atomic():
+            old = self.saved_stats_snapshot()
+            super().save(*args, **kwargs)
+            apply_booking_change(old, self.stats_snapshot())
+            if old is not None:
+                notify_booking_changes([(self, old[1])])
+        self._stats_snapshot = self.stats_snapshot()
+
+    def delete(self, *args, **kwargs):
+        from .stats import apply_booking_change
+
+        with transaction.atomic():
+            old = self.saved_stats_snapshot()
+            result = super().delete(*args, **kwargs)
+            apply_booking_change(old, None)
+        return result
+
+class VendorStats(models.Model):
+    """Per-vendor dashboard counters, kept in step with BookingDetails writes.
+
+    Updated in the same transaction as BookingDetails.save()/delete(); queryset
+    update()/delete() bypass it, so run ``rebuild_vendor_stats`` after those.
+    """
+    vendor = models.OneToOneField(UserDetails, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    total_bookings = models.IntegerField(default=0)
+    pending_bookings = models.IntegerField(default=0)
+    in_progress_bookings = models.IntegerField(default=0)
+    completed_bookings = models.IntegerField(default=0)
+    total_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    monthly_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # First day of the month monthly_revenue refers to
+    revenue_month = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'vendor_stats'
+
+    def __str__(self):
+        return f"Stats for vendor {self.vendor_id}"
+
+class BookingDailyRollup(models.Model):
+    """Bookings created on one day (in TIME_ZONE) per vendor and status, for analytics charts.
+
+    Maintained alongside VendorStats (see vendors/stats.py) and rebuilt the same
+    way with ``rebuild_booking_rollups``.
+    """
+    vendor = models.ForeignKey(UserDetails, on_delete=models.CASCADE, related_name='booking_rollups')
+    date = models.DateField()
+    status = models.CharField(max_length=20, choices=BookingDetails.STATUS_CHOICES)
+    bookings = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # Set on every change (including to zero bookings); BookingCubeCell refreshes from it
+    updated_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        db_table = 'booking_daily_rollups'
+        constraints = [
+            models.UniqueConstraint(fields=['vendor', 'date', 'status'], name='booking_rollup_vendor_day_status'),
+        ]
+
+    def __str__(self):
+        return f"{self.vendor_id} {self.date} {self.status}: {self.bookings}"
+
+class BookingCubeCell(models.Model):
+    """Platform-wide bookings per vendor category, vendor city, month and status (vendors/cube.py).
+
+    A NULL category or city holds the total over all of them (the cube's
+    roll-up levels). Derived from BookingDailyRollup by ``booking_cube
+    --refresh``; never written on the booking path.
+    """
+    month = models.DateField()
+    category = models.CharField(max_length=50, null=True)
+    city = models.CharField(max_length=100, blank=True, null=True)
+    status = models.CharField(max_length=20, choices=BookingDetails.STATUS_CHOICES)
+    bookings = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'booking_cube'
+        constraints = [
+            models.UniqueConstraint(fields=['month', 'category', 'city', 'status'], name='booking_cube_cell'),
+        ]
+        indexes = [
+            models.Index(fields=['category', 'city', 'month'], name='booking_cube_category_idx'),
+            models.Index(fields=['city', 'month'], name='booking_cube_city_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.category} {self.city} {self.status}: {self.bookings}"
+
+class BookingCubeRefresh(models.Model):
+    """Single row: how far BookingDailyRollup changes have been folded into the cube"""
+    high_water = models.DateTimeField(null=True, blank=True)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'booking_cube_refresh'
+
 class VendorChat(models.Model):
+    # Assigned before the row is written so websocket messages can be broadcast
+    # and acknowledged ahead of a batched insert; also the idempotency key for resends
+    uid = models.UUIDField(default=uuid.uuid4, unique=True, null=True, editable=False)
     sender = models.ForeignKey(UserDetails, on_delete=models.CASCADE, related_name='sent_messages')
     receiver = models.ForeignKey(UserDetails, on_delete=models.CASCADE, related_name='received_messages')
     message = models.TextField()
     is_read = models.BooleanField(default=False)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            # Websocket resume: a vendor's messages after a (timestamp, id) cursor
+            models.Index(fields=['sender', 'timestamp', 'id'], name='vendorchat_sender_ts_idx'),
+            models.Index(fields=['receiver', 'timestamp', 'id'], name='vendorchat_receiver_ts_idx'),
+            # One conversation's history; mark-as-read
+            models.Index(fields=['sender', 'receiver', 'timestamp'], name='vendorchat_pair_ts_idx'),
+            models.Index(fields=['receiver', 'is_read'], name='vendorchat_unread_idx'),
+        ]
 
     def __str__(self):
         return f"{escape(self.sender.full_name)} to {escape(self.receiver.full_name)}"
 
+class Conversation(models.Model):
+    """Chat sidebar summary for an unordered vendor pair (vendor_low_id <= vendor_high_id).
+
+    Written by vendors.chat.record_message whenever a VendorChat row is created,
+    so the sidebar reads last message and unread counts without scanning chats.
+    """
+    vendor_low = models.ForeignKey(UserDetails, on_delete=models.CASCADE, related_name='conversations_as_low')
+    vendor_high = models.ForeignKey(UserDetails, on_delete=models.CASCADE, related_name='conversations_as_high')
+    last_message = models.ForeignKey(VendorChat, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    last_message_text = models.TextField(blank=True)
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    last_sender = models.ForeignKey(UserDetails, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    unread_for_low = models.IntegerField(default=0)
+    unread_for_high = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'conversations'
+        unique_together = ['vendor_low', 'vendor_high']
+        indexes = [
+            models.Index(fields=['vendor_high', 'vendor_low'], name='conversation_high_low_idx'),
+        ]
+
+    def __str__(self):
+        return f"Conversation {self.vendor_low_id} <-> {self.vendor_high_id}"
+
+class ConversationParticipant(models.Model):
+    """One vendor's side of a Conversation (none for a vendor chatting with itself).
+
+    Carries a copy of the conversation's last_message_at so a vendor's chat
+    sidebar is read in recency order straight from the (user, last_message_at, id)
+    index. Written together with the Conversation by vendors.chat.
+    """
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='participants')
+    user = models.ForeignKey(UserDetails, on_delete=models.CASCADE, related_name='conversation_entries')
+    other = models.ForeignKey(UserDetails, on_delete=models.CASCADE, related_name='+')
+    last_message_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'conversation_participants'
+        unique_together = ['user', 'other']
+        indexes = [
+            models.Index(fields=['user', '-last_message_at', '-id'], name='participant_recent_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.other_id}"
+
 class CalendarEvent(models.Model):
     vendor = models.ForeignKey(UserDetails, on_delete=models.CASCADE, related_name='calendar_events')
     title = models.CharField(max_length=255)
@@ -154,9 +411,104 @@ class CalendarEvent(models.Model):
     booking = models.OneToOneField(BookingDetails, on_delete=models.CASCADE, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['vendor', 'event_date'], name='calendarevent_vendor_date_idx'),
+        ]
+
     def __str__(self):
         return f"{escape(self.vendor.full_name)} - {escape(self.title)}"
 
+class VendorSearchDocument(models.Model):
+    """Denormalized text the marketplace search matches against, one row per vendor.
+
+    Kept in sync by the signal handlers in vendors.signals; the full-text index on
+    ``document`` is created per database backend in migration 0004.
+    """
+    vendor = models.OneToOneField(UserDetails, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    document = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'vendor_search_documents'
+
+    def __str__(self):
+        return f"Search document for vendor {self.vendor_id}"
+
+class Location(models.Model):
+    """Normalized place name (city, locality, state) mentioned by any vendor"""
+    name = models.CharField(max_length=255, unique=True)
+
+    class Meta:
+        db_table = 'locations'
+
+    def __str__(self):
+        return self.name
+
+class LocationTrigram(models.Model):
+    """One three-character slice of a Location name (padded with a space at each end).
+
+    The portable index for typo-tolerant location matching on backends
+    without pg_trgm (MySQL, SQLite); maintained by vendors.locations.
+    """
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='trigrams')
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        db_table = 'location_trigrams'
+        unique_together = ['trigram', 'location']
+
+    def __str__(self):
+        return f"{self.location_id}: {self.trigram!r}"
+
+class VendorLocation(models.Model):
+    """Links a vendor to every place in its profile and verification address.
+
+    Rebuilt by vendors.locations on profile/verification changes; the trigram
+    index on ``locations.name`` is created in migration 0005.
+    """
+    vendor = models.ForeignKey(UserDetails, on_delete=models.CASCADE, related_name='vendor_locations')
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='vendor_links')
+
+    class Meta:
+        db_table = 'vendor_locations'
+        unique_together = ['location', 'vendor']
+
+    def __str__(self):
+        return f"{self.vendor_id} @ {self.location_id}"
+
+class Notification(models.Model):
+    """Outbox of vendor emails, sent in per-vendor digests by ``send_notifications`` (vendors/notifications.py)"""
+    KIND_CHOICES = [
+        ('verification', 'Verification result'),
+        ('booking_status', 'Booking status change'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    vendor = models.ForeignKey(UserDetails, on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    # When a worker may (re)try it; claiming a batch pushes it past the claim's lease
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'notification_outbox'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='notification_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} for vendor {self.vendor_id} ({self.status})"
+
 # Backward compatibility aliases
 Vendor = UserDetails
 Booking = BookingDetails
@@ -0,0 +1,171 @@
+"""Vendor notification emails through an outbox (the send_notifications command).
+
+Verification results and booking status changes are written as Notification
+rows in the same transaction as the change, so requests never wait on SMTP
+and a rolled-back change sends nothing. The send_notifications worker drains
+the outbox: it claims batches of vendors with a due notification together with
+all their pending ones (pushing next_attempt_at past a lease, with SKIP LOCKED
+so several workers can run), folds each vendor's events into one digest email
+and sends every digest of the batch over a single backend connection. New
+events only fall due after NOTIFICATIONS['DIGEST_DELAY'] seconds, so a burst
+of changes becomes one email. A failed digest is retried with exponential
+backoff until NOTIFICATIONS['MAX_ATTEMPTS'], then marked failed. Delivery is
+at least once: a worker that dies after sending but before recording it
+resends that digest once the lease runs out.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import BookingDetails, Notification, UserDetails
+
+logger = logging.getLogger(__name__)
+
+VERIFICATION_SUBJECTS = {
+    'approved': 'Verification Approved - Vendor Hub',
+    'rejected': 'Verification Rejected - Vendor Hub',
+}
+VERIFICATION_MESSAGES = {
+    'approved': 'Congratulations {name}! Your verification has been approved.',
+    'rejected': 'Hello {name}, your verification has been rejected. Please resubmit your documents.',
+}
+BOOKING_STATUS_LABELS = dict(BookingDetails.STATUS_CHOICES)
+
+
+def digest_due():
+    return timezone.now() + timedelta(seconds=settings.NOTIFICATIONS['DIGEST_DELAY'])
+
+
+def notify_verification(vendor_id, status):
+    Notification.objects.create(vendor_id=vendor_id, kind='verification', payload={'status': status},
+                                next_attempt_at=digest_due())
+
+
+def notify_booking_changes(changes):
+    """Queue one notification per (booking, previous status) pair whose status changed"""
+    due = digest_due()
+    Notification.objects.bulk_create([
+        Notification(vendor_id=booking.vendor_id, kind='booking_status', next_attempt_at=due, payload={
+            'booking_id': booking.pk, 'customer_name': booking.customer_name,
+            'service_type': booking.service_type, 'from': previous, 'to': booking.status,
+        })
+        for booking, previous in changes
+        if previous != booking.status
+    ])
+
+
+def booking_line(change):
+    return (f"Booking #{change['booking_id']} for {change['customer_name']} ({change['service_type']}): "
+            f"{BOOKING_STATUS_LABELS.get(change['from'], change['from'])} -> "
+            f"{BOOKING_STATUS_LABELS.get(change['to'], change['to'])}")
+
+
+def digest_lines(vendor, notifications):
+    """One line per event; a booking that changed several times gets one line, none if it ended where it began"""
+    lines, bookings = [], {}
+    for notification in notifications:
+        payload = notification.payload
+        if notification.kind == 'verification':
+            lines.append(VERIFICATION_MESSAGES.get(payload['status'], 'Your verification status has been updated.')
+                         .format(name=vendor.full_name))
+        else:
+            bookings.setdefault(payload['booking_id'], dict(payload))['to'] = payload['to']
+    return lines + [booking_line(change) for change in bookings.values() if change['from'] != change['to']]
+
+
+def build_digest(vendor, notifications):
+    """The EmailMessage for ``vendor``'s pending ``notifications``, or None if they cancel out"""
+    lines = digest_lines(vendor, notifications)
+    if not lines:
+        return None
+    if len(notifications) == 1 and notifications[0].kind == 'verification':
+        subject = VERIFICATION_SUBJECTS.get(notifications[0].payload['status'], 'Verification Update')
+        body = lines[0]
+    else:
+        subject = f'{len(lines)} update{"s" if len(lines) > 1 else ""} on your Vendor Hub account'
+        body = '\n'.join([f'Hello {vendor.full_name},', '', *(f'- {line}' for line in lines)])
+    return EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [vendor.email])
+
+
+def claim_batch(batch_size):
+    """Lease the pending notifications of up to ``batch_size`` vendors with one due, grouped by vendor"""
+    config = settings.NOTIFICATIONS
+    now = timezone.now()
+    with transaction.atomic():
+        due = (Notification.objects.select_for_update(skip_locked=True)
+               .filter(status='pending', next_attempt_at__lte=now).order_by('next_attempt_at', 'id'))
+        vendor_ids = []
+        for vendor_id in due.values_list('vendor_id', flat=True).iterator():
+            if vendor_id not in vendor_ids:
+                vendor_ids.append(vendor_id)
+                if len(vendor_ids) == batch_size:
+                    break
+        claimed = list(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', vendor_id__in=vendor_ids).order_by('id')
+        )
+        Notification.objects.filter(pk__in=[n.pk for n in claimed]).update(
+            next_attempt_at=now + timedelta(seconds=config['LEASE'])
+        )
+    by_vendor = {}
+    for notification in claimed:
+        by_vendor.setdefault(notification.vendor_id, []).append(notification)
+    return by_vendor
+
+
+def retry_delay(attempts):
+    config = settings.NOTIFICATIONS
+    return timedelta(seconds=min(config['RETRY_BASE'] * 2 ** (attempts - 1), config['RETRY_MAX']))
+
+
+def record_failure(notifications, error):
+    attempts = max(n.attempts for n in notifications) + 1
+    ids = [n.pk for n in notifications]
+    Notification.objects.filter(pk__in=ids).update(
+        attempts=F('attempts') + 1, next_attempt_at=timezone.now() + retry_delay(attempts), last_error=str(error)[:1000]
+    )
+    if attempts >= settings.NOTIFICATIONS['MAX_ATTEMPTS']:
+        Notification.objects.filter(pk__in=ids).update(status='failed')
+
+
+def send_batch(batch_size=None):
+    """Claim, digest and send one batch of vendors; returns (digests sent, digests failed, notifications claimed)"""
+    batch = claim_batch(batch_size or settings.NOTIFICATIONS['BATCH_SIZE'])
+    if not batch:
+        return 0, 0, 0
+    vendors = UserDetails.objects.only('id', 'email', 'full_name').in_bulk(batch.keys())
+
+    sent, failed, done = 0, 0, []
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        logger.warning("Notification backend unavailable: %s", e)
+        for notifications in batch.values():
+            record_failure(notifications, e)
+        return 0, len(batch), sum(len(notifications) for notifications in batch.values())
+    try:
+        for vendor_id, notifications in batch.items():
+            # None: the vendor was deleted since, or the changes cancel out
+            message = build_digest(vendors[vendor_id], notifications) if vendor_id in vendors else None
+            if message is None:
+                done.extend(notifications)
+                continue
+            try:
+                connection.send_messages([message])
+            except Exception as e:
+                logger.warning("Notification digest for vendor %s failed: %s", vendor_id, e)
+                record_failure(notifications, e)
+                failed += 1
+            else:
+                done.extend(notifications)
+                sent += 1
+    finally:
+        connection.close()
+        Notification.objects.filter(pk__in=[n.pk for n in done]).update(status='sent', sent_at=timezone.now())
+    return sent, failed, sum(len(notifications) for notifications in batch.values())
@@ -0,0 +1,123 @@
+"""Password hashing off the request thread.
+
+PBKDF2 at Django's default work factor takes tens of milliseconds of CPU per
+call. Under ASGI, sync views share one thread, so a login hashing inline
+stalls every other request. Here hashing runs in a dedicated thread pool
+sized by PASSWORD_HASHING['WORKERS'] (hashlib releases the GIL, so workers
+run in parallel). At most MAX_PENDING calls may be queued; beyond that
+HashingBusy is raised and the view answers 503 instead of letting the
+backlog grow.
+
+aauthenticate_vendor() walks AUTHENTICATION_BACKENDS like authenticate();
+for ModelBackends only the hasher call goes to the pool, and stored hashes
+whose hasher or iteration count is outdated are upgraded by writing only the
+password column.
+"""
+import asyncio
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model, load_backend
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.signals import user_login_failed
+from django.core.exceptions import PermissionDenied
+
+
+class HashingBusy(Exception):
+    """Too many password hashes are already queued"""
+
+
+_executor = None
+_pending = 0
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASHING['WORKERS'], thread_name_prefix='password-hash'
+        )
+    return _executor
+
+
+def _submit(func, *args):
+    global _pending
+    with _lock:
+        if _pending >= settings.PASSWORD_HASHING['MAX_PENDING']:
+            raise HashingBusy()
+        _pending += 1
+
+    def run():
+        global _pending
+        try:
+            return func(*args)
+        finally:
+            with _lock:
+                _pending -= 1
+
+    return asyncio.wrap_future(_get_executor().submit(run))
+
+
+def _verify(raw_password, encoded):
+    """(valid, replacement hash or None) for ``raw_password`` against ``encoded``"""
+    upgraded = []
+    valid = check_password(raw_password, encoded, setter=lambda raw: upgraded.append(make_password(raw)))
+    return valid, upgraded[0] if upgraded else None
+
+
+async def amake_password(raw_password):
+    return await _submit(make_password, raw_password)
+
+
+async def aauthenticate_vendor(request, email, password):
+    """The vendor authenticate() would return for these credentials, or None.
+
+    Sends user_login_failed when no backend accepts them. Backends other than
+    ModelBackend run unchanged on a worker thread.
+    """
+    credentials = {'username': email, 'password': password}
+    for backend_path in settings.AUTHENTICATION_BACKENDS:
+        backend = load_backend(backend_path)
+        try:
+            if isinstance(backend, ModelBackend):
+                user = await _amodel_backend_authenticate(backend, email, password)
+            else:
+                try:
+                    inspect.signature(backend.authenticate).bind(request, **credentials)
+                except TypeError:
+                    continue  # This backend doesn't accept these credentials
+                user = await sync_to_async(backend.authenticate)(request, **credentials)
+        except PermissionDenied:
+            break  # This backend says to stop
+        if user is not None:
+            user.backend = backend_path
+            return user
+
+    await sync_to_async(user_login_failed.send)(
+        sender=__name__, credentials={'username': email, 'password': '********************'}, request=request
+    )
+    return None
+
+
+async def _amodel_backend_authenticate(backend, username, password):
+    """ModelBackend.authenticate() with the hasher call on the pool"""
+    UserModel = get_user_model()
+    try:
+        user = await UserModel._default_manager.aget(**{UserModel.USERNAME_FIELD: username})
+    except UserModel.DoesNotExist:
+        # Hash anyway so response time doesn't reveal whether the email exists
+        await amake_password(password)
+        return None
+
+    valid, upgraded = await _submit(_verify, password, user.password)
+    if upgraded:
+        await UserModel._default_manager.filter(pk=user.pk).aupdate(password=upgraded)
+        user.password = upgraded
+    if valid and backend.user_can_authenticate(user):
+        return user
+    return None
@@ -0,0 +1,91 @@
+"""Vendor presence kept in the cache instead of UserDetails.is_online.
+
+touch() records a heartbeat (login, an authenticated API request, websocket
+activity) as a cache key that expires after PRESENCE['TTL'] seconds, so a
+vendor whose browser simply closes drops offline without any request.
+Readers ask online_vendor_ids() for a whole page at once (one cache
+get_many). flush_presence() copies the cache state into is_online with at most
+two UPDATEs; it never runs on the request path, the flush_presence command
+runs it once (cron) or every FLUSH_INTERVAL with --loop.
+
+Vendors coming online are appended to a small log in the cache (a counter
+plus one key per entry) so the flush can find them without scanning keys.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import UserDetails
+
+PRESENCE_KEY = 'presence:{}'
+JOIN_SEQ_KEY = 'presence:joined:seq'
+JOIN_KEY = 'presence:joined:{}'
+FLUSHED_SEQ_KEY = 'presence:flushed:seq'
+
+# vendor id -> when this process last refreshed the vendor's key, so chatty
+# clients don't write to the cache on every request
+_last_touch = {}
+
+
+def touch(vendor_id, force=False):
+    """Heartbeat for ``vendor_id``; cheap enough to call on every request"""
+    config = settings.PRESENCE
+    now = time.monotonic()
+    if not force and now - _last_touch.get(vendor_id, float('-inf')) < config['TOUCH_INTERVAL']:
+        return
+    if len(_last_touch) > 10000:
+        _last_touch.clear()
+    _last_touch[vendor_id] = now
+
+    key = PRESENCE_KEY.format(vendor_id)
+    if cache.add(key, 1, config['TTL']):
+        _log_join(vendor_id, config)
+    else:
+        cache.touch(key, config['TTL'])
+
+
+def mark_offline(vendor_id):
+    cache.delete(PRESENCE_KEY.format(vendor_id))
+    _last_touch.pop(vendor_id, None)
+
+
+def _log_join(vendor_id, config):
+    cache.add(JOIN_SEQ_KEY, 0, None)
+    seq = cache.incr(JOIN_SEQ_KEY)
+    # Kept for several flush intervals in case a scheduled flush is late
+    cache.set(JOIN_KEY.format(seq), vendor_id, config['FLUSH_INTERVAL'] * 10)
+
+
+def is_online(vendor_id):
+    return cache.get(PRESENCE_KEY.format(vendor_id)) is not None
+
+
+def online_vendor_ids(vendor_ids):
+    """The subset of ``vendor_ids`` with a live heartbeat, from one cache get_many"""
+    keys = {PRESENCE_KEY.format(vendor_id): vendor_id for vendor_id in vendor_ids}
+    return {keys[key] for key in cache.get_many(list(keys))}
+
+
+def flush_presence(chunk_size=1000):
+    """Copy cache presence into UserDetails.is_online; returns (marked online, marked offline)"""
+    seq = cache.get(JOIN_SEQ_KEY, 0)
+    start = cache.get(FLUSHED_SEQ_KEY, 0)
+    if start > seq:
+        start = 0  # The counter was evicted and restarted
+
+    joined = set()
+    for offset in range(start + 1, seq + 1, chunk_size):
+        keys = [JOIN_KEY.format(n) for n in range(offset, min(offset + chunk_size, seq + 1))]
+        joined.update(cache.get_many(keys).values())
+
+    flagged = set(UserDetails.objects.filter(is_online=True).values_list('id', flat=True))
+    online = online_vendor_ids(joined | flagged)
+    went_online, went_offline = online - flagged, flagged - online
+    # update() leaves updated_at alone; presence is not a profile edit
+    if went_online:
+        UserDetails.objects.filter(id__in=went_online).update(is_online=True)
+    if went_offline:
+        UserDetails.objects.filter(id__in=went_offline).update(is_online=False)
+    cache.set(FLUSHED_SEQ_KEY, seq, None)
+    return len(went_online), len(went_offline)
@@ -0,0 +1,187 @@
+"""EXPLAIN-based checks that the API's hot queries are served by indexes.
+
+endpoint_queries() builds the query behind every GET endpoint in
+vendors.api.urls, as its paginator runs it for the first page (ORDER BY and
+LIMIT included), and hot_filter_queries() the filters that run outside a
+view's get_queryset(). analyze() explains each one and reports full table
+scans and explicit sorts, with a suggested composite index built from the
+query's equality filters, range filter and ordering. Known problems listed in
+ACCEPTED_DEBT are still reported, only marked as accepted. Used by the
+analyze_queries command and the plan regression test.
+"""
+import re
+from collections import namedtuple
+
+from django.apps import apps
+from django.db import connection, transaction
+from django.db.models.expressions import Col
+from django.db.models.sql.where import AND, WhereNode
+from django.urls import URLPattern
+from django.utils import timezone
+from rest_framework.generics import GenericAPIView
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from .api import urls as api_urls
+from .api.pagination import KeysetPagination
+from .models import BookingDetails, CalendarEvent, VendorChat, VendorService
+
+PlanReport = namedtuple('PlanReport', 'name plan full_scans sorted proposal accepted')
+
+# Plan problems known and not fixed yet: reported as warnings, never as OK
+ACCEPTED_DEBT = {
+    'chat-messages': "merges the vendor's sent and received messages, so the page is sorted after the index lookups",
+}
+
+FULL_SCAN_PATTERNS = {
+    'postgresql': r'Seq Scan on (\w+)',
+    'mysql': r'Table scan on (\w+)',
+    'sqlite': r'\bSCAN (\w+)',
+}
+SORT_PATTERNS = {
+    'postgresql': r'(?:^|->\s+)(?:Incremental )?Sort\b',
+    'mysql': r'(?:^|->\s+)Sort\b',
+    'sqlite': r'USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY',
+}
+
+EQUALITY_LOOKUPS = {'exact', 'iexact', 'in', 'isnull'}
+
+
+def endpoint_queries(vendor, other):
+    """(url name, queryset) for each GET endpoint backed by a generic view's get_queryset()"""
+    factory = APIRequestFactory()
+    queries = []
+    for pattern in api_urls.urlpatterns:
+        if not isinstance(pattern, URLPattern):
+            continue
+        view_class = getattr(pattern.callback, 'view_class', None)
+        if view_class is None or not issubclass(view_class, GenericAPIView) or not hasattr(view_class, 'get'):
+            continue
+
+        view = view_class()
+        view.request = Request(factory.get('/'))
+        view.request.user = vendor
+        view.format_kwarg = None
+        view.kwargs = {'vendor_id': other.pk} if 'vendor_id' in pattern.pattern.converters else {}
+        try:
+            queryset = view.get_queryset()
+        except AssertionError:
+            continue  # No queryset (create-only or custom get_object)
+        if 'pk' in pattern.pattern.converters:
+            queryset = queryset.filter(pk=queryset.values_list('pk', flat=True).first() or 0)
+            queries.append((pattern.name, queryset))
+        elif isinstance(queryset, list):
+            # Querysets read one after another (ChainedKeysetPagination)
+            queries += [(f'{pattern.name}[{n}]', first_page(view, segment)) for n, segment in enumerate(queryset)]
+        else:
+            queries.append((pattern.name, first_page(view, queryset)))
+    return queries
+
+
+def first_page(view, queryset):
+    """The query ``view``'s paginator runs for the first page of ``queryset``: its ORDER BY and LIMIT"""
+    paginator = view.paginator
+    if isinstance(paginator, KeysetPagination):
+        paginator.use_queryset(queryset)
+        return paginator.page_queryset(queryset, None, not paginator.start_at_end, paginator.page_size + 1)
+    page_size = getattr(paginator, 'page_size', None)
+    return queryset[:page_size] if page_size else queryset
+
+
+def hot_filter_queries(vendor, other):
+    """Filters the API runs outside get_queryset(): updates, counts and prefetches"""
+    return [
+        ('mark-messages-read', VendorChat.objects.filter(sender=other, receiver=vendor, is_read=False).order_by()),
+        ('unread-messages', VendorChat.objects.filter(receiver=vendor, is_read=False).order_by()),
+        ('chat-pair-history', VendorChat.objects.filter(sender=vendor, receiver=other).order_by('timestamp')),
+        ('bookings-by-status', BookingDetails.objects.filter(vendor=vendor, status='pending').order_by('-created_at')),
+        ('active-services', VendorService.objects.filter(user_id__in=[vendor.pk], is_active=True)),
+        ('upcoming-events', CalendarEvent.objects.filter(vendor=vendor, event_date__gte=timezone.now()).order_by('event_date')),
+    ]
+
+
+def explain(queryset):
+    if connection.vendor == 'mysql':
+        return queryset.explain(format='TREE')
+    return queryset.explain()
+
+
+def table_names():
+    return {model._meta.db_table.lower() for model in apps.get_models()}
+
+
+def read_plan(plan, limited=False):
+    """(tables scanned in full, whether rows are sorted after fetching) for an EXPLAIN output
+
+    SQLite prints the same SCAN for a whole table and for a walk down an index
+    (or the rowid) in ORDER BY order. When the query is ``limited`` and nothing
+    is sorted, the outer loop is such a walk and stops once the page is full, so
+    it is not counted. PostgreSQL and MySQL name index walks differently.
+    """
+    vendor = connection.vendor
+    sorted_rows = bool(re.search(SORT_PATTERNS.get(vendor, r'(?!)'), plan, re.MULTILINE))
+    if vendor == 'sqlite' and limited and not sorted_rows:
+        outer_loop = re.search(r'^\d+ 0 \d+ (?:SCAN|SEARCH) .*$', plan, re.MULTILINE)
+        if outer_loop and ' SCAN ' in outer_loop.group():
+            plan = plan[:outer_loop.start()] + plan[outer_loop.end():]
+    tables = table_names()
+    full_scans = {
+        name.lower() for name in re.findall(FULL_SCAN_PATTERNS.get(vendor, r'(?!)'), plan)
+        if name.lower() in tables
+    }
+    return full_scans, sorted_rows
+
+
+def propose_index(queryset):
+    """Fields for a composite index serving ``queryset``: equality filters, one range filter, the ordering"""
+    query = queryset.query
+    equality, ranges = [], []
+
+    def walk(node):
+        for child in node.children:
+            if isinstance(child, WhereNode):
+                if child.connector == AND and not child.negated:
+                    walk(child)
+                continue
+            lhs = getattr(child, 'lhs', None)
+            if isinstance(lhs, Col) and lhs.target.model is query.model:
+                name = lhs.target.name
+                if name not in equality and name not in ranges:
+                    (equality if child.lookup_name in EQUALITY_LOOKUPS else ranges).append(name)
+
+    walk(query.where)
+    # filter() kwargs arrive sorted by name; lead with the foreign keys, which are the selective columns
+    equality.sort(key=lambda name: not query.get_meta().get_field(name).is_relation)
+    fields = equality + ranges[:1]
+    ordering = query.order_by or query.get_meta().ordering
+    for name in ordering:
+        name = name.lstrip('-') if isinstance(name, str) else None
+        if name and name not in ('pk', 'id') and name not in fields and '__' not in name:
+            fields.append(name)
+            break
+    if not fields:
+        return None
+    return f"{query.model.__name__}: models.Index(fields={fields!r})"
+
+
+def analyze(vendor, other, force_index=True):
+    """PlanReport for every endpoint and hot filter, flagging full scans and sorts.
+
+    ``accepted`` holds the ACCEPTED_DEBT reason when a flagged query is listed there.
+
+    With ``force_index`` PostgreSQL is told to avoid sequential scans, so on a
+    small or unanalyzed table a Seq Scan still means no usable index exists.
+    """
+    reports = []
+    with transaction.atomic():
+        if force_index and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        for name, queryset in endpoint_queries(vendor, other) + hot_filter_queries(vendor, other):
+            plan = explain(queryset)
+            full_scans, sorted_rows = read_plan(plan, limited=queryset.query.high_mark is not None)
+            flagged = bool(full_scans or sorted_rows)
+            proposal = propose_index(queryset) if flagged else None
+            accepted = ACCEPTED_DEBT.get(name) if flagged else None
+            reports.append(PlanReport(name, plan, sorted(full_scans), sorted_rows, proposal, accepted))
+    return reports
@@ -0,0 +1,128 @@
+"""Full-text search for the vendor marketplace.
+
+Every vendor has a VendorSearchDocument holding its name, business and active
+services as one block of text. Searches hit that single indexed column instead
+of OR-ing icontains lookups across the services join:
+
+- PostgreSQL: GIN index on ``to_tsvector('simple', document)``, ranked with ts_rank
+- MySQL: FULLTEXT index, ranked with MATCH ... AGAINST in boolean mode
+- anything else (SQLite in tests): AND of icontains lookups on the document
+"""
+import re
+
+from django.db import connection
+from django.db.models import BigIntegerField, F, FloatField, Func, Value
+from django.db.models.functions import Cast
+
+from .models import UserDetails, VendorSearchDocument, VendorService
+
+TOKEN_RE = re.compile(r'\w+')
+MAX_SEARCH_TOKENS = 8
+# Search pages seek on search_rank (vendors/api/pagination.py). A float rank
+# doesn't survive the cursor (ts_rank is float4, the cursor holds its float8
+# widening), so ranks are scaled to integers; id breaks the ties
+RANK_SCALE = 10 ** 6
+
+
+def tokenize(term):
+    return TOKEN_RE.findall(term.lower())[:MAX_SEARCH_TOKENS]
+
+
+def build_document(full_name, business, services):
+    """Join a vendor's searchable fields; ``services`` is (name, category, description) tuples"""
+    parts = [full_name, business]
+    for service_name, category, description in services:
+        parts.extend([service_name, category, description])
+    return ' '.join(part for part in parts if part).lower()
+
+
+def reindex_vendors(vendor_ids, batch_size=1000):
+    """Rebuild the search documents for ``vendor_ids`` with one upsert per batch"""
+    vendor_ids = list(vendor_ids)
+    for start in range(0, len(vendor_ids), batch_size):
+        batch = vendor_ids[start:start + batch_size]
+        services = {}
+        for user_id, name, category, description in VendorService.objects.filter(
+            user_id__in=batch, is_active=True
+        ).order_by('id').values_list('user_id', 'service_name', 'category', 'description'):
+            services.setdefault(user_id, []).append((name, category, description))
+
+        documents = [
+            VendorSearchDocument(
+                vendor_id=vendor_id,
+                document=build_document(full_name, business, services.get(vendor_id, [])),
+            )
+            for vendor_id, full_name, business in UserDetails.objects.filter(
+                id__in=batch
+            ).values_list('id', 'full_name', 'business')
+        ]
+        VendorSearchDocument.objects.bulk_create(
+            documents,
+            update_conflicts=True,
+            # MySQL's ON DUPLICATE KEY UPDATE takes no conflict target
+            unique_fields=['vendor'] if connection.features.supports_update_conflicts_with_target else None,
+            update_fields=['document', 'updated_at'],
+        )
+
+
+def reindex_vendor(vendor_id):
+    reindex_vendors([vendor_id])
+
+
+def keyset_rank(rank):
+    """``rank`` as an integer that compares exactly against a cursor value"""
+    return Cast(rank * Value(RANK_SCALE), output_field=BigIntegerField())
+
+
+class MatchAgainst(Func):
+    """MySQL FULLTEXT relevance of a column for a boolean-mode query"""
+    output_field = FloatField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        column_sql, column_params = compiler.compile(self.source_expressions[0])
+        query_sql, query_params = compiler.compile(self.source_expressions[1])
+        sql = f'MATCH ({column_sql}) AGAINST ({query_sql} IN BOOLEAN MODE)'
+        return sql, (*column_params, *query_params)
+
+
+def _search_postgresql(queryset, tokens):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+
+    # Must match the expression of the vendor_search_doc_gin index
+    vector = Func(
+        F('search_document__document'),
+        function='to_tsvector',
+        template="%(function)s('simple', %(expressions)s)",
+        output_field=SearchVectorField(),
+    )
+    # Prefix match every token so results update while the user types
+    query = SearchQuery(' & '.join(f'{token}:*' for token in tokens), config='simple', search_type='raw')
+    return queryset.annotate(
+        search_vector=vector,
+        search_rank=keyset_rank(SearchRank(vector, query)),
+    ).filter(search_vector=query).order_by('-search_rank', 'id')
+
+
+def _search_mysql(queryset, tokens):
+    boolean_query = ' '.join(f'+{token}*' for token in tokens)
+    return queryset.annotate(
+        search_rank=keyset_rank(MatchAgainst(F('search_document__document'), Value(boolean_query)))
+    ).filter(search_rank__gt=0).order_by('-search_rank', 'id')
+
+
+def _search_fallback(queryset, tokens):
+    for token in tokens:
+        queryset = queryset.filter(search_document__document__icontains=token)
+    return queryset
+
+
+def search_vendors(queryset, term):
+    """Filter a UserDetails queryset to vendors matching ``term``, best matches first"""
+    tokens = tokenize(term)
+    if not tokens:
+        return queryset
+    if connection.vendor == 'postgresql':
+        return _search_postgresql(queryset, tokens)
+    if connection.vendor == 'mysql':
+        return _search_mysql(queryset, tokens)
+    return _search_fallback(queryset, tokens)
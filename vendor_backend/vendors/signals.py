@@ -0,0 +1,75 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import listing_cache
+from .locations import reindex_vendor_location
+from .notifications import notify_verification
+from .models import UserDetails, VendorService, ProfileDetails, VerificationDetails, ImageAsset
+from .search import reindex_vendor
+
+# UserDetails fields that end up in the vendor search document
+SEARCH_DOCUMENT_FIELDS = {'full_name', 'business'}
+# UserDetails fields that marketplace listings never show
+UNLISTED_FIELDS = {'password', 'is_online'}
+
+
+def schedule_reindex(vendor_id):
+    transaction.on_commit(lambda: reindex_vendor(vendor_id))
+
+
+@receiver(post_save, sender=UserDetails)
+def reindex_vendor_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not SEARCH_DOCUMENT_FIELDS.intersection(update_fields):
+        return
+    schedule_reindex(instance.pk)
+
+
+@receiver(post_save, sender=VendorService)
+@receiver(post_delete, sender=VendorService)
+def reindex_vendor_on_service_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    schedule_reindex(instance.user_id)
+
+
+@receiver(post_save, sender=ProfileDetails)
+@receiver(post_save, sender=VerificationDetails)
+@receiver(post_delete, sender=ProfileDetails)
+@receiver(post_delete, sender=VerificationDetails)
+def reindex_locations_on_address_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    user_id = instance.user_id
+    transaction.on_commit(lambda: reindex_vendor_location(user_id))
+
+
+@receiver(post_save, sender=UserDetails)
+@receiver(post_save, sender=ProfileDetails)
+@receiver(post_save, sender=VendorService)
+@receiver(post_save, sender=VerificationDetails)
+@receiver(post_save, sender=ImageAsset)
+@receiver(post_delete, sender=UserDetails)
+@receiver(post_delete, sender=ProfileDetails)
+@receiver(post_delete, sender=VendorService)
+@receiver(post_delete, sender=VerificationDetails)
+def invalidate_listings(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and set(update_fields) <= UNLISTED_FIELDS:
+        return
+    # Now, so this transaction reads fresh pages, and after commit, so nobody caches
+    # a page read from the old rows in between
+    listing_cache.invalidate()
+    transaction.on_commit(listing_cache.invalidate)
+
+
+@receiver(post_save, sender=VerificationDetails)
+def notify_verification_result(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance.status in ('approved', 'rejected') and instance.status != getattr(instance, '_loaded_status', None):
+        notify_verification(instance.user_id, instance.status)
+    instance._loaded_status = instance.status
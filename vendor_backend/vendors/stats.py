@@ -0,0 +1,115 @@
+"""Incrementally maintained per-vendor dashboard counters (VendorStats).
+
+BookingDetails.save()/delete() call apply_booking_change() inside their own
+transaction with the booking's state before and after the write, so the
+dashboard reads one row instead of aggregating the bookings table. Bulk
+writes (vendors/bookings.py) pass all their changes to apply_booking_changes()
+at once. Both also move the daily analytics rollups (vendors/analytics.py).
+compute_vendor_stats() derives the same numbers from scratch for the
+rebuild_vendor_stats command.
+"""
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .analytics import apply_rollup_changes
+from .models import BookingDetails, VendorStats
+
+STATUS_COUNTERS = {
+    'pending': 'pending_bookings',
+    'in_progress': 'in_progress_bookings',
+    'completed': 'completed_bookings',
+}
+COUNTER_FIELDS = ['total_bookings', *STATUS_COUNTERS.values(), 'total_revenue', 'monthly_revenue']
+
+
+def current_month():
+    return timezone.localdate().replace(day=1)
+
+
+def _contribution(snapshot, month):
+    """What one booking in ``snapshot`` state adds to its vendor's counters"""
+    vendor_id, status, amount, created_at = snapshot
+    delta = {'total_bookings': 1}
+    if status in STATUS_COUNTERS:
+        delta[STATUS_COUNTERS[status]] = 1
+    if status == 'completed':
+        amount = Decimal(str(amount or 0))
+        delta['total_revenue'] = amount
+        if created_at and timezone.localdate(created_at) >= month:
+            delta['monthly_revenue'] = amount
+    return vendor_id, delta
+
+
+def apply_booking_change(old, new):
+    """Move VendorStats from booking snapshot ``old`` to ``new`` (None for create/delete)"""
+    apply_booking_changes([(old, new)])
+
+
+def apply_booking_changes(changes):
+    """apply_booking_change() for many (old, new) pairs with one stats write per vendor"""
+    apply_rollup_changes(changes)
+    month = current_month()
+    totals = {}
+    for old, new in changes:
+        if old == new:
+            continue
+        for snapshot, sign in ((old, -1), (new, 1)):
+            if snapshot is None:
+                continue
+            vendor_id, delta = _contribution(snapshot, month)
+            vendor_changes = totals.setdefault(vendor_id, {})
+            for field, value in delta.items():
+                vendor_changes[field] = vendor_changes.get(field, 0) + sign * value
+
+    for vendor_id, delta in totals.items():
+        if not any(delta.values()):
+            continue
+        stats, _ = VendorStats.objects.select_for_update().get_or_create(vendor_id=vendor_id)
+        if stats.revenue_month != month:
+            stats.monthly_revenue = 0
+            stats.revenue_month = month
+        for field, value in delta.items():
+            setattr(stats, field, getattr(stats, field) + value)
+        stats.save()
+
+
+def get_dashboard_stats(vendor):
+    """Dashboard counters for ``vendor`` from a single primary-key read"""
+    stats = VendorStats.objects.filter(vendor_id=vendor.pk).first()
+    if stats is None:
+        return {field: 0 for field in COUNTER_FIELDS}
+    data = {field: getattr(stats, field) for field in COUNTER_FIELDS}
+    if stats.revenue_month != current_month():
+        data['monthly_revenue'] = 0
+    return data
+
+
+def compute_vendor_stats(vendor_ids=None):
+    """VendorStats rows (unsaved) aggregated from the bookings table, keyed by vendor id"""
+    month = current_month()
+    month_start = timezone.make_aware(datetime.combine(month, time.min))
+    completed = Q(status='completed')
+    bookings = BookingDetails.objects.all()
+    if vendor_ids is not None:
+        bookings = bookings.filter(vendor_id__in=vendor_ids)
+
+    rows = bookings.values('vendor_id').annotate(
+        total_bookings=Count('id'),
+        pending_bookings=Count('id', filter=Q(status='pending')),
+        in_progress_bookings=Count('id', filter=Q(status='in_progress')),
+        completed_bookings=Count('id', filter=completed),
+        total_revenue=Sum('amount', filter=completed),
+        monthly_revenue=Sum('amount', filter=completed & Q(created_at__gte=month_start)),
+    ).order_by()
+
+    return {
+        row['vendor_id']: VendorStats(
+            vendor_id=row['vendor_id'],
+            revenue_month=month,
+            **{field: row[field] or 0 for field in COUNTER_FIELDS},
+        )
+        for row in rows
+    }
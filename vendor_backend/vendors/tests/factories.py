@@ -0,0 +1,12 @@
+from ..models import ProfileDetails, UserDetails
+
+
+def create_vendor(email, business='Photography', city=None, **fields):
+    """A vendor with the required profile fields filled in; ``city`` also creates its ProfileDetails"""
+    vendor = UserDetails.objects.create(**{
+        'username': email, 'email': email, 'full_name': 'Test Vendor', 'business': business,
+        'experience_level': 'Expert', **fields,
+    })
+    if city is not None:
+        ProfileDetails.objects.create(user=vendor, location='Patia', city=city)
+    return vendor
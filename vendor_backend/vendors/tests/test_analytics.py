@@ -0,0 +1,140 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from importlib import import_module
+from io import StringIO
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from ..bookings import bulk_update_status
+from ..models import BookingDailyRollup, BookingDetails, UserDetails
+from ..utils.helpers import get_booking_analytics
+from .test_queries import QueryBudgetMixin
+
+
+class BookingAnalyticsTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.vendor = UserDetails.objects.create(
+            username='vendor@example.com', email='vendor@example.com',
+            full_name='Test Vendor', business='Photography', experience_level='Expert'
+        )
+        self.client.force_authenticate(user=self.vendor)
+
+    def create_booking(self, amount, created, status='pending'):
+        booking = BookingDetails.objects.create(
+            vendor=self.vendor, customer_name='John Doe', service_type='Wedding Photography',
+            event_date='2025-12-25', amount=amount, status=status, location='Puri'
+        )
+        created_at = datetime.combine(created, datetime.min.time(), tzinfo=dt_timezone.utc) + timedelta(hours=10)
+        BookingDetails.objects.filter(pk=booking.pk).update(created_at=created_at)
+        call_command('rebuild_booking_rollups', stdout=StringIO())
+        return BookingDetails.objects.get(pk=booking.pk)
+
+    def get(self, **params):
+        return self.assertQueryBudget('booking-analytics', reverse('booking-analytics'), **params).data
+
+    def test_rollups_follow_booking_lifecycle(self):
+        first = BookingDetails.objects.create(
+            vendor=self.vendor, customer_name='John Doe', service_type='Wedding Photography',
+            event_date='2025-12-25', amount=1500, location='Puri'
+        )
+        second = BookingDetails.objects.create(
+            vendor=self.vendor, customer_name='Jane Doe', service_type='Wedding Photography',
+            event_date='2025-12-26', amount=2500, location='Puri'
+        )
+        first.status = 'completed'
+        first.save()
+        bulk_update_status(self.vendor, [{'id': second.pk, 'status': 'in_progress'}])
+        BookingDetails.objects.get(pk=second.pk).delete()
+
+        rollups = {
+            rollup.status: (rollup.bookings, rollup.revenue)
+            for rollup in BookingDailyRollup.objects.filter(vendor=self.vendor)
+        }
+        self.assertEqual(rollups, {
+            'pending': (0, Decimal('0')),
+            'in_progress': (0, Decimal('0')),
+            'completed': (1, Decimal('1500')),
+        })
+        call_command('rebuild_booking_rollups', '--verify', stdout=StringIO())
+
+    def test_series_by_interval(self):
+        self.create_booking(1000, date(2025, 1, 6), status='completed')  # Monday
+        self.create_booking(2000, date(2025, 1, 8), status='completed')
+        self.create_booking(500, date(2025, 1, 8))
+        self.create_booking(4000, date(2025, 2, 3), status='completed')
+        self.create_booking(9000, date(2024, 12, 31), status='completed')  # Before the window
+
+        daily = self.get(start='2025-01-01', end='2025-02-28')
+        self.assertEqual([(point['period'], point['status'], point['count']) for point in daily['series']], [
+            ('2025-01-06', 'completed', 1),
+            ('2025-01-08', 'completed', 1),
+            ('2025-01-08', 'pending', 1),
+            ('2025-02-03', 'completed', 1),
+        ])
+
+        weekly = self.get(start='2025-01-01', end='2025-02-28', interval='week')
+        self.assertEqual(weekly['series'][0], {
+            'period': '2025-01-06', 'status': 'completed', 'count': 2, 'revenue': '3000.00', 'average_value': '1500.00',
+        })
+
+        monthly = self.get(start='2025-01-01', end='2025-02-28', interval='month')
+        self.assertEqual([(point['period'], point['status'], point['revenue']) for point in monthly['series']], [
+            ('2025-01-01', 'completed', '3000.00'),
+            ('2025-01-01', 'pending', '500.00'),
+            ('2025-02-01', 'completed', '4000.00'),
+        ])
+        self.assertEqual(monthly['totals']['completed'], {'count': 3, 'revenue': '7000.00', 'average_value': '2333.33'})
+        self.assertEqual(monthly['totals']['in_progress'], {'count': 0, 'revenue': '0.00', 'average_value': '0.00'})
+
+    def test_other_vendors_bookings_are_excluded(self):
+        other = UserDetails.objects.create(
+            username='other@example.com', email='other@example.com',
+            full_name='Other Vendor', business='Catering', experience_level='Expert'
+        )
+        BookingDetails.objects.create(
+            vendor=other, customer_name='John Doe', service_type='Buffet',
+            event_date='2025-12-25', amount=700, location='Puri'
+        )
+        self.assertEqual(self.get()['series'], [])
+
+    def test_invalid_query(self):
+        response = self.client.get(reverse('booking-analytics'), {'interval': 'year'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('booking-analytics'), {'start': '2025-02-01', 'end': '2025-01-01'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_helper_reads_rollups(self):
+        today = timezone.localdate()
+        self.create_booking(1000, today, status='completed')
+        self.create_booking(3000, today, status='completed')
+        self.create_booking(500, today)
+
+        analytics = get_booking_analytics(self.vendor)
+        self.assertEqual(analytics['total_bookings'], 3)
+        self.assertEqual(analytics['pending_count'], 1)
+        self.assertEqual(analytics['total_revenue'], Decimal('4000'))
+        self.assertEqual(analytics['average_booking_value'], Decimal('2000'))
+
+    def test_verify_and_rebuild_command(self):
+        self.create_booking(1000, date(2025, 1, 6), status='completed')
+        BookingDetails.objects.update(amount=3000)  # bypasses save()
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_booking_rollups', '--verify', stdout=StringIO())
+        call_command('rebuild_booking_rollups', stdout=StringIO())
+        call_command('rebuild_booking_rollups', '--verify', stdout=StringIO())
+        self.assertEqual(BookingDailyRollup.objects.get(vendor=self.vendor).revenue, Decimal('3000'))
+
+    def test_migration_backfills_existing_bookings(self):
+        self.create_booking(1000, date(2025, 1, 6), status='completed')
+        self.create_booking(500, date(2025, 1, 6))
+        BookingDailyRollup.objects.all().delete()
+
+        import_module('vendors.migrations.0013_booking_daily_rollups').backfill_rollups(apps, None)
+        call_command('rebuild_booking_rollups', '--verify', stdout=StringIO())
+        self.assertEqual(BookingDailyRollup.objects.count(), 2)
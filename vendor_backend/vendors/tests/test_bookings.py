@@ -0,0 +1,85 @@
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..models import BookingDetails, VendorStats
+from ..stats import compute_vendor_stats
+from .factories import create_vendor
+
+
+class BulkBookingStatusTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.vendor = create_vendor('vendor@example.com')
+        self.client.force_authenticate(user=self.vendor)
+
+    def create_bookings(self, count, status='pending', vendor=None):
+        return [
+            BookingDetails.objects.create(
+                vendor=vendor or self.vendor, customer_name='John Doe', service_type='Wedding Photography',
+                event_date='2025-12-25', amount=1000, status=status, location='Puri'
+            )
+            for _ in range(count)
+        ]
+
+    def post(self, changes):
+        return self.client.post(reverse('booking-bulk-status'), changes, format='json')
+
+    def assertStatsConsistent(self):
+        expected = compute_vendor_stats([self.vendor.pk])[self.vendor.pk]
+        stats = VendorStats.objects.get(vendor=self.vendor)
+        for field in ('total_bookings', 'pending_bookings', 'in_progress_bookings', 'completed_bookings',
+                      'total_revenue', 'monthly_revenue'):
+            self.assertEqual(getattr(stats, field), getattr(expected, field), field)
+
+    def test_updates_with_per_id_results(self):
+        first, second, third = self.create_bookings(3)
+        other = self.create_bookings(1, vendor=create_vendor('other@example.com'))[0]
+        BookingDetails.objects.filter(pk=third.pk).update(status='in_progress')
+
+        response = self.post([
+            {'id': first.pk, 'status': 'completed', 'expected_status': 'pending'},
+            {'id': second.pk, 'status': 'pending'},
+            {'id': third.pk, 'status': 'completed', 'expected_status': 'pending'},
+            {'id': other.pk, 'status': 'completed'},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [
+            {'id': first.pk, 'result': 'updated', 'status': 'completed'},
+            {'id': second.pk, 'result': 'unchanged', 'status': 'pending'},
+            {'id': third.pk, 'result': 'conflict', 'status': 'in_progress'},
+            {'id': other.pk, 'result': 'not_found', 'status': None},
+        ])
+        statuses = dict(BookingDetails.objects.values_list('id', 'status'))
+        self.assertEqual(statuses, {first.pk: 'completed', second.pk: 'pending',
+                                    third.pk: 'in_progress', other.pk: 'pending'})
+
+    def test_stats_follow_the_batch(self):
+        bookings = self.create_bookings(4)
+        self.post({'changes': [
+            {'id': bookings[0].pk, 'status': 'completed'},
+            {'id': bookings[1].pk, 'status': 'completed'},
+            {'id': bookings[2].pk, 'status': 'in_progress'},
+        ]})
+        self.assertStatsConsistent()
+        self.assertEqual(VendorStats.objects.get(vendor=self.vendor).total_revenue, Decimal('2000'))
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        bookings = self.create_bookings(40)
+        with CaptureQueriesContext(connection) as small:
+            self.post([{'id': b.pk, 'status': 'completed'} for b in bookings[:2]])
+        with CaptureQueriesContext(connection) as large:
+            self.post([{'id': b.pk, 'status': 'in_progress', 'expected_status': 'pending'} for b in bookings[2:]])
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+        self.assertStatsConsistent()
+
+    def test_rejects_invalid_batches(self):
+        booking = self.create_bookings(1)[0]
+        self.assertEqual(self.post([]).status_code, 400)
+        self.assertEqual(self.post([{'id': booking.pk, 'status': 'cancelled'}]).status_code, 400)
+        response = self.post([{'id': booking.pk, 'status': 'completed'}, {'id': booking.pk, 'status': 'pending'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(BookingDetails.objects.get(pk=booking.pk).status, 'pending')
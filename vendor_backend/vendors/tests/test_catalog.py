@@ -0,0 +1,67 @@
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..models import VendorSearchDocument, VendorService
+from .factories import create_vendor
+
+
+class BulkServiceUpsertTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.vendor = create_vendor('vendor@example.com', 'Catering')
+        self.client.force_authenticate(user=self.vendor)
+
+    def post(self, services):
+        return self.client.post(reverse('services-bulk'), services, format='json')
+
+    def test_creates_and_replaces_by_name(self):
+        existing = VendorService.objects.create(user=self.vendor, service_name='Veg Thali', category='Catering',
+                                                service_price=300, description='Old', image='services/thali.jpg')
+        other = VendorService.objects.create(user=create_vendor('other@example.com', 'Catering'), service_name='Veg Thali',
+                                             category='Catering', service_price=100)
+
+        response = self.post([
+            {'service_name': 'Veg Thali', 'service_price': '350.00', 'is_active': False},
+            {'service_name': 'Royal Buffet', 'service_price': '1200.00', 'minimum_people': 50},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual([(r['id'], r['service_name'], r['created']) for r in results],
+                         [(existing.pk, 'Veg Thali', False), (results[1]['id'], 'Royal Buffet', True)])
+
+        existing.refresh_from_db()
+        self.assertEqual(existing.service_price, Decimal('350.00'))
+        self.assertFalse(existing.is_active)
+        self.assertEqual(existing.description, '')  # Omitted fields are reset
+        self.assertEqual(existing.image.name, 'services/thali.jpg')
+        self.assertEqual(VendorService.objects.get(service_name='Royal Buffet').category, 'Catering')
+        other.refresh_from_db()
+        self.assertEqual(other.service_price, Decimal('100.00'))
+        self.assertIn('royal buffet', VendorSearchDocument.objects.get(vendor=self.vendor).document)
+
+    def test_reports_errors_per_row_and_writes_nothing(self):
+        response = self.post({'services': [
+            {'service_name': 'Veg Thali', 'service_price': 'cheap'},
+            {'service_name': 'Royal Buffet'},
+            {'minimum_people': 10},
+        ]})
+        self.assertEqual(response.status_code, 400)
+        errors = response.data['services']
+        self.assertEqual([set(e) for e in errors], [{'service_price'}, set(), {'service_name'}])
+
+        response = self.post([{'service_name': 'Royal Buffet'}, {'service_name': 'Royal Buffet'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([set(e) for e in response.data['services']], [set(), {'service_name'}])
+        self.assertFalse(VendorService.objects.exists())
+
+    def test_query_count_does_not_grow_with_catalog_size(self):
+        with CaptureQueriesContext(connection) as small:
+            self.post([{'service_name': f'Package {n}', 'service_price': '500'} for n in range(2)])
+        with CaptureQueriesContext(connection) as large:
+            self.post([{'service_name': f'Package {n}', 'service_price': '600'} for n in range(60)])
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+        self.assertEqual(VendorService.objects.filter(user=self.vendor, service_price=600).count(), 60)
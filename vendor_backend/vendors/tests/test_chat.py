@@ -0,0 +1,254 @@
+import json
+from io import StringIO
+from unittest import mock
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from .. import chat
+from ..chat import persist_messages, unread_field
+from ..chat_buffer import ChatWriteBuffer
+from ..consumers import ChatConsumer
+from ..models import UserDetails, VendorChat, Conversation, ConversationParticipant
+from .factories import create_vendor
+from .test_queries import QueryBudgetMixin
+
+
+class ChatSidebarTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.me = create_vendor('me@example.com')
+        self.alice = create_vendor('alice@example.com')
+        self.bob = create_vendor('bob@example.com')
+        self.carol = create_vendor('carol@example.com')
+        self.client.force_authenticate(user=self.me)
+
+    def send(self, sender, receiver, text):
+        self.client.force_authenticate(user=sender)
+        response = self.client.post(reverse('chat-messages', args=[receiver.id]), {'message': text, 'receiver': receiver.id}, format='json')
+        self.client.force_authenticate(user=self.me)
+        self.assertEqual(response.status_code, 201)
+
+    def sidebar(self):
+        return self.assertQueryBudget('vendor-list-chat', reverse('vendor-list-chat')).data['results']
+
+    def test_sidebar_orders_by_recency_with_unread_counts(self):
+        self.send(self.alice, self.me, 'hi from alice')
+        self.send(self.me, self.bob, 'hi bob')
+        self.send(self.alice, self.me, 'are you there?')
+
+        entries = self.sidebar()
+        self.assertEqual([e['id'] for e in entries], [self.alice.id, self.bob.id, self.carol.id])
+        self.assertEqual(entries[0]['unread_count'], 2)
+        self.assertEqual(entries[0]['last_message']['message'], 'are you there?')
+        self.assertFalse(entries[0]['last_message']['is_read'])
+        self.assertEqual(entries[1]['unread_count'], 0)
+        self.assertFalse(entries[1]['last_message']['is_read'])
+        self.assertIsNone(entries[2]['last_message'])
+
+        page = self.client.get(reverse('vendor-list-chat'), {'page_size': 1}).data
+        walked = []
+        while True:
+            walked.extend(e['id'] for e in page['results'])
+            if not page['next']:
+                break
+            page = self.client.get(page['next']).data
+        self.assertEqual(walked, [e['id'] for e in entries])
+
+        walked = []
+        while True:
+            walked[:0] = [e['id'] for e in page['results']]
+            if not page['previous']:
+                break
+            page = self.client.get(page['previous']).data
+        self.assertEqual(walked, [e['id'] for e in entries])
+
+    def test_mark_read_resets_unread_count(self):
+        self.send(self.alice, self.me, 'hello')
+        self.client.put(reverse('mark-messages-read', args=[self.alice.id]))
+        entry = self.sidebar()[0]
+        self.assertEqual(entry['unread_count'], 0)
+        self.assertTrue(entry['last_message']['is_read'])
+
+    def test_rebuild_matches_incremental_summary(self):
+        self.send(self.alice, self.me, 'one')
+        self.send(self.me, self.alice, 'two')
+        self.send(self.bob, self.me, 'three')
+        VendorChat.objects.filter(receiver=self.alice).update(is_read=True)
+        self.client.force_authenticate(user=self.alice)
+        self.client.put(reverse('mark-messages-read', args=[self.me.id]))
+
+        expected = list(Conversation.objects.order_by('id').values(
+            'vendor_low', 'vendor_high', 'last_message', 'unread_for_low', 'unread_for_high'
+        ))
+        participants = sorted(ConversationParticipant.objects.values_list('user', 'other', 'last_message_at'))
+        call_command('rebuild_conversations', stdout=StringIO())
+        self.assertEqual(sorted(ConversationParticipant.objects.values_list('user', 'other', 'last_message_at')),
+                         participants)
+        rebuilt = list(Conversation.objects.order_by('vendor_low', 'vendor_high').values(
+            'vendor_low', 'vendor_high', 'last_message', 'unread_for_low', 'unread_for_high'
+        ))
+        self.assertEqual(sorted(expected, key=str), sorted(rebuilt, key=str))
+
+
+class ChatWriteBehindTest(TestCase):
+    def setUp(self):
+        self.alice = create_vendor('alice@example.com')
+        self.bob = create_vendor('bob@example.com')
+
+    def message(self, text, sender=None, receiver=None):
+        sender, receiver = sender or self.alice, receiver or self.bob
+        return VendorChat(sender_id=sender.id, receiver_id=receiver.id, message=text)
+
+    def test_resent_messages_are_stored_once(self):
+        first = self.message('hello')
+        persist_messages([first])
+        resend = self.message('hello')
+        resend.uid = first.uid
+        persist_messages([resend, self.message('again')])
+
+        self.assertEqual(VendorChat.objects.count(), 2)
+        conversation = Conversation.objects.get()
+        self.assertEqual(conversation.last_message_text, 'again')
+        self.assertEqual(getattr(conversation, unread_field(conversation, self.bob.id)), 2)
+
+    def test_resend_stored_while_waiting_for_the_lock_is_counted_once(self):
+        message = self.message('hello')
+        lock_conversations = chat.lock_conversations
+        raced = []
+
+        def other_worker_first(pairs):
+            # Another worker persists the same message before this one gets the lock
+            if not raced:
+                raced.append(True)
+                resend = self.message('hello')
+                resend.uid = message.uid
+                persist_messages([resend])
+            return lock_conversations(pairs)
+
+        with mock.patch.object(chat, 'lock_conversations', side_effect=other_worker_first):
+            persist_messages([message])
+
+        self.assertEqual(VendorChat.objects.count(), 1)
+        conversation = Conversation.objects.get()
+        self.assertEqual(getattr(conversation, unread_field(conversation, self.bob.id)), 1)
+
+    def test_flush_writes_batch_and_acks_sender(self):
+        acked = []
+
+        async def on_persisted(uids):
+            acked.extend(uids)
+
+        async def send_and_flush(messages):
+            buffer = ChatWriteBuffer(batch_size=100, interval=60)
+            for message in messages:
+                buffer.add(message, on_persisted)
+            await buffer.flush()
+
+        messages = [self.message('one'), self.message('two'), self.message('lost', receiver=UserDetails(id=10 ** 6))]
+        async_to_sync(send_and_flush)(messages)
+
+        self.assertEqual(list(VendorChat.objects.values_list('message', flat=True)), ['one', 'two'])
+        self.assertEqual(acked, [messages[0].uid, messages[1].uid])
+
+
+@override_settings(
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+    CHAT_PERSISTENCE={'MODE': 'sync', 'FLUSH_BATCH_SIZE': 200, 'FLUSH_INTERVAL': 0.25, 'ACK': 'persisted'},
+)
+class ChatConsumerSendTest(TestCase):
+    def setUp(self):
+        self.alice = create_vendor('alice@example.com')
+        self.bob = create_vendor('bob@example.com')
+
+    def test_sync_mode_stores_broadcasts_and_acks(self):
+        client_id = '6f1c1f0e-6f1a-4a57-9d2c-2f5d0b1c9a10'
+
+        async def run():
+            communicator = ApplicationCommunicator(ChatConsumer.as_asgi(), {
+                'type': 'websocket', 'path': f'/ws/chat/{self.bob.id}/', 'headers': [], 'subprotocols': [],
+                'url_route': {'kwargs': {'vendor_id': str(self.bob.id)}}, 'user': self.alice,
+            })
+            await communicator.send_input({'type': 'websocket.connect'})
+            self.assertEqual((await communicator.receive_output())['type'], 'websocket.accept')
+            await communicator.send_input({'type': 'websocket.receive', 'text': json.dumps({
+                'client_id': client_id, 'sender_id': self.alice.id, 'receiver_id': self.bob.id, 'message': 'hello',
+            })})
+            frames = [json.loads((await communicator.receive_output())['text']) for _ in range(2)]
+            await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await communicator.wait()
+            return frames
+
+        # The ack is sent directly, the broadcast comes back through the channel layer
+        ack, broadcast = sorted(async_to_sync(run)(), key=lambda frame: frame.get('type') != 'ack')
+        self.assertEqual(broadcast['id'], client_id)
+        self.assertEqual(broadcast['message'], 'hello')
+        self.assertEqual(ack, {'type': 'ack', 'ids': [client_id]})
+        self.assertEqual(str(VendorChat.objects.get(message='hello').uid), client_id)
+
+
+@override_settings(
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+    CHAT_RESUME_LIMIT=2,
+)
+class ChatResumeTest(TestCase):
+    def setUp(self):
+        self.alice = create_vendor('alice@example.com')
+        self.bob = create_vendor('bob@example.com')
+        self.messages = persist_messages([
+            VendorChat(sender_id=self.alice.id, receiver_id=self.bob.id, message=f'message {n}') for n in range(5)
+        ])
+
+    def communicator(self, vendor_id, user):
+        # channels.testing needs daphne, so drive the ASGI app directly
+        return ApplicationCommunicator(ChatConsumer.as_asgi(), {
+            'type': 'websocket', 'path': f'/ws/chat/{vendor_id}/', 'headers': [], 'subprotocols': [],
+            'url_route': {'kwargs': {'vendor_id': str(vendor_id)}}, 'user': user,
+        })
+
+    def resume(self, user=None, **request):
+        async def run():
+            communicator = self.communicator(self.bob.id, user or self.bob)
+            await communicator.send_input({'type': 'websocket.connect'})
+            self.assertEqual((await communicator.receive_output())['type'], 'websocket.accept')
+            await communicator.send_input({'type': 'websocket.receive', 'text': json.dumps({'type': 'resume', **request})})
+            frames = []
+            while not frames or frames[-1].get('type') not in ('resumed', 'resume_failed', 'websocket.close'):
+                output = await communicator.receive_output()
+                frames.append(json.loads(output['text']) if 'text' in output else output)
+            await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await communicator.wait()
+            return frames
+        return async_to_sync(run)()
+
+    def test_replays_missed_messages_in_pages(self):
+        frames = self.resume(last_id=str(self.messages[0].uid))
+        self.assertEqual([f['message'] for f in frames[:-1]], ['message 1', 'message 2'])
+        self.assertEqual(frames[-1], {'type': 'resumed', 'complete': False, 'last_id': frames[1]['id']})
+
+        frames = self.resume(last_id=frames[-1]['last_id'])
+        self.assertEqual([f['message'] for f in frames[:-1]], ['message 3', 'message 4'])
+        self.assertTrue(frames[-1]['complete'])
+
+    def test_unknown_cursor_falls_back(self):
+        self.assertEqual(self.resume(last_id='not-a-message'), [{'type': 'resume_failed'}])
+        frames = self.resume(last_timestamp=self.messages[3].timestamp.isoformat())
+        self.assertEqual([f['message'] for f in frames[:-1]], ['message 3', 'message 4'])
+
+    def test_only_the_vendor_can_resume(self):
+        closed = [{'type': 'websocket.close', 'code': 4403}]
+        self.assertEqual(self.resume(user=AnonymousUser(), last_id=str(self.messages[0].uid)), closed)
+        self.assertEqual(self.resume(user=self.alice, last_id=str(self.messages[0].uid)), closed)
+
+    def test_non_numeric_vendor_id_is_rejected(self):
+        async def run():
+            communicator = self.communicator('abc', self.bob)
+            await communicator.send_input({'type': 'websocket.connect'})
+            output = await communicator.receive_output()
+            await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await communicator.wait()
+            return output
+        self.assertEqual(async_to_sync(run)()['type'], 'websocket.close')
@@ -0,0 +1,76 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..models import ProfileDetails, UserDetails, VendorService
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.vendor = UserDetails.objects.create(
+            username='vendor@example.com', email='vendor@example.com', full_name='Test Vendor',
+            business='Catering', experience_level='Expert'
+        )
+        ProfileDetails.objects.create(user=self.vendor, city='Puri')
+        self.service = VendorService.objects.create(user=self.vendor, service_name='Buffet', category='Catering')
+        self.client.force_authenticate(user=self.vendor)
+
+    def assertNotModified(self, url, response):
+        # One version query, no serialization
+        with self.assertNumQueries(1):
+            revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], response['ETag'])
+
+    def test_unchanged_resources_return_304(self):
+        for url in (reverse('vendor-profile'), reverse('services-list'),
+                    reverse('service-detail', args=[self.service.pk]), reverse('vendor-detail', args=[self.vendor.pk])):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response['ETag'].startswith('W/"'))
+                self.assertIn('no-cache', response['Cache-Control'])
+                self.assertNotModified(url, response)
+
+    def test_profile_etag_follows_changes(self):
+        url = reverse('vendor-profile')
+        etag = self.client.get(url)['ETag']
+
+        self.client.patch(reverse('service-detail', args=[self.service.pk]), {'description': 'Veg only'}, format='json')
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.data['services'][0]['description'], 'Veg only')
+
+        self.service.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=changed['ETag']).status_code, 200)
+
+    def test_service_list_etag_changes_on_delete(self):
+        VendorService.objects.create(user=self.vendor, service_name='Snacks', category='Catering')
+        url = reverse('services-list')
+        etag = self.client.get(url)['ETag']
+
+        self.service.delete()
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_service_detail_last_modified(self):
+        url = reverse('service-detail', args=[self.service.pk])
+        response = self.client.get(url)
+
+        revalidated = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_other_vendors_etag_does_not_match(self):
+        url = reverse('vendor-detail', args=[self.vendor.pk])
+        etag = self.client.get(url)['ETag']
+
+        self.client.force_authenticate(user=UserDetails.objects.create(
+            username='other@example.com', email='other@example.com', full_name='Other',
+            business='DJ', experience_level='Expert'
+        ))
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_missing_service_is_still_404(self):
+        self.assertEqual(self.client.get(reverse('service-detail', args=[self.service.pk + 1])).status_code, 404)
@@ -0,0 +1,128 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from .. import cube
+from ..models import BookingCubeCell, BookingCubeRefresh, BookingDetails, UserDetails
+from .factories import create_vendor
+from .test_queries import QueryBudgetMixin
+
+ANALYTICS = {'ADMIN_EMAILS': ['ops@example.com'], 'CUBE_REFRESH_OVERLAP': 0}
+
+
+@override_settings(ANALYTICS=ANALYTICS)
+class BookingCubeTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.photographer = create_vendor('photo@example.com', 'Photography', 'Puri')
+        self.caterer = create_vendor('food@example.com', 'Catering', 'Cuttack')
+        self.admin = UserDetails.objects.create(
+            username='ops@example.com', email='OPS@example.com', full_name='Operations',
+            business='Photography', experience_level='Expert'
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def create_booking(self, vendor, amount, created, status='completed'):
+        booking = BookingDetails.objects.create(
+            vendor=vendor, customer_name='John Doe', service_type='Wedding', event_date='2025-12-25',
+            amount=amount, status=status, location='Puri'
+        )
+        created_at = datetime.combine(created, datetime.min.time(), tzinfo=dt_timezone.utc) + timedelta(hours=10)
+        BookingDetails.objects.filter(pk=booking.pk).update(created_at=created_at)
+        call_command('rebuild_booking_rollups', stdout=StringIO())
+        return BookingDetails.objects.get(pk=booking.pk)
+
+    def seed(self):
+        self.create_booking(self.photographer, 1000, date(2025, 1, 10))
+        self.create_booking(self.photographer, 3000, date(2025, 2, 10))
+        self.create_booking(self.photographer, 500, date(2025, 2, 11), status='pending')
+        self.create_booking(self.caterer, 2000, date(2025, 2, 12))
+        self.create_booking(self.caterer, 4000, date(2025, 4, 1))
+        cube.refresh()
+
+    def get(self, **params):
+        return self.assertQueryBudget('booking-cube', reverse('booking-cube'), **params).json()
+
+    def test_slice_dice_and_roll_up(self):
+        self.seed()
+
+        by_category = self.get(group_by='category', status='completed')['results']
+        self.assertEqual([(row['category'], row['count'], row['revenue']) for row in by_category], [
+            ('Catering', 2, '6000.00'),
+            ('Photography', 2, '4000.00'),
+        ])
+
+        sliced = self.get(group_by='month', category='Photography')['results']
+        self.assertEqual([(row['month'], row['count']) for row in sliced], [('2025-01-01', 1), ('2025-02-01', 2)])
+
+        diced = self.get(group_by='city,status', city='Puri,Cuttack', start='2025-02', end='2025-03')['results']
+        self.assertEqual([(row['city'], row['status'], row['count']) for row in diced], [
+            ('Cuttack', 'completed', 1),
+            ('Puri', 'completed', 1),
+            ('Puri', 'pending', 1),
+        ])
+
+        quarterly = self.get(group_by='month', grain='quarter', status='completed')['results']
+        self.assertEqual([(row['month'], row['revenue'], row['average_value']) for row in quarterly], [
+            ('2025-01-01', '6000.00', '2000.00'),
+            ('2025-04-01', '4000.00', '4000.00'),
+        ])
+
+        self.assertEqual(self.get()['results'], [{'count': 5, 'revenue': '10500.00', 'average_value': '2100.00'}])
+
+    def test_refresh_only_rebuilds_changed_months(self):
+        self.seed()
+        january = BookingCubeCell.objects.get(month=date(2025, 1, 1), category='Photography', city='Puri')
+
+        booking = BookingDetails.objects.get(amount=500)
+        booking.status = 'completed'
+        booking.save()
+        months, _ = cube.refresh()
+
+        self.assertEqual(months, {date(2025, 2, 1)})
+        self.assertEqual(BookingCubeCell.objects.get(month=date(2025, 1, 1), category='Photography', city='Puri').pk,
+                         january.pk)
+        self.assertFalse(BookingCubeCell.objects.filter(status='pending').exists())
+        self.assertEqual(cube.refresh(), (set(), 0))
+
+    def test_deletes_and_vendor_moves_are_picked_up(self):
+        self.seed()
+        BookingDetails.objects.get(amount=4000).delete()
+        profile = self.photographer.profile
+        profile.city = 'Bhubaneswar'
+        profile.save()
+        cube.refresh()
+
+        self.assertFalse(BookingCubeCell.objects.filter(month=date(2025, 4, 1)).exists())
+        self.assertEqual(
+            set(BookingCubeCell.objects.filter(category='Photography').values_list('city', flat=True)),
+            {'Bhubaneswar', None},
+        )
+
+    def test_admin_only(self):
+        self.client.force_authenticate(user=self.photographer)
+        self.assertEqual(self.client.get(reverse('booking-cube')).status_code, 403)
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(reverse('booking-cube')).status_code, 401)
+
+    def test_invalid_query(self):
+        response = self.client.get(reverse('booking-cube'), {'group_by': 'category,vendor'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('vendor', str(response.data['group_by']))
+
+    def test_command(self):
+        self.create_booking(self.caterer, 2000, date(2025, 2, 12))
+        out = StringIO()
+        call_command('booking_cube', '--refresh', stdout=out)
+        # The cell plus its totals over all cities, all categories and both
+        self.assertIn('all months (4 cells)', out.getvalue())
+        self.assertIsNotNone(BookingCubeRefresh.objects.get().high_water)
+
+        out = StringIO()
+        call_command('booking_cube', '--group-by', 'category,city', '--grain', 'year', stdout=out)
+        self.assertIn('Catering\tCuttack\t1\t2000.00', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('booking_cube', '--start', '2025-13', stdout=StringIO())
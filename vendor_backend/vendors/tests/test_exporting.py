@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from ..exporting import pa
+from ..models import BookingDetails, ProfileDetails, UserDetails, VendorChat, VendorService
+
+if pa is not None:
+    import pyarrow.dataset as ds
+
+
+@unittest.skipIf(pa is None, 'pyarrow is not installed')
+class ExportSnapshotTest(TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.vendor = UserDetails.objects.create(
+            username='vendor@example.com', email='vendor@example.com', full_name='Test Vendor',
+            mobile='9999999999', business='Photography', experience_level='Expert'
+        )
+        self.other = UserDetails.objects.create(
+            username='other@example.com', email='other@example.com', full_name='Other Vendor',
+            business='Catering', experience_level='Expert'
+        )
+        ProfileDetails.objects.create(user=self.vendor, location='Patia', city='Bhubaneswar')
+        VendorService.objects.create(user=self.vendor, service_name='Wedding Shoot', category='Photography',
+                                     service_price=20000, description='Two photographers')
+        VendorChat.objects.create(sender=self.vendor, receiver=self.other, message='Hello there')
+        self.booking = BookingDetails.objects.create(
+            vendor=self.vendor, customer_name='John Doe', service_type='Wedding', event_date='2025-12-25',
+            amount='1500.50', location='Puri', description='Beach wedding'
+        )
+        BookingDetails.objects.filter(pk=self.booking.pk).update(updated_at=timezone.now() - timedelta(days=3))
+
+    def export(self, *args):
+        out = StringIO()
+        call_command('export_snapshot', '--dir', self.dir, '--lag', '0', '--chunk-size', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def read(self, name):
+        return ds.dataset(os.path.join(self.dir, name), format='parquet', partitioning='hive').to_table()
+
+    def test_exports_partitioned_metadata(self):
+        output = self.export()
+        self.assertIn('bookings: 1 rows', output)
+
+        bookings = self.read('bookings').to_pylist()
+        self.assertEqual(len(bookings), 1)
+        self.assertEqual(str(bookings[0]['amount']), '1500.50')
+        self.assertEqual(str(bookings[0]['date']), str(timezone.localdate(timezone.now() - timedelta(days=3))))
+        self.assertNotIn('customer_name', bookings[0])
+
+        chat = self.read('chat')
+        self.assertNotIn('message', chat.column_names)
+        self.assertEqual(chat.column('message_length').to_pylist(), [11])
+
+        vendors = {row['id']: row for row in self.read('vendors').to_pylist()}
+        self.assertEqual(vendors[self.vendor.pk]['city'], 'Bhubaneswar')
+        self.assertIsNone(vendors[self.other.pk]['city'])
+        self.assertNotIn('email', vendors[self.vendor.pk])
+
+    def test_incremental_runs_export_only_changes(self):
+        self.export()
+        self.booking.status = 'completed'
+        self.booking.save()
+        for n in range(3):
+            VendorService.objects.create(user=self.other, service_name=f'Buffet {n}', category='Catering')
+
+        output = self.export()
+
+        self.assertIn('bookings: 1 rows', output)
+        self.assertIn('services: 3 rows in 1 files', output)
+        self.assertIn('chat: 0 rows', output)
+        statuses = sorted(row['status'] for row in self.read('bookings').to_pylist())
+        self.assertEqual(statuses, ['completed', 'pending'])
+        self.assertEqual(self.read('services').num_rows, 4)
+
+    def test_full_export_replaces_earlier_files(self):
+        self.export()
+        self.booking.save()
+        self.export('--dataset', 'bookings')
+        self.assertEqual(self.read('bookings').num_rows, 2)
+
+        self.export('--full', '--dataset', 'bookings')
+
+        self.assertEqual(self.read('bookings').num_rows, 1)
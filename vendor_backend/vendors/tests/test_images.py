@@ -0,0 +1,110 @@
+import io
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+from .. import images
+from ..models import ImageAsset, UserDetails, VendorService
+
+PIPELINE = {'MODE': 'inline', 'WORKERS': 1, 'WIDTHS': [320, 640, 1280], 'QUALITY': 80}
+
+
+def photo(name='photo.png', size=(800, 600), color='red'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class ImagePipelineTest(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media_root = media.name
+        settings = override_settings(MEDIA_ROOT=media.name, IMAGE_PIPELINE=PIPELINE)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.client = APIClient()
+        self.vendor = UserDetails.objects.create(
+            username='vendor@example.com', email='vendor@example.com', full_name='Test Vendor',
+            business='Catering', experience_level='Expert'
+        )
+        self.client.force_authenticate(user=self.vendor)
+        self.service = VendorService.objects.create(user=self.vendor, service_name='Buffet', category='Catering')
+
+    def upload_service_image(self, upload):
+        return self.client.patch(reverse('service-detail', args=[self.service.pk]), {'image': upload}, format='multipart')
+
+    def stored_files(self):
+        return sorted(os.path.relpath(os.path.join(root, name), self.media_root)
+                      for root, _, names in os.walk(self.media_root) for name in names)
+
+    def test_upload_is_resized_into_variants(self):
+        response = self.upload_service_image(photo())
+
+        self.assertEqual(response.status_code, 200)
+        variants = response.data['image_variants']
+        self.assertEqual(variants['status'], 'ready')
+        self.assertEqual(set(variants['srcset']), {'webp', 'jpeg'})
+        self.assertRegex(variants['srcset']['webp'], r'/320\.webp 320w, .*/640\.webp 640w$')
+
+        asset = ImageAsset.objects.get()
+        self.assertEqual((asset.width, asset.height), (800, 600))
+        self.assertEqual(len(self.stored_files()), 5)  # Original plus two widths in two formats
+        with Image.open(os.path.join(self.media_root, asset.variants['jpeg']['640'])) as image:
+            self.assertEqual(image.size, (640, 480))
+
+        service = self.client.get(reverse('vendor-profile')).data['services'][0]
+        self.assertTrue(service['image'].endswith('/640.jpg'))
+        self.assertEqual(service['image_variants'], variants)
+
+    def test_identical_uploads_are_stored_once(self):
+        self.upload_service_image(photo('first.png'))
+        files = self.stored_files()
+
+        response = self.client.patch(reverse('vendor-profile'), {'profile_image': photo('second.png')}, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stored_files(), files)
+        self.assertEqual(ImageAsset.objects.count(), 1)
+        self.assertEqual(response.data['profile_image_variants']['status'], 'ready')
+        self.vendor.profile.refresh_from_db()
+        self.service.refresh_from_db()
+        self.assertEqual(self.vendor.profile.profile_image.name, self.service.image.name)
+
+    def test_background_mode_shows_placeholder_until_processed(self):
+        with self.settings(IMAGE_PIPELINE={**PIPELINE, 'MODE': 'background'}):
+            response = self.upload_service_image(photo())
+        self.assertEqual(response.data['image_variants']['status'], 'pending')
+        self.assertTrue(response.data['image_variants']['src'].endswith('image-placeholder.svg'))
+
+        call_command('process_images', stdout=StringIO())
+
+        service = self.client.get(reverse('vendor-profile')).data['services'][0]
+        self.assertEqual(service['image_variants']['status'], 'ready')
+
+    def test_pool_jobs_release_their_database_connection(self):
+        calls = []
+        executor = mock.Mock(submit=lambda func, *args: func(*args))
+        with self.settings(IMAGE_PIPELINE={**PIPELINE, 'MODE': 'background'}), \
+                mock.patch.object(images, '_get_executor', return_value=executor), \
+                mock.patch.object(images, 'close_old_connections', lambda: calls.append('close')), \
+                mock.patch.object(images, 'process_image', side_effect=lambda sha256: calls.append('process')), \
+                self.captureOnCommitCallbacks(execute=True):
+            self.upload_service_image(photo())
+        self.assertEqual(calls, ['close', 'process', 'close'])
+
+    def test_rejects_files_that_are_not_images(self):
+        response = self.client.patch(
+            reverse('vendor-profile'),
+            {'profile_image': SimpleUploadedFile('photo.png', b'not an image', content_type='image/png')},
+            format='multipart',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ImageAsset.objects.exists())
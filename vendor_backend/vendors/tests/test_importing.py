@@ -0,0 +1,96 @@
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+from django.contrib.auth.hashers import check_password
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from ..models import UserDetails, VendorLocation, VendorSearchDocument
+
+HEADER = ['email', 'full_name', 'mobile', 'business', 'experience_level', 'services', 'password', 'city']
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ImportVendorsTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write_csv(self, rows):
+        path = os.path.join(self.tmp.name, 'vendors.csv')
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADER)
+            writer.writerows(rows)
+        return path
+
+    def run_import(self, path, **options):
+        options.setdefault('workers', 0)
+        call_command('import_vendors', path, stdout=StringIO(), **options)
+
+    def test_imports_vendors_with_profiles_services_and_search(self):
+        path = self.write_csv([
+            ['a@example.com', 'Alpha Studio', '9876543210', 'Photography', '', 'Weddings, Candid, Weddings', 'pass-a', 'Puri'],
+            ['b@example.com', 'Beta Beats', '9876543211', 'DJ', 'Expert', '', '', 'Cuttack'],
+        ])
+        self.run_import(path, chunk_size=1)
+
+        alpha = UserDetails.objects.get(email='a@example.com')
+        self.assertEqual(alpha.username, 'a@example.com')
+        self.assertEqual(alpha.experience_level, 'Beginner')
+        self.assertTrue(check_password('pass-a', alpha.password))
+        self.assertEqual(alpha.profile.city, 'Puri')
+        self.assertEqual(sorted(alpha.services.values_list('service_name', flat=True)), ['Candid', 'Weddings'])
+        self.assertIn('weddings', VendorSearchDocument.objects.get(vendor=alpha).document)
+        self.assertTrue(VendorLocation.objects.filter(vendor=alpha, location__name='puri').exists())
+
+        beta = UserDetails.objects.get(email='b@example.com')
+        self.assertFalse(beta.has_usable_password())
+
+        with open(f'{path}.progress.json') as f:
+            self.assertEqual(json.load(f), {'line': 3, 'imported': 2, 'skipped': 0, 'rejected': 0})
+
+    def test_invalid_rows_are_rejected_and_duplicates_skipped(self):
+        UserDetails.objects.create(username='taken@example.com', email='taken@example.com', full_name='Taken',
+                                   business='DJ', experience_level='Expert')
+        path = self.write_csv([
+            ['bad@example.com', 'Bad 123', '12', 'Juggling', '', '', '', ''],
+            ['taken@example.com', 'Someone Else', '9876543210', 'DJ', '', '', '', ''],
+            ['c@example.com', 'Gamma Events', '9876543212', 'Catering', '', '', '', ''],
+            ['c@example.com', 'Gamma Again', '9876543212', 'Catering', '', '', '', ''],
+        ])
+        self.run_import(path)
+
+        self.assertEqual(UserDetails.objects.get(email='c@example.com').full_name, 'Gamma Events')
+        self.assertEqual(UserDetails.objects.get(email='taken@example.com').full_name, 'Taken')
+        with open(f'{path}.rejects.jsonl') as f:
+            rejects = [json.loads(line) for line in f]
+        self.assertEqual([(r['line'], r['email']) for r in rejects], [(2, 'bad@example.com')])
+        self.assertEqual(set(rejects[0]['errors']), {'full_name', 'mobile', 'business'})
+
+    def test_resumes_after_saved_progress(self):
+        path = self.write_csv([
+            ['a@example.com', 'Alpha Studio', '9876543210', 'Photography', '', '', '', ''],
+            ['b@example.com', 'Beta Beats', '9876543211', 'DJ', '', '', '', ''],
+        ])
+        with open(f'{path}.progress.json', 'w') as f:
+            json.dump({'line': 2, 'imported': 1, 'skipped': 0, 'rejected': 0}, f)
+        self.run_import(path)
+        self.assertEqual(list(UserDetails.objects.values_list('email', flat=True)), ['b@example.com'])
+
+        self.run_import(path, restart=True)
+        self.assertEqual(UserDetails.objects.count(), 2)
+
+    def test_jsonl_with_worker_processes(self):
+        path = os.path.join(self.tmp.name, 'vendors.jsonl')
+        with open(path, 'w') as f:
+            f.write(json.dumps({'email': 'd@example.com', 'full_name': 'Delta Decor', 'mobile': '9876543213',
+                                'business': 'Decoration', 'services': ['Stage', 'Flowers']}) + '\n')
+            f.write('{not json\n')
+        self.run_import(path, workers=1)
+
+        delta = UserDetails.objects.get(email='d@example.com')
+        self.assertEqual(delta.services.count(), 2)
+        with open(f'{path}.rejects.jsonl') as f:
+            self.assertEqual(json.loads(f.read())['line'], 2)
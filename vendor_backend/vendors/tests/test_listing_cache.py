@@ -0,0 +1,107 @@
+import threading
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from .. import listing_cache
+from ..models import ProfileDetails, UserDetails, VendorService
+from .factories import create_vendor
+
+
+class ListingCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.vendors = [create_vendor(f'vendor{n}@example.com', city='Bhubaneswar') for n in range(3)]
+        for vendor in self.vendors:
+            VendorService.objects.create(user=vendor, service_name='Wedding Shoot', category='Photography', service_price=20000)
+        # A customer-side viewer who isn't on any page
+        self.viewer = UserDetails.objects.create(
+            username='viewer@example.com', email='viewer@example.com', full_name='Viewer',
+            business='Catering', experience_level='Expert'
+        )
+        UserDetails.objects.filter(pk=self.viewer.pk).update(created_at='2000-01-01T00:00:00Z')
+        self.client.force_authenticate(user=self.viewer)
+
+    def get(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('vendors-list'), {'limit': 2, **params})
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_repeated_requests_are_served_from_cache(self):
+        first, _ = self.get(category='Photography', search='Wedding shoot')
+        second, queries = self.get(category='Photography', search='shoot  WEDDING', _t=123)
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(queries, 0)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(listing_cache.stats(), {'hit': 1, 'miss': 1, 'wait': 0, 'bypass': 0})
+
+    def test_writes_invalidate(self):
+        self.get()
+        VendorService.objects.filter(user=self.vendors[2]).first().save()
+        self.assertEqual(self.get()[0]['X-Cache'], 'MISS')
+
+        ProfileDetails.objects.filter(user=self.vendors[2]).update(city='Puri')  # No signal: stale
+        self.assertEqual(self.get()[0]['X-Cache'], 'HIT')
+
+        profile = self.vendors[2].profile
+        profile.city = 'Puri'
+        profile.save()
+        response, _ = self.get()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['city'], 'Puri')
+
+    def test_presence_and_password_changes_keep_cache(self):
+        self.get()
+        self.vendors[0].set_password('new-password')
+        self.vendors[0].save(update_fields=['password'])
+        self.assertEqual(self.get()[0]['X-Cache'], 'HIT')
+
+    def test_viewer_on_the_page_gets_their_own_page(self):
+        self.get()
+        self.client.force_authenticate(user=self.vendors[2])
+
+        response, _ = self.get()
+
+        self.assertEqual(response['X-Cache'], 'BYPASS')
+        self.assertNotIn(self.vendors[2].pk, [vendor['id'] for vendor in response.data['results']])
+
+    def test_concurrent_misses_render_once(self):
+        calls = []
+        results = []
+        release = threading.Event()
+
+        def render():
+            calls.append(1)
+            release.wait(5)
+            return type('Rendered', (), {'content': b'{"results":[]}'})(), []
+
+        def request():
+            results.append(listing_cache.get_or_render({'page': 1}, None, render))
+
+        threads = [threading.Thread(target=request) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        while not calls:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(outcome for _, outcome in results), ['miss', 'wait', 'wait', 'wait'])
+
+    def test_stats_command(self):
+        self.get()
+        self.get()
+        out = StringIO()
+        call_command('listing_cache', '--reset-stats', stdout=out)
+        self.assertIn('hit=1 miss=1', out.getvalue())
+        self.assertEqual(listing_cache.stats()['hit'], 0)
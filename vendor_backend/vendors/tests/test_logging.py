@@ -0,0 +1,101 @@
+import copy
+import json
+import logging
+import logging.config
+import os
+import tempfile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.conf import settings
+from django.test import SimpleTestCase
+from vendor_hub.settings import base
+from vendor_hub.log import (
+    ContextFilter, JsonFormatter, QueueListenerHandler, RedactingFilter, SamplingFilter, redact, route_var,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+class LoggingPipelineTest(SimpleTestCase):
+    def setUp(self):
+        self.target = ListHandler()
+        self.target.setFormatter(JsonFormatter())
+        self.handler = QueueListenerHandler([self.target])
+        for log_filter in (ContextFilter(), SamplingFilter({'services-list': 0}), RedactingFilter(max_length=10)):
+            self.handler.addFilter(log_filter)
+        self.logger = logging.getLogger('vendors.tests.pipeline')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        self.handler.close()
+
+    def records(self):
+        self.handler.close()  # drains the queue
+        return [json.loads(line) for line in self.target.lines]
+
+    def test_records_are_json_with_redacted_payload(self):
+        payload = {'email': 'vendor@example.com', 'password': 'hunter2', 'aadhaar_document': 'x'}
+        self.logger.debug('Registration data', extra={'payload': payload})
+        [record] = self.records()
+        self.assertEqual(record['message'], 'Registration data')
+        self.assertEqual(record['payload'], {
+            'email': 'vendor@exa... (8 more chars)', 'password': '[redacted]', 'aadhaar_document': '[redacted]',
+        })
+
+    def test_sampled_route_keeps_warnings_only(self):
+        token = route_var.set('services-list')
+        try:
+            self.logger.info('per-row detail')
+            self.logger.warning('something odd')
+        finally:
+            route_var.reset(token)
+        self.assertEqual([(r['message'], r['route']) for r in self.records()], [('something odd', 'services-list')])
+
+    def test_redact_describes_files_and_caps_collections(self):
+        upload = SimpleUploadedFile('pan.pdf', b'%PDF', content_type='application/pdf')
+        self.assertEqual(redact({'image': upload}), {'image': {'name': 'pan.pdf', 'size': 4, 'content_type': 'application/pdf'}})
+        self.assertEqual(redact(list(range(5)), max_items=2), [0, 1, '... 3 more items'])
+
+
+class LoggingConfigTest(SimpleTestCase):
+    def test_settings_logging_configures(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        config = copy.deepcopy(base.LOGGING)
+        config['handlers']['file']['filename'] = os.path.join(directory.name, 'django.log')
+        config['handlers']['console']['level'] = 'CRITICAL'  # keep the test run quiet
+        root = logging.getLogger()
+        saved = root.handlers[:], root.level
+        loggers = {name: logging.getLogger(name) for name in config['loggers']}
+        saved_loggers = {name: (logger.handlers[:], logger.level, logger.propagate) for name, logger in loggers.items()}
+
+        def restore():
+            for handler in root.handlers:
+                handler.close()
+            root.handlers[:], root.level = saved
+            for name, (handlers, level, propagate) in saved_loggers.items():
+                loggers[name].handlers[:] = handlers
+                loggers[name].setLevel(level)
+                loggers[name].propagate = propagate
+            logging.config.dictConfig(settings.LOGGING)
+
+        logging.config.dictConfig(config)
+        self.addCleanup(restore)
+
+        [handler] = root.handlers
+        self.assertIsInstance(handler, QueueListenerHandler)
+        self.assertEqual([type(target) for target in handler.listener.handlers],
+                         [logging.StreamHandler, logging.FileHandler])
+        logging.getLogger('vendors.tests.config').warning('configured')
+        handler.close()
+        with open(config['handlers']['file']['filename']) as f:
+            self.assertEqual(json.loads(f.readline())['message'], 'configured')
@@ -0,0 +1,124 @@
+import hashlib
+import os
+import tempfile
+import time
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from ..api.serializers import VerificationSerializer
+from ..media import signed_media_url
+from ..models import VerificationDetails
+from .factories import create_vendor
+
+SERVING = {'OFFLOAD': '', 'ACCEL_PREFIX': '/protected-media/', 'MAX_AGE': 3600, 'SIGNED_URL_MAX_AGE': 300}
+CONTENT = bytes(range(256)) * 4
+
+
+class MediaServingTest(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media_root = media.name
+        settings = override_settings(MEDIA_ROOT=media.name, MEDIA_SERVING=SERVING)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        cache.clear()
+
+        self.client = APIClient()
+        self.vendor = create_vendor('vendor@example.com')
+
+    def write(self, name, content=CONTENT):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return name
+
+    def test_etag_and_conditional_get(self):
+        self.write('profiles/photo.jpg')
+
+        response = self.client.get('/media/profiles/photo.jpg')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['ETag'], f'"{hashlib.sha256(CONTENT).hexdigest()}"')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+        revalidated = self.client.get('/media/profiles/photo.jpg', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], response['ETag'])
+
+    def test_content_addressed_images_are_immutable(self):
+        sha256 = hashlib.sha256(b'image').hexdigest()
+        name = self.write(f'images/{sha256[:2]}/{sha256}/640.webp')
+
+        response = self.client.get(f'/media/{name}')
+
+        self.assertEqual(response['ETag'], f'"{sha256}-640.webp"')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    def test_range_requests(self):
+        self.write('profiles/photo.jpg')
+
+        response = self.client.get('/media/profiles/photo.jpg', HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(CONTENT)}')
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[100:200])
+
+        suffix = self.client.get('/media/profiles/photo.jpg', HTTP_RANGE='bytes=-24')
+        self.assertEqual(b''.join(suffix.streaming_content), CONTENT[-24:])
+
+        unsatisfiable = self.client.get('/media/profiles/photo.jpg', HTTP_RANGE=f'bytes={len(CONTENT)}-')
+        self.assertEqual(unsatisfiable.status_code, 416)
+        self.assertEqual(unsatisfiable['Content-Range'], f'bytes */{len(CONTENT)}')
+
+        stale = self.client.get('/media/profiles/photo.jpg', HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"')
+        self.assertEqual(stale.status_code, 200)
+
+    def test_verification_documents_need_a_signed_url(self):
+        name = self.write('documents/pan/pan.pdf')
+        verification = VerificationDetails.objects.create(
+            user=self.vendor, aadhaar_document='documents/aadhaar/a.pdf', pan_document=name
+        )
+
+        self.client.force_authenticate(user=self.vendor)
+        self.assertEqual(self.client.get(f'/media/{name}').status_code, 404)
+        self.assertEqual(self.client.get(f'/media/{name}?signature=forged').status_code, 404)
+        other = signed_media_url('documents/aadhaar/a.pdf').split('?')[1]
+        self.assertEqual(self.client.get(f'/media/{name}?{other}').status_code, 404)
+
+        url = VerificationSerializer(verification).data['pan_document']
+        self.assertEqual(url.split('?')[0], f'/media/{name}')
+        self.client.force_authenticate(user=None)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+        with mock.patch('django.core.signing.time.time', return_value=time.time() + 301):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_public_media_ignores_bad_credentials(self):
+        name = self.write('profiles/photo.jpg')
+        response = self.client.get(f'/media/{name}', HTTP_AUTHORIZATION='Bearer expired.or.garbage')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.post(f'/media/{name}').status_code, 405)
+
+    def test_offload_to_front_proxy(self):
+        name = self.write('profiles/photo.jpg')
+
+        with self.settings(MEDIA_SERVING={**SERVING, 'OFFLOAD': 'x-accel-redirect'}):
+            response = self.client.get(f'/media/{name}')
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{name}')
+        self.assertEqual(response.content, b'')
+        self.assertIn('ETag', response)
+
+        with self.settings(MEDIA_SERVING={**SERVING, 'OFFLOAD': 'x-sendfile'}):
+            response = self.client.get(f'/media/{name}')
+        self.assertEqual(response['X-Sendfile'], os.path.join(self.media_root, name))
+
+    def test_paths_outside_media_root_are_not_found(self):
+        self.write('profiles/photo.jpg')
+        self.assertEqual(self.client.get('/media/%2e%2e/manage.py').status_code, 404)
+        self.assertEqual(self.client.get('/media/profiles/missing.jpg').status_code, 404)
@@ -0,0 +1,151 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from ..models import BookingDetails, Notification, VerificationDetails
+from ..notifications import send_batch
+from .factories import create_vendor
+
+NOTIFICATIONS = {
+    'DIGEST_DELAY': 0, 'BATCH_SIZE': 100, 'LEASE': 300, 'RETRY_BASE': 60, 'RETRY_MAX': 3600,
+    'MAX_ATTEMPTS': 3, 'POLL_INTERVAL': 0,
+}
+
+
+@override_settings(NOTIFICATIONS=NOTIFICATIONS)
+class NotificationOutboxTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.vendor = create_vendor('vendor@example.com', full_name='Asha')
+        self.client.force_authenticate(user=self.vendor)
+
+    def create_booking(self, vendor=None, customer='John Doe', status='pending'):
+        return BookingDetails.objects.create(
+            vendor=vendor or self.vendor, customer_name=customer, service_type='Wedding Photography',
+            event_date='2025-12-25', amount=1000, status=status, location='Puri'
+        )
+
+    def test_changes_are_queued_not_sent(self):
+        booking = self.create_booking()
+        self.assertFalse(Notification.objects.exists())  # Creating a booking isn't a status change
+
+        booking.status = 'in_progress'
+        booking.save()
+        booking.save()  # Re-saving without a change queues nothing
+
+        self.assertEqual(len(mail.outbox), 0)
+        notification = Notification.objects.get()
+        self.assertEqual((notification.vendor_id, notification.kind, notification.status),
+                         (self.vendor.pk, 'booking_status', 'pending'))
+        self.assertEqual(notification.payload['from'], 'pending')
+        self.assertEqual(notification.payload['to'], 'in_progress')
+
+    def test_events_coalesce_into_one_digest_per_vendor(self):
+        other = create_vendor('other@example.com')
+        first, second = self.create_booking(customer='Ravi'), self.create_booking(customer='Meera')
+        for status in ('in_progress', 'completed'):
+            first.status = status
+            first.save()
+        second.status = 'in_progress'
+        second.save()
+        other_booking = self.create_booking(vendor=other)
+        other_booking.status = 'completed'
+        other_booking.save()
+
+        with mock.patch.object(EmailBackend, 'open', autospec=True, side_effect=EmailBackend.open) as opened:
+            self.assertEqual(send_batch(), (2, 0, 4))
+        self.assertEqual(opened.call_count, 1)  # Both digests over one connection
+
+        self.assertEqual(len(mail.outbox), 2)
+        digest = next(message for message in mail.outbox if message.to == ['vendor@example.com'])
+        self.assertEqual(digest.subject, '2 updates on your Vendor Hub account')
+        self.assertIn('Booking #%d for Ravi (Wedding Photography): Pending -> Completed' % first.pk, digest.body)
+        self.assertIn('Booking #%d for Meera (Wedding Photography): Pending -> In Progress' % second.pk, digest.body)
+        self.assertFalse(Notification.objects.exclude(status='sent').exists())
+        self.assertEqual(send_batch(), (0, 0, 0))
+
+    def test_change_undone_before_sending_is_dropped(self):
+        booking = self.create_booking()
+        for status in ('completed', 'pending'):
+            booking.status = status
+            booking.save()
+
+        self.assertEqual(send_batch(), (0, 0, 2))
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Notification.objects.filter(status='sent').count(), 2)
+
+    @override_settings(NOTIFICATIONS={**NOTIFICATIONS, 'DIGEST_DELAY': 60})
+    def test_waits_for_the_digest_delay(self):
+        booking = self.create_booking()
+        booking.status = 'completed'
+        booking.save()
+        self.assertEqual(send_batch(), (0, 0, 0))
+
+        Notification.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(send_batch(), (1, 0, 1))
+
+    def test_bulk_status_change_queues_each_booking(self):
+        bookings = [self.create_booking() for _ in range(3)]
+        response = self.client.post(reverse('booking-bulk-status'), [
+            {'id': bookings[0].pk, 'status': 'completed'},
+            {'id': bookings[1].pk, 'status': 'in_progress'},
+            {'id': bookings[2].pk, 'status': 'pending'},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(sorted(Notification.objects.values_list('payload__to', flat=True)),
+                         ['completed', 'in_progress'])
+        self.assertEqual(send_batch(), (1, 0, 2))
+
+    def test_failed_send_is_retried_with_backoff(self):
+        booking = self.create_booking()
+        booking.status = 'completed'
+        booking.save()
+
+        with mock.patch.object(EmailBackend, 'send_messages', side_effect=OSError('Connection refused')):
+            started = timezone.now()
+            self.assertEqual(send_batch(), (0, 1, 1))
+        notification = Notification.objects.get()
+        self.assertEqual((notification.status, notification.attempts), ('pending', 1))
+        self.assertEqual(notification.last_error, 'Connection refused')
+        self.assertGreaterEqual(notification.next_attempt_at, started + timedelta(seconds=60))
+        self.assertEqual(send_batch(), (0, 0, 0))  # Not due yet
+
+        with mock.patch.object(EmailBackend, 'send_messages', side_effect=OSError('Connection refused')):
+            for attempt in (2, 3):
+                Notification.objects.update(next_attempt_at=timezone.now())
+                send_batch()
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), ('failed', 3))
+
+        Notification.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(send_batch(), (0, 0, 0))
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_verification_result_is_queued(self):
+        verification = VerificationDetails.objects.create(user=self.vendor)
+        self.assertFalse(Notification.objects.exists())
+
+        verification.status = 'approved'
+        verification.save()
+        VerificationDetails.objects.get(pk=verification.pk).save()  # Still approved: no second email
+
+        self.assertEqual(send_batch(), (1, 0, 1))
+        self.assertEqual(mail.outbox[0].subject, 'Verification Approved - Vendor Hub')
+        self.assertEqual(mail.outbox[0].body, 'Congratulations Asha! Your verification has been approved.')
+
+    def test_command(self):
+        booking = self.create_booking()
+        booking.status = 'completed'
+        booking.save()
+
+        out = StringIO()
+        call_command('send_notifications', '--once', stdout=out)
+        self.assertIn('Sent 1 digests, 0 failed', out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
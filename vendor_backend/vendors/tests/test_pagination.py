@@ -0,0 +1,102 @@
+from datetime import timedelta
+from django.db.models import Case, FloatField, Value, When
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from ..api.pagination import VendorPagination
+from ..models import UserDetails, BookingDetails, VendorChat
+from ..search import keyset_rank
+from .factories import create_vendor
+from .test_queries import QueryBudgetMixin
+
+
+class KeysetPaginationTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.vendor = create_vendor('vendor@example.com')
+        self.client.force_authenticate(user=self.vendor)
+
+    def create_bookings(self, count):
+        bookings = [
+            BookingDetails.objects.create(
+                vendor=self.vendor, customer_name=f'Customer {n}', service_type='Wedding',
+                event_date='2025-01-01', amount=1000, location='Puri'
+            )
+            for n in range(count)
+        ]
+        # Identical timestamps force the id tie-breaker to keep the order total
+        BookingDetails.objects.filter(pk__in=[b.pk for b in bookings]).update(created_at=timezone.now())
+        return bookings
+
+    def walk(self, url, key, **params):
+        seen = []
+        while url:
+            response = self.client.get(url, params)
+            params = {}
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data[key]
+        return seen
+
+    def test_bookings_walk_every_row_once_newest_first(self):
+        bookings = self.create_bookings(7)
+        seen = self.walk(reverse('booking-list'), 'next', page_size=3)
+        self.assertEqual(seen, sorted((b.id for b in bookings), reverse=True))
+
+    def test_inserts_do_not_shift_pages(self):
+        self.create_bookings(4)
+        first = self.client.get(reverse('booking-list'), {'page_size': 2}).data
+        self.create_bookings(3)
+        second = self.client.get(first['next']).data
+        self.assertTrue(set(r['id'] for r in first['results']).isdisjoint(r['id'] for r in second['results']))
+        self.assertEqual(len(second['results']), 2)
+
+    @override_settings(API_MAX_PAGE_SIZE=5)
+    def test_page_size_is_capped(self):
+        self.create_bookings(8)
+        response = self.client.get(reverse('booking-list'), {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('booking-list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_deep_pages_stay_within_budget(self):
+        self.create_bookings(12)
+        response = self.assertQueryBudget('booking-list', reverse('booking-list'), page_size=2)
+        for _ in range(4):
+            response = self.assertQueryBudget('booking-list', response.data['next'])
+
+    def test_chat_starts_at_latest_messages(self):
+        other = create_vendor('other@example.com')
+        now = timezone.now()
+        messages = []
+        for n in range(5):
+            message = VendorChat.objects.create(sender=other, receiver=self.vendor, message=f'm{n}')
+            VendorChat.objects.filter(pk=message.pk).update(timestamp=now + timedelta(seconds=n))
+            messages.append(message.id)
+
+        url = reverse('chat-messages', args=[other.id])
+        response = self.assertQueryBudget('chat-messages', url, page_size=2)
+        self.assertEqual([m['id'] for m in response.data['results']], messages[-2:])
+        self.assertIsNone(response.data['next'])
+
+        older = self.walk(response.data['previous'], 'previous')
+        self.assertEqual(sorted(older), messages[:3])
+
+    def test_tied_search_ranks_page_every_row_once(self):
+        vendors = [create_vendor(f'ranked{n}@example.com') for n in range(7)]
+        # float4-like ranks: most tie, and none is exact in binary
+        rank = Case(When(id__in=[v.id for v in vendors[:2]], then=Value(0.0607927)),
+                    default=Value(0.0303964), output_field=FloatField())
+        queryset = UserDetails.objects.filter(id__in=[v.id for v in vendors]).annotate(
+            search_rank=keyset_rank(rank)).order_by('-search_rank', 'id')
+        factory, url, seen = APIRequestFactory(), '/api/vendor/vendors/?limit=2', []
+        while url:
+            paginator = VendorPagination()
+            page = paginator.paginate_queryset(queryset, Request(factory.get(url)))
+            self.assertTrue(all(isinstance(vendor.search_rank, int) for vendor in page))
+            seen.extend(vendor.id for vendor in page)
+            url = paginator.next
+        self.assertEqual(seen, [v.id for v in vendors])
@@ -0,0 +1,99 @@
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.signals import user_login_failed
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..models import UserDetails
+
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+class SuspendedVendorBackend(ModelBackend):
+    def user_can_authenticate(self, user):
+        return super().user_can_authenticate(user) and user.business != 'Suspended'
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class AsyncAuthTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.vendor = UserDetails.objects.create(
+            username='me@example.com', email='me@example.com', full_name='Test Vendor', business='DJ',
+            experience_level='Expert', password=make_password('s3cret-pass'),
+        )
+
+    def login(self, password='s3cret-pass'):
+        return self.client.post(reverse('vendor-login'), {'email': 'me@example.com', 'password': password}, format='json')
+
+    def test_login(self):
+        response = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['vendor']['id'], self.vendor.pk)
+        self.assertTrue(response.data['vendor']['is_online'])
+        self.assertIn('access', response.data)
+
+    def test_invalid_credentials(self):
+        response = self.login('wrong')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'non_field_errors': ['Invalid credentials']})
+
+        response = self.client.post(reverse('vendor-login'), {'email': 'nobody@example.com', 'password': 'x'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(reverse('vendor-login'), {'email': 'me@example.com'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.data)
+
+    def test_inactive_vendor_cannot_log_in(self):
+        UserDetails.objects.filter(pk=self.vendor.pk).update(is_active=False)
+        self.assertEqual(self.login().status_code, 400)
+
+    def test_failed_login_sends_user_login_failed(self):
+        failures = []
+        handler = lambda sender, credentials, request, **kwargs: failures.append(credentials)
+        user_login_failed.connect(handler)
+        self.addCleanup(user_login_failed.disconnect, handler)
+
+        self.login('wrong')
+        self.client.post(reverse('vendor-login'), {'email': 'nobody@example.com', 'password': 'x'}, format='json')
+        self.assertEqual([credentials['username'] for credentials in failures], ['me@example.com', 'nobody@example.com'])
+        self.assertNotIn('wrong', [credentials['password'] for credentials in failures])
+        self.login()
+        self.assertEqual(len(failures), 2)
+
+    @override_settings(AUTHENTICATION_BACKENDS=['vendors.tests.test_passwords.SuspendedVendorBackend'])
+    def test_login_follows_authentication_backends(self):
+        self.assertEqual(self.login().status_code, 200)
+        UserDetails.objects.filter(pk=self.vendor.pk).update(business='Suspended')
+        self.assertEqual(self.login().status_code, 400)
+
+    def test_login_upgrades_outdated_hash(self):
+        updated_at = self.vendor.updated_at
+        with override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.PBKDF2PasswordHasher'] + FAST_HASHERS):
+            self.assertEqual(self.login().status_code, 200)
+            self.vendor.refresh_from_db()
+            self.assertTrue(self.vendor.password.startswith('pbkdf2_sha256$'))
+            self.assertTrue(check_password('s3cret-pass', self.vendor.password))
+        self.assertEqual(self.vendor.updated_at, updated_at)
+
+    def test_register_hashes_password(self):
+        response = self.client.post(reverse('vendor-register'), {
+            'email': 'new@example.com', 'full_name': 'New Vendor', 'mobile': '9999999999',
+            'business': 'Photography', 'password': 'another-pass', 'city': 'Puri',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        vendor = UserDetails.objects.get(email='new@example.com')
+        self.assertTrue(check_password('another-pass', vendor.password))
+        self.assertEqual(vendor.profile.city, 'Puri')
+
+    def test_saturated_pool_is_rejected(self):
+        with self.settings(PASSWORD_HASHING={'WORKERS': 1, 'MAX_PENDING': 0}):
+            response = self.login()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_post_only(self):
+        self.assertEqual(self.client.get(reverse('vendor-login')).status_code, 405)
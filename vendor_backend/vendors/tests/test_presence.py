@@ -0,0 +1,76 @@
+import json
+from unittest import mock
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from .. import presence
+from ..consumers import ChatConsumer
+from ..models import UserDetails
+from .factories import create_vendor
+from .test_queries import QueryBudgetMixin
+
+
+class PresenceTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        presence._last_touch.clear()
+        self.client = APIClient()
+        self.me = create_vendor('me@example.com')
+        self.alice = create_vendor('alice@example.com')
+        self.bob = create_vendor('bob@example.com')
+        self.client.force_authenticate(user=self.me)
+
+    def test_heartbeat_is_visible_without_a_row_write(self):
+        updated_at = self.alice.updated_at
+        presence.touch(self.alice.pk)
+
+        with mock.patch.object(cache, 'get_many', wraps=cache.get_many) as get_many:
+            entries = self.assertQueryBudget('vendor-list-chat', reverse('vendor-list-chat')).data['results']
+        self.assertEqual(get_many.call_count, 1)
+        self.assertEqual({e['id']: e['is_online'] for e in entries}, {self.alice.pk: True, self.bob.pk: False})
+
+        self.alice.refresh_from_db()
+        self.assertEqual(self.alice.updated_at, updated_at)
+
+    def test_flush_copies_presence_to_the_database(self):
+        with self.assertNumQueries(0):
+            presence.touch(self.alice.pk)  # heartbeats never write to the database
+        self.assertFalse(UserDetails.objects.filter(is_online=True).exists())
+        self.assertEqual(presence.flush_presence(), (1, 0))
+        presence.touch(self.bob.pk)
+        self.assertEqual(presence.flush_presence(), (1, 0))
+        self.assertEqual(set(UserDetails.objects.filter(is_online=True).values_list('id', flat=True)),
+                         {self.alice.pk, self.bob.pk})
+
+        cache.delete(presence.PRESENCE_KEY.format(self.bob.pk))  # heartbeat TTL ran out
+        presence.mark_offline(self.alice.pk)
+        self.assertEqual(presence.flush_presence(), (0, 2))
+        self.assertFalse(UserDetails.objects.filter(is_online=True).exists())
+
+    def test_logout_goes_offline_immediately(self):
+        presence.touch(self.me.pk)
+        self.client.post(reverse('vendor-logout'))
+        self.assertFalse(self.client.get(reverse('vendor-profile')).data['is_online'])
+
+    def heartbeat(self, vendor_id, user):
+        async def run():
+            communicator = ApplicationCommunicator(ChatConsumer.as_asgi(), {
+                'type': 'websocket', 'path': f'/ws/chat/{vendor_id}/', 'headers': [], 'subprotocols': [],
+                'url_route': {'kwargs': {'vendor_id': str(vendor_id)}}, 'user': user,
+            })
+            await communicator.send_input({'type': 'websocket.connect'})
+            await communicator.receive_output()
+            await communicator.send_input({'type': 'websocket.receive', 'text': json.dumps({'type': 'heartbeat'})})
+            await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await communicator.wait()
+        async_to_sync(run)()
+
+    @override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+    def test_websocket_heartbeat_only_marks_the_signed_in_vendor(self):
+        self.heartbeat(self.bob.pk, self.alice)
+        self.heartbeat(self.bob.pk, AnonymousUser())
+        self.assertEqual(presence.online_vendor_ids([self.alice.pk, self.bob.pk]), {self.alice.pk})
@@ -0,0 +1,94 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..models import ProfileDetails, VerificationDetails, VendorService
+from .factories import create_vendor
+
+# Maximum number of SQL queries each endpoint may run, whatever the row count.
+# Raise a budget only together with a reason in the commit that needs it.
+QUERY_BUDGETS = {
+    # A viewer on a page missing from the listing cache renders it twice: shared, then their own
+    'vendors-list': 4,
+    # One version query for conditional GET, which alone answers 304s
+    'vendor-detail': 3,
+    'vendor-profile': 3,
+    'dashboard-stats': 1,
+    'booking-analytics': 1,
+    # The cube query plus the refresh high-water mark
+    'booking-cube': 2,
+    'booking-list': 1,
+    'chat-messages': 1,
+    # Conversations, then the vendors never chatted with once those run out
+    'vendor-list-chat': 2,
+}
+
+
+def create_listed_vendor(index, with_services=2):
+    """A verified vendor with a full profile, ``with_services`` active services and one retired one"""
+    vendor = create_vendor(f'vendor{index}@example.com', mobile='1234567890')
+    ProfileDetails.objects.create(user=vendor, location='Patia', city='Bhubaneswar', state='Odisha')
+    VerificationDetails.objects.create(
+        user=vendor,
+        aadhaar_document='documents/aadhaar/a.pdf',
+        pan_document='documents/pan/p.pdf',
+        is_verified=True,
+        status='approved',
+    )
+    for n in range(with_services):
+        VendorService.objects.create(user=vendor, service_name=f'Service {n}', category='Photography', service_price=1000)
+    VendorService.objects.create(user=vendor, service_name='Retired', category='Photography', is_active=False)
+    return vendor
+
+
+class QueryBudgetMixin:
+    def assertQueryBudget(self, budget_name, url, **params):
+        budget = QUERY_BUDGETS[budget_name]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(
+            len(ctx.captured_queries), budget,
+            f"{budget_name} ran {len(ctx.captured_queries)} queries (budget {budget}):\n"
+            + "\n".join(q['sql'] for q in ctx.captured_queries)
+        )
+        return response
+
+
+class VendorProfileQueryBudgetTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_listed_vendor(0)
+        self.client.force_authenticate(user=self.user)
+
+    def test_vendor_list_budget_does_not_grow_with_rows(self):
+        for i in range(1, 4):
+            create_listed_vendor(i)
+        response = self.assertQueryBudget('vendors-list', reverse('vendors-list'))
+        self.assertEqual(len(response.data['results']), 3)
+
+        for i in range(4, 15):
+            create_listed_vendor(i)
+        response = self.assertQueryBudget('vendors-list', reverse('vendors-list'), limit=50)
+        self.assertEqual(len(response.data['results']), 14)
+
+    def test_vendor_list_next_page_budget(self):
+        for i in range(1, 10):
+            create_listed_vendor(i)
+        response = self.assertQueryBudget('vendors-list', reverse('vendors-list'), limit=5)
+        self.assertQueryBudget('vendors-list', response.data['next'])
+
+    def test_vendor_list_serializes_prefetched_data(self):
+        create_listed_vendor(1)
+        vendor = self.client.get(reverse('vendors-list')).data['results'][0]
+        self.assertTrue(vendor['is_verified'])
+        self.assertEqual(vendor['city'], 'Bhubaneswar')
+        self.assertEqual([s['service_name'] for s in vendor['services']], ['Service 0', 'Service 1'])
+
+    def test_vendor_detail_budget(self):
+        other = create_listed_vendor(1, with_services=10)
+        self.assertQueryBudget('vendor-detail', reverse('vendor-detail', args=[other.pk]))
+
+    def test_vendor_profile_budget(self):
+        self.assertQueryBudget('vendor-profile', reverse('vendor-profile'))
@@ -0,0 +1,56 @@
+import unittest
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from ..models import UserDetails, BookingDetails, VendorChat
+from ..query_plans import analyze, endpoint_queries, explain, propose_index, read_plan
+from .factories import create_vendor
+
+
+class QueryPlanTest(TestCase):
+    def setUp(self):
+        self.vendor = create_vendor('vendor@example.com')
+        self.other = create_vendor('other@example.com')
+        BookingDetails.objects.create(
+            vendor=self.vendor, customer_name='John Doe', service_type='Wedding',
+            event_date='2025-12-25', amount=1000, location='Puri'
+        )
+        VendorChat.objects.create(sender=self.other, receiver=self.vendor, message='hello')
+
+    def test_hot_queries_avoid_full_scans_and_sorts(self):
+        reports = analyze(self.vendor, self.other)
+        flagged = {
+            report.name: (report.full_scans, report.sorted, report.proposal)
+            for report in reports
+            if (report.full_scans or report.sorted) and not report.accepted
+        }
+        self.assertEqual(flagged, {})
+        # Accepted debt is still reported, just not failed on
+        self.assertEqual({report.name: report.sorted for report in reports if report.accepted}, {'chat-messages': True})
+
+    def test_endpoints_are_explained_with_their_page_limit(self):
+        queries = dict(endpoint_queries(self.vendor, self.other))
+        self.assertEqual(queries['vendors-list'].query.high_mark, 21)
+        self.assertEqual(queries['vendors-list'].query.order_by, ('-created_at', '-id'))
+        self.assertEqual(queries['chat-messages'].query.order_by, ('-timestamp', '-id'))
+
+    @unittest.skipIf(connection.vendor != 'sqlite', 'reads SQLite plans')
+    def test_an_unlimited_scan_is_a_full_scan(self):
+        plan = explain(UserDetails.objects.order_by('-created_at', '-id'))
+        self.assertIn('user_details', read_plan(plan)[0])
+        self.assertEqual(read_plan(explain(UserDetails.objects.order_by('-created_at', '-id')[:21]), limited=True)[0], set())
+
+    def test_proposal_leads_with_foreign_keys(self):
+        queryset = BookingDetails.objects.filter(status='pending', vendor=self.vendor).order_by('-created_at')
+        self.assertEqual(
+            propose_index(queryset), "BookingDetails: models.Index(fields=['vendor', 'status', 'created_at'])"
+        )
+
+    def test_command_reports_every_endpoint(self):
+        out = StringIO()
+        call_command('analyze_queries', '--vendors', '20', stdout=out)
+        self.assertIn('booking-list', out.getvalue())
+        self.assertIn('chat-messages            sort, accepted debt: ', out.getvalue())
+        self.assertIn('1 of ', out.getvalue())
+        self.assertNotIn('chat-messages            OK', out.getvalue())
@@ -0,0 +1,117 @@
+import datetime
+import gzip
+import io
+import unittest
+from unittest import mock
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+from vendor_hub.compression import accepted_encodings, brotli, carries_secrets
+from ..api.renderers import ORJSONParser, ORJSONRenderer
+from ..api.views import VendorServicesListView
+from ..models import UserDetails, VendorService
+
+COMPRESSION = {'ENABLED': True, 'MIN_SIZE': 200, 'BROTLI_QUALITY': 4, 'SKIP_URL_NAMES': ('vendor-register', 'vendor-login')}
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    def test_output_matches_stock_renderer(self):
+        data = {
+            'price': Decimal('1500.50'),
+            'created_at': datetime.datetime(2025, 12, 25, 10, 30, 0, 123456, tzinfo=datetime.timezone.utc),
+            'local': timezone.make_aware(datetime.datetime(2025, 12, 25, 16, 0), timezone=datetime.timezone(datetime.timedelta(hours=5, minutes=30))),
+            'event_date': datetime.date(2025, 12, 25),
+            'label': gettext_lazy('Pending'),
+            'errors': [ErrorDetail('This field is required.', code='required')],
+            'counts': {1: 'one'},
+            'text': 'Odia ଓଡ଼ିଆ and a line separator \u2028',
+            'missing': None,
+        }
+
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_indent_falls_back_to_stock_renderer(self):
+        data = {'a': [1, 2]}
+        self.assertEqual(ORJSONRenderer().render(data, 'application/json; indent=2'),
+                         JSONRenderer().render(data, 'application/json; indent=2'))
+
+    def test_parser(self):
+        body = '{"name": "ଓଡ଼ିଆ", "amount": 1500.5, "tags": [1, null]}'.encode()
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"name": NaN}'))
+
+    def test_accepted_encodings(self):
+        self.assertEqual(accepted_encodings('gzip, deflate, br;q=0'), {'gzip', 'deflate'})
+        self.assertEqual(accepted_encodings('br;q=1.0, gzip;q=0.8'), {'br', 'gzip'})
+
+
+@override_settings(COMPRESSION=COMPRESSION)
+class CompressionTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.vendor = UserDetails.objects.create(
+            username='vendor@example.com', email='vendor@example.com', full_name='Test Vendor',
+            business='Catering', experience_level='Expert'
+        )
+        for n in range(10):
+            VendorService.objects.create(user=self.vendor, service_name=f'Buffet {n}', category='Catering',
+                                         description='Veg and non-veg buffet packages')
+        self.client.force_authenticate(user=self.vendor)
+
+    def test_large_responses_are_gzipped(self):
+        plain = self.client.get(reverse('services-list'))
+        response = self.client.get(reverse('services-list'), HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+
+    def test_gzip_is_padded_against_breach(self):
+        response = self.client.get(reverse('services-list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(response.content[3] & gzip.FNAME)  # Django's random filename padding
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_responses_with_tokens_are_not_compressed(self):
+        UserDetails.objects.filter(pk=self.vendor.pk).update(password=make_password('s3cret-pass'))
+        response = self.client.post(reverse('vendor-login'), {'email': 'vendor@example.com', 'password': 's3cret-pass'},
+                                    format='json', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(response.content), COMPRESSION['MIN_SIZE'])
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        request = RequestFactory().get('/')
+        self.assertTrue(carries_secrets(request, Response({'access': 'x', 'vendor': {}})))
+        self.assertFalse(carries_secrets(request, Response({'results': []})))
+
+    @unittest.skipIf(brotli is None, 'brotli is not installed')
+    def test_brotli_preferred_when_accepted(self):
+        response = self.client.get(reverse('services-list'), HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+
+    def test_small_or_unaccepted_responses_are_left_alone(self):
+        with self.settings(COMPRESSION={**COMPRESSION, 'MIN_SIZE': 100000}):
+            response = self.client.get(reverse('services-list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        response = self.client.get(reverse('services-list'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    # API_FAST_JSON is read at startup, when views copy the default classes
+    @mock.patch.object(VendorServicesListView, 'parser_classes', [ORJSONParser])
+    @mock.patch.object(VendorServicesListView, 'renderer_classes', [ORJSONRenderer])
+    def test_endpoint_with_orjson(self):
+        response = self.client.post(reverse('services-list'), {'service_name': 'Snacks', 'service_price': '250.00'},
+                                    format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['service_price'], '250.00')
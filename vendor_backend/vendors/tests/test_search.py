@@ -0,0 +1,93 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..locations import _match_places_fallback
+from ..models import Location, LocationTrigram, UserDetails, ProfileDetails, VendorService, VendorSearchDocument
+from ..search import search_vendors
+
+
+class VendorSearchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.viewer = UserDetails.objects.create(
+                username='viewer@example.com', email='viewer@example.com',
+                full_name='Viewer', business='DJ', experience_level='Expert'
+            )
+            self.caterer = UserDetails.objects.create(
+                username='caterer@example.com', email='caterer@example.com',
+                full_name='Meera Iyer', business='Catering', experience_level='Expert'
+            )
+            VendorService.objects.create(user=self.caterer, service_name='Wedding Buffet', category='Catering')
+        self.client.force_authenticate(user=self.viewer)
+
+    def test_document_is_built_on_save(self):
+        document = VendorSearchDocument.objects.get(vendor=self.caterer).document
+        self.assertIn('meera iyer', document)
+        self.assertIn('wedding buffet', document)
+
+    def test_service_changes_reindex_vendor(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            VendorService.objects.create(user=self.caterer, service_name='Haldi Snacks', category='Catering')
+        self.assertEqual(list(search_vendors(UserDetails.objects.all(), 'haldi')), [self.caterer])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            VendorService.objects.filter(service_name='Haldi Snacks').get().delete()
+        self.assertEqual(list(search_vendors(UserDetails.objects.all(), 'haldi')), [])
+
+    def test_vendor_list_search_matches_all_terms(self):
+        response = self.client.get(reverse('vendors-list'), {'search': 'buffet meera'})
+        self.assertEqual([v['id'] for v in response.data['results']], [self.caterer.id])
+
+        response = self.client.get(reverse('vendors-list'), {'search': 'buffet viewer'})
+        self.assertEqual(response.data['results'], [])
+
+
+class VendorLocationFilterTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.viewer = UserDetails.objects.create(
+                username='viewer@example.com', email='viewer@example.com',
+                full_name='Viewer', business='DJ', experience_level='Expert'
+            )
+            self.vendor = UserDetails.objects.create(
+                username='vendor@example.com', email='vendor@example.com',
+                full_name='Odia Vendor', business='Florist', experience_level='Expert'
+            )
+            ProfileDetails.objects.create(
+                user=self.vendor, location='Patia, Bhubaneswar, Odisha - 751024',
+                city='Bhubaneswar', state='Odisha', pincode='751024'
+            )
+        self.client.force_authenticate(user=self.viewer)
+
+    def get_vendor_ids(self, location):
+        response = self.client.get(reverse('vendors-list'), {'location': location})
+        return [v['id'] for v in response.data['results']]
+
+    def test_exact_and_partial_matches(self):
+        self.assertEqual(self.get_vendor_ids('Bhubaneswar'), [self.vendor.id])
+        self.assertEqual(self.get_vendor_ids('odi'), [self.vendor.id])
+        self.assertEqual(self.get_vendor_ids('751024'), [self.vendor.id])
+
+    def test_typo_tolerant_match(self):
+        self.assertEqual(self.get_vendor_ids('Bhubneswar'), [self.vendor.id])
+
+    def test_matches_come_from_the_trigram_index(self):
+        location = Location.objects.get(name='bhubaneswar')
+        self.assertIn(' bh', set(location.trigrams.values_list('trigram', flat=True)))
+        # Nothing scans the names: a location without trigram rows can't be found
+        LocationTrigram.objects.filter(location=location).delete()
+        self.assertNotIn(location.id, _match_places_fallback('bhubneswar'))
+
+    def test_unknown_location_matches_nothing(self):
+        self.assertEqual(self.get_vendor_ids('Chennai'), [])
+
+    def test_profile_change_relinks_locations(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            profile = ProfileDetails.objects.get(user=self.vendor)
+            profile.location = 'Cuttack'
+            profile.city = 'Cuttack'
+            profile.save()
+        self.assertEqual(self.get_vendor_ids('Bhubaneswar'), [])
+        self.assertEqual(self.get_vendor_ids('Cuttack'), [self.vendor.id])
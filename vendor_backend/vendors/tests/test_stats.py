@@ -0,0 +1,101 @@
+from datetime import timedelta
+from decimal import Decimal
+from importlib import import_module
+from io import StringIO
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from ..models import UserDetails, BookingDetails, VendorStats
+from .test_queries import QueryBudgetMixin
+
+
+class VendorStatsTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.vendor = UserDetails.objects.create(
+            username='vendor@example.com', email='vendor@example.com',
+            full_name='Test Vendor', business='Photography', experience_level='Expert'
+        )
+        self.client.force_authenticate(user=self.vendor)
+
+    def create_booking(self, amount, status='pending'):
+        return BookingDetails.objects.create(
+            vendor=self.vendor, customer_name='John Doe', service_type='Wedding Photography',
+            event_date='2025-12-25', amount=amount, status=status, location='Puri'
+        )
+
+    def get_stats(self):
+        return self.assertQueryBudget('dashboard-stats', reverse('dashboard-stats')).data
+
+    def test_counters_follow_booking_lifecycle(self):
+        first = self.create_booking(1500)
+        second = self.create_booking(2500, status='in_progress')
+
+        first.status = 'completed'
+        first.save()
+        second.delete()
+
+        stats = self.get_stats()
+        self.assertEqual(stats['total_bookings'], 1)
+        self.assertEqual(stats['pending_bookings'], 0)
+        self.assertEqual(stats['in_progress_bookings'], 0)
+        self.assertEqual(stats['completed_bookings'], 1)
+        self.assertEqual(Decimal(stats['total_revenue']), Decimal('1500'))
+        self.assertEqual(Decimal(stats['monthly_revenue']), Decimal('1500'))
+
+    def test_status_update_endpoint_moves_counters(self):
+        booking = self.create_booking(800)
+        self.client.patch(reverse('booking-status-update', args=[booking.pk]), {'status': 'completed'}, format='json')
+        stats = self.get_stats()
+        self.assertEqual(stats['pending_bookings'], 0)
+        self.assertEqual(stats['completed_bookings'], 1)
+
+    def test_monthly_revenue_excludes_earlier_months(self):
+        booking = self.create_booking(1000)
+        BookingDetails.objects.filter(pk=booking.pk).update(created_at=timezone.now() - timedelta(days=70))
+        booking = BookingDetails.objects.get(pk=booking.pk)
+        booking.status = 'completed'
+        booking.save()
+
+        stats = self.get_stats()
+        self.assertEqual(Decimal(stats['total_revenue']), Decimal('1000'))
+        self.assertEqual(Decimal(stats['monthly_revenue']), Decimal('0'))
+
+    def test_verify_and_rebuild_command(self):
+        self.create_booking(1000, status='completed')
+        BookingDetails.objects.update(amount=3000)  # bypasses save()
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_vendor_stats', '--verify', stdout=StringIO())
+        call_command('rebuild_vendor_stats', stdout=StringIO())
+        call_command('rebuild_vendor_stats', '--verify', stdout=StringIO())
+        self.assertEqual(VendorStats.objects.get(vendor=self.vendor).total_revenue, Decimal('3000'))
+
+    def test_deferred_loads_do_not_query_per_row(self):
+        for _ in range(3):
+            self.create_booking(1000)
+        with CaptureQueriesContext(connection) as queries:
+            bookings = list(BookingDetails.objects.only('id', 'customer_name'))
+        self.assertEqual(len(queries.captured_queries), 1)
+
+        # The snapshot is read from the stored row when a deferred instance is saved
+        booking = bookings[0]
+        booking.status = 'completed'
+        booking.save()
+        BookingDetails.objects.defer('amount').get(pk=bookings[1].pk).delete()
+        call_command('rebuild_vendor_stats', '--verify', stdout=StringIO())
+
+    def test_migration_backfills_existing_bookings(self):
+        self.create_booking(1000, status='completed')
+        self.create_booking(500)
+        VendorStats.objects.all().delete()
+
+        import_module('vendors.migrations.0006_vendorstats').backfill_stats(apps, None)
+        call_command('rebuild_vendor_stats', '--verify', stdout=StringIO())
+        self.assertEqual(VendorStats.objects.get(vendor=self.vendor).total_bookings, 2)
@@ -0,0 +1,153 @@
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from ..models import UploadSession, UserDetails, VerificationDetails
+
+PDF = b'%PDF-1.4\n' + bytes(range(256)) * 10
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 500
+
+
+class ChunkedVerificationUploadTest(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media_root = media.name
+        self.staging = os.path.join(media.name, 'staging')
+        settings = override_settings(MEDIA_ROOT=media.name, CHUNKED_UPLOADS={
+            'DIR': self.staging, 'MAX_SIZE': 4096, 'MAX_CHUNK_SIZE': 1024, 'EXPIRY_HOURS': 24,
+        })
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.client = APIClient()
+        self.vendor = UserDetails.objects.create(
+            username='vendor@example.com', email='vendor@example.com', full_name='Test Vendor',
+            business='Catering', experience_level='Expert'
+        )
+        self.client.force_authenticate(user=self.vendor)
+
+    def start(self, field, filename, content):
+        response = self.client.post(reverse('verification-uploads'),
+                                    {'field': field, 'filename': filename, 'size': len(content)}, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data['id']
+
+    def put(self, upload_id, content, start, end=None):
+        end = min(len(content), start + 1024) - 1 if end is None else end
+        return self.client.put(
+            reverse('verification-upload-detail', args=[upload_id]), content[start:end + 1],
+            content_type='application/octet-stream', HTTP_CONTENT_RANGE=f'bytes {start}-{end}/{len(content)}'
+        )
+
+    def upload(self, field, filename, content):
+        upload_id = self.start(field, filename, content)
+        for start in range(0, len(content), 1024):
+            self.assertEqual(self.put(upload_id, content, start).status_code, 200)
+        return upload_id
+
+    def test_chunks_are_assembled_and_attached(self):
+        aadhaar = self.upload('aadhaar_document', 'aadhaar.pdf', PDF)
+        pan = self.upload('pan_document', 'pan.png', PNG)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('verification-complete'),
+                                        {'aadhaar_document': aadhaar, 'pan_document': pan}, format='json')
+
+        self.assertEqual(response.status_code, 200, response.data)
+        verification = VerificationDetails.objects.get(user=self.vendor)
+        self.assertTrue(verification.is_verified)
+        self.assertTrue(verification.aadhaar_document.name.startswith('documents/aadhaar/'))
+        with verification.aadhaar_document.open('rb') as f:
+            self.assertEqual(f.read(), PDF)
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertEqual(os.listdir(self.staging), [])
+
+    def test_resume_after_interrupted_chunk(self):
+        upload_id = self.start('aadhaar_document', 'aadhaar.pdf', PDF)
+        self.put(upload_id, PDF, 0)
+
+        # Client thinks the second chunk failed and retries from the wrong place
+        response = self.put(upload_id, PDF, 2048)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['offset'], 1024)
+
+        status = self.client.get(reverse('verification-upload-detail', args=[upload_id])).data
+        for start in range(status['offset'], len(PDF), 1024):
+            self.put(upload_id, PDF, start)
+        self.assertEqual(UploadSession.objects.get().received, len(PDF))
+
+    def test_lost_staging_file_restarts_the_upload(self):
+        upload_id = self.start('aadhaar_document', 'aadhaar.pdf', PDF)
+        self.put(upload_id, PDF, 0)
+        os.remove(os.path.join(self.staging, f'{upload_id}.part'))  # purged, or staged on another host
+
+        response = self.put(upload_id, PDF, 1024)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['offset'], 0)
+        self.assertEqual(UploadSession.objects.get().received, 0)
+
+        for start in range(0, len(PDF), 1024):
+            self.assertEqual(self.put(upload_id, PDF, start).status_code, 200)
+        self.assertEqual(UploadSession.objects.get().received, len(PDF))
+
+    def test_completing_a_lost_upload_is_a_conflict(self):
+        aadhaar = self.upload('aadhaar_document', 'aadhaar.pdf', PDF)
+        pan = self.upload('pan_document', 'pan.png', PNG)
+        os.remove(os.path.join(self.staging, f'{pan}.part'))
+
+        response = self.client.post(reverse('verification-complete'),
+                                    {'aadhaar_document': aadhaar, 'pan_document': pan}, format='json')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual((response.data['upload'], response.data['offset']), (str(pan), 0))
+        self.assertEqual(UploadSession.objects.get(pk=pan).received, 0)
+        self.assertEqual(UploadSession.objects.get(pk=aadhaar).received, len(PDF))
+        self.assertFalse(VerificationDetails.objects.exists())
+
+    def test_magic_bytes_checked_on_first_chunk(self):
+        upload_id = self.start('pan_document', 'pan.pdf', PNG)
+
+        response = self.put(upload_id, PNG, 0)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertEqual(os.listdir(self.staging), [])
+
+    def test_size_limits(self):
+        response = self.client.post(reverse('verification-uploads'),
+                                    {'field': 'pan_document', 'filename': 'pan.pdf', 'size': 4097}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        upload_id = self.start('pan_document', 'pan.pdf', PDF)
+        self.assertEqual(self.put(upload_id, PDF, 0, 1024).status_code, 413)
+        self.assertEqual(self.put(upload_id, PDF, 0, len(PDF)).status_code, 400)  # Past the declared size
+
+    def test_incomplete_or_foreign_uploads_cannot_be_attached(self):
+        aadhaar = self.start('aadhaar_document', 'aadhaar.pdf', PDF)
+        self.put(aadhaar, PDF, 0)
+        other = UserDetails.objects.create(username='other@example.com', email='other@example.com',
+                                           full_name='Other', business='DJ', experience_level='Expert')
+        pan = UploadSession.objects.create(user=other, field='pan_document', filename='pan.png', size=1, received=1)
+
+        response = self.client.post(reverse('verification-complete'),
+                                    {'aadhaar_document': aadhaar, 'pan_document': str(pan.pk)}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {'aadhaar_document', 'pan_document'})
+        self.assertFalse(VerificationDetails.objects.exists())
+
+    def test_purge_abandoned_uploads(self):
+        upload_id = self.start('aadhaar_document', 'aadhaar.pdf', PDF)
+        self.put(upload_id, PDF, 0)
+        UploadSession.objects.update(updated_at=timezone.now() - timedelta(days=2))
+
+        call_command('purge_uploads', stdout=StringIO())
+
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertEqual(os.listdir(self.staging), [])
@@ -0,0 +1,188 @@
+"""Resumable, chunked uploads of verification documents.
+
+A client starts a session with the document's field, file name and size, sends
+the bytes in order as ``PUT`` requests carrying ``Content-Range: bytes
+<start>-<end>/<size>``, then completes the upload with a small JSON request naming
+its sessions. Each chunk is streamed from the socket straight to a staging file
+under CHUNKED_UPLOADS['DIR'], so no request buffers more than MAX_CHUNK_SIZE or
+lasts longer than one chunk takes to arrive. A dropped connection costs only
+the current chunk: a GET on the session returns the offset to resume from.
+
+The file type is checked against its magic bytes on the first chunk, and the
+size limits are enforced as chunks arrive, so a wrong or oversized document is
+refused before the rest of it has been sent.
+"""
+import os
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .models import UploadSession, VerificationDetails
+
+SIGNATURES = {
+    'pdf': b'%PDF-',
+    'jpg': b'\xff\xd8\xff',
+    'jpeg': b'\xff\xd8\xff',
+    'png': b'\x89PNG\r\n\x1a\n',
+}
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+READ_SIZE = 64 * 1024
+
+
+class UploadConflict(Exception):
+    """The chunk doesn't start where the upload left off; ``offset`` says where to resume.
+
+    ``session`` is set when its staging file has gone (purged, or staged on
+    another host) and the upload was reset to offset 0.
+    """
+
+    def __init__(self, offset, session=None):
+        super().__init__(offset)
+        self.offset = offset
+        self.session = session
+
+
+class ChunkTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+    def __init__(self, limit):
+        super().__init__({'error': f'Chunks may be at most {limit} bytes'})
+
+
+def extension(filename):
+    return os.path.splitext(filename)[1].lstrip('.').lower()
+
+
+def staging_path(session):
+    return os.path.join(settings.CHUNKED_UPLOADS['DIR'], f'{session.pk}.part')
+
+
+def parse_content_range(header, size):
+    """(start, end) inclusive from a ``Content-Range`` header for an upload of ``size`` bytes"""
+    match = CONTENT_RANGE_RE.match(header or '')
+    if not match:
+        raise ValidationError({'error': 'Send each chunk with Content-Range: bytes <start>-<end>/<size>'})
+    start, end, total = map(int, match.groups())
+    if total != size or end < start or end >= size:
+        raise ValidationError({'error': f'Content-Range must lie within the {size} bytes declared for this upload'})
+    return start, end
+
+
+def write_chunk(session, stream, content_range, content_length):
+    """Append one chunk from ``stream`` to the staging file; returns the new offset"""
+    start, end = parse_content_range(content_range, session.size)
+    length = end - start + 1
+    if length > settings.CHUNKED_UPLOADS['MAX_CHUNK_SIZE']:
+        raise ChunkTooLarge(settings.CHUNKED_UPLOADS['MAX_CHUNK_SIZE'])
+    if content_length != length:
+        raise ValidationError({'error': 'Content-Length does not match Content-Range'})
+    if start != session.received:
+        raise UploadConflict(session.received)
+
+    os.makedirs(settings.CHUNKED_UPLOADS['DIR'], exist_ok=True)
+    remaining = length
+    # A first chunk (re)starts the file; later ones overwrite anything past the
+    # last acknowledged offset, e.g. the remains of an interrupted chunk
+    try:
+        f = open(staging_path(session), 'r+b' if start else 'wb')
+    except FileNotFoundError:
+        restart(session)
+        raise UploadConflict(0, session)
+    with f:
+        f.seek(start)
+        if start == 0:
+            signature = SIGNATURES[extension(session.filename)]
+            head = read_exactly(stream, min(len(signature), length))
+            if head != signature:
+                discard(session)
+                raise ValidationError({'error': f'File content does not match its .{extension(session.filename)} extension'})
+            f.write(head)
+            remaining -= len(head)
+        while remaining:
+            data = stream.read(min(READ_SIZE, remaining))
+            if not data:
+                raise ValidationError({'error': 'Chunk ended before Content-Range was satisfied'})
+            f.write(data)
+            remaining -= len(data)
+
+    # Two requests racing for the same offset: only one may advance it
+    if not UploadSession.objects.filter(pk=session.pk, received=start).update(received=end + 1,
+                                                                              updated_at=timezone.now()):
+        session.refresh_from_db(fields=['received'])
+        raise UploadConflict(session.received)
+    session.received = end + 1
+    return session.received
+
+
+def read_exactly(stream, size):
+    data = b''
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def restart(session):
+    """Send ``session`` back to offset 0 after its staging file went missing"""
+    UploadSession.objects.filter(pk=session.pk).update(received=0, updated_at=timezone.now())
+    session.received = 0
+
+
+def discard(session):
+    """Delete an upload session and whatever it has staged"""
+    try:
+        os.remove(staging_path(session))
+    except FileNotFoundError:
+        pass
+    UploadSession.objects.filter(pk=session.pk).delete()
+
+
+def complete_uploads(user, sessions):
+    """Move finished uploads ({field: session}) into storage and onto ``user``'s verification.
+
+    Raises UploadConflict (offset 0) when a staging file is missing.
+    """
+    try:
+        return _attach_uploads(user, sessions)
+    except UploadConflict as e:
+        # After the rollback, so the reset sticks
+        restart(e.session)
+        raise
+
+
+def _attach_uploads(user, sessions):
+    with transaction.atomic():
+        verification = (VerificationDetails.objects.select_for_update().filter(user=user).first()
+                        or VerificationDetails(user=user))
+        for field, session in sessions.items():
+            try:
+                f = open(staging_path(session), 'rb')
+            except FileNotFoundError:
+                raise UploadConflict(0, session)
+            with f:
+                getattr(verification, field).save(session.filename, File(f), save=False)
+        # Same outcome as a multipart submission to VerificationView
+        verification.status = 'approved'
+        verification.is_verified = True
+        verification.save()
+        UploadSession.objects.filter(pk__in=[session.pk for session in sessions.values()]).delete()
+        paths = [staging_path(session) for session in sessions.values()]
+        transaction.on_commit(lambda: [os.remove(path) for path in paths if os.path.exists(path)])
+    return verification
+
+
+def purge_expired(hours=None):
+    """Remove sessions idle for more than ``hours`` (CHUNKED_UPLOADS['EXPIRY_HOURS']); returns the count"""
+    hours = settings.CHUNKED_UPLOADS['EXPIRY_HOURS'] if hours is None else hours
+    expired = list(UploadSession.objects.filter(updated_at__lt=timezone.now() - timedelta(hours=hours)))
+    for session in expired:
+        discard(session)
+    return len(expired)
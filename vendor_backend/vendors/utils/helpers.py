@@ -1,4 +1,3 @@
-from django.core.mail import send_mail
 from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
@@ -7,54 +6,29 @@ import logging
 logger = logging.getLogger(__name__)
 
 def send_verification_email(vendor, status):
-    """Send verification status email to vendor"""
-    subject_map = {
-        'approved': 'Verification Approved - Vendor Hub',
-        'rejected': 'Verification Rejected - Vendor Hub',
-    }
-    
-    message_map = {
-        'approved': f'Congratulations {vendor.full_name}! Your verification has been approved.',
-        'rejected': f'Hello {vendor.full_name}, your verification has been rejected. Please resubmit your documents.',
-    }
-    
-    try:
-        send_mail(
-            subject_map.get(status, 'Verification Update'),
-            message_map.get(status, 'Your verification status has been updated.'),
-            settings.DEFAULT_FROM_EMAIL,
-            [vendor.email],
-            fail_silently=False,
-        )
-        logger.info(f"Verification email sent to {vendor.email}")
-    except Exception as e:
-        logger.error(f"Failed to send verification email to {vendor.email}: {str(e)}")
+    """Queue a verification status email to the vendor; send_notifications delivers it"""
+    from ..notifications import notify_verification
+
+    notify_verification(vendor.pk, status)
+    logger.info(f"Verification email queued for {vendor.email}")
 
 def get_booking_analytics(vendor, days=30):
-    """Get booking analytics for the vendor"""
-    from ..models import Booking
+    """Get booking analytics for the vendor over the last ``days`` days, from the daily rollups"""
+    from ..analytics import booking_series, booking_totals
     
-    end_date = timezone.now()
+    end_date = timezone.localdate()
     start_date = end_date - timedelta(days=days)
     
-    bookings = Booking.objects.filter(
-        vendor=vendor,
-        created_at__range=[start_date, end_date]
-    )
+    totals = booking_totals(booking_series(vendor, start_date, end_date, 'month'))
     
-    analytics = {
-        'total_bookings': bookings.count(),
-        'pending_count': bookings.filter(status='pending').count(),
-        'in_progress_count': bookings.filter(status='in_progress').count(),
-        'completed_count': bookings.filter(status='completed').count(),
-        'total_revenue': sum(b.amount for b in bookings.filter(status='completed')),
-        'average_booking_value': 0,
+    return {
+        'total_bookings': sum(point['count'] for point in totals.values()),
+        'pending_count': totals['pending']['count'],
+        'in_progress_count': totals['in_progress']['count'],
+        'completed_count': totals['completed']['count'],
+        'total_revenue': totals['completed']['revenue'],
+        'average_booking_value': totals['completed']['average_value'],
     }
-    
-    if analytics['completed_count'] > 0:
-        analytics['average_booking_value'] = analytics['total_revenue'] / analytics['completed_count']
-    
-    return analytics
 
 def validate_file_upload(file, allowed_types=['pdf', 'jpg', 'jpeg', 'png'], max_size_mb=5):
     """Validate uploaded file type and size"""